@@ -4,186 +4,386 @@ Fetches current product price from Amazon.de
 """
 
 from playwright.sync_api import sync_playwright
+from price_extraction import PRICE_STRATEGIES, extract_price_and_image
+from collections import deque
+from dotenv import load_dotenv
+import atexit
+import importlib
+import os
 import time
-import random
-import re
 
+load_dotenv('var.env')
+# Number of browser pages scraping in parallel (each worker owns one browser, context and page)
+SCRAPER_POOL_SIZE = int(os.getenv('SCRAPER_POOL_SIZE', '2'))
+# Seconds a caller waits for a scrape before giving up
+SCRAPER_TIMEOUT = float(os.getenv('SCRAPER_TIMEOUT', '45'))
+# Price strategies to try, in order (see price_extraction.py); drop slow or useless
+# fallbacks after checking them with benchmark_price_extraction.py
+SCRAPER_PRICE_STRATEGIES = tuple(
+    s.strip() for s in os.getenv('SCRAPER_PRICE_STRATEGIES', ','.join(PRICE_STRATEGIES)).split(',') if s.strip()
+)
+# Browser launches a worker tries (pausing 1s, 2s, 4s, ... in between) before it gives up
+SCRAPER_LAUNCH_ATTEMPTS = int(os.getenv('SCRAPER_LAUNCH_ATTEMPTS', '4'))
+# Seconds fetch() returns (None, None) right away once every worker gave up,
+# before the next scrape tries to start the browsers again
+SCRAPER_UNAVAILABLE_COOLDOWN = float(os.getenv('SCRAPER_UNAVAILABLE_COOLDOWN', '300'))
+# Seconds a scraped price stays valid in the cache
+PRICE_CACHE_TTL = float(os.getenv('PRICE_CACHE_TTL', '900'))
+
+AMAZON_BASE_URL = 'https://www.amazon.de'
+
+BROWSER_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+]
+
+CONTEXT_OPTIONS = {
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'viewport': {'width': 1920, 'height': 1080},
+    'locale': 'de-DE',
+    'timezone_id': 'Europe/Berlin',
+    'extra_http_headers': {
+        'Accept-Language': 'de-DE,de;q=0.9,en;q=0.8',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    }
+}
+
+# Mask automation
+MASK_WEBDRIVER_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+"""
 
-def fetch_amazon_price(asin):
-    """
-    Fetch the current price and image URL for a product from Amazon.de
 
-    Args:
-        asin (str): Amazon Standard Identification Number
+def _native(module_name, attribute):
+    """
+    Return a stdlib attribute as it was before eventlet/gevent monkey-patching.
 
-    Returns:
-        tuple: (price, image_url) where price is float in euros or None,
-               and image_url is string or None
+    Playwright's sync API must stay on the OS thread that started it, so the
+    pool workers have to be real threads even when the server is green.
     """
     try:
-        with sync_playwright() as p:
-            # Launch browser with anti-bot detection settings
-            browser = p.chromium.launch(
-                headless=True,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                ]
-            )
-
-            # Create context with realistic user agent
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080},
-                locale='de-DE',
-                timezone_id='Europe/Berlin',
-                extra_http_headers={
-                    'Accept-Language': 'de-DE,de;q=0.9,en;q=0.8',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                }
-            )
-
-            # Mask automation
-            context.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
-
-            page = context.new_page()
-
-            # Navigate to product page
-            url = f'https://www.amazon.de/dp/{asin}'
-            print(f"Fetching price from: {url}")
-            page.goto(url, wait_until='domcontentloaded', timeout=30000)
-
-            # Minimal delay to let dynamic content load
-            time.sleep(0.5)
-
-            # Try to find price and image using various selectors
-            price = None
-            image_url = None
-
-            # Extract product image first
-            try:
-                # Try main product image
-                img_elem = page.locator('#landingImage').first
-                if img_elem.count() == 0:
-                    # Try alternative selectors
-                    img_elem = page.locator('.a-dynamic-image').first
-
-                if img_elem.count() > 0:
-                    image_url = img_elem.get_attribute('src')
-                    print(f"Found image URL: {image_url}")
-            except Exception as e:
-                print(f"Image extraction failed: {e}")
-
-            # Method 1: Try .a-price .a-offscreen (most common)
-            try:
-                price_elem = page.locator('.a-price .a-offscreen').first
-                if price_elem.count() > 0:
-                    price_text = price_elem.inner_text()
-                    price = parse_price_text(price_text)
-                    print(f"Found price (method 1): {price_text} -> {price}")
-            except Exception as e:
-                print(f"Method 1 failed: {e}")
-
-            # Method 2: Try #priceblock_ourprice
-            if price is None:
-                try:
-                    price_elem = page.locator('#priceblock_ourprice').first
-                    if price_elem.count() > 0:
-                        price_text = price_elem.inner_text()
-                        price = parse_price_text(price_text)
-                        print(f"Found price (method 2): {price_text} -> {price}")
-                except Exception as e:
-                    print(f"Method 2 failed: {e}")
-
-            # Method 3: Try #priceblock_dealprice
-            if price is None:
-                try:
-                    price_elem = page.locator('#priceblock_dealprice').first
-                    if price_elem.count() > 0:
-                        price_text = price_elem.inner_text()
-                        price = parse_price_text(price_text)
-                        print(f"Found price (method 3): {price_text} -> {price}")
-                except Exception as e:
-                    print(f"Method 3 failed: {e}")
-
-            # Method 4: Try .a-price-whole
-            if price is None:
-                try:
-                    price_elem = page.locator('.a-price-whole').first
-                    if price_elem.count() > 0:
-                        price_text = price_elem.inner_text()
-                        price = parse_price_text(price_text)
-                        print(f"Found price (method 4): {price_text} -> {price}")
-                except Exception as e:
-                    print(f"Method 4 failed: {e}")
-
-            # Method 5: Search page content for price patterns
-            if price is None:
-                try:
-                    content = page.content()
-                    # Look for patterns like "19,99 €" or "19.99€"
-                    price_patterns = [
-                        r'(\d+[,\.]\d{2})\s*€',
-                        r'€\s*(\d+[,\.]\d{2})',
-                    ]
-                    for pattern in price_patterns:
-                        matches = re.findall(pattern, content)
-                        if matches:
-                            price_text = matches[0]
-                            price = parse_price_text(price_text)
-                            if price:
-                                print(f"Found price (method 5): {price_text} -> {price}")
-                                break
-                except Exception as e:
-                    print(f"Method 5 failed: {e}")
-
-            context.close()
-            browser.close()
-
-            if price is not None:
-                print(f"Successfully fetched price: {price}€")
-            else:
-                print(f"Could not find price for ASIN: {asin}")
-
-            return (price, image_url)
+        from gevent import monkey
+        if monkey.is_module_patched(module_name):
+            return monkey.get_original(module_name, attribute)
+    except ImportError:
+        pass
+    try:
+        from eventlet import patcher
+        if patcher.is_monkey_patched(module_name.lstrip('_')):
+            return getattr(patcher.original(module_name), attribute)
+    except ImportError:
+        pass
+    return getattr(importlib.import_module(module_name), attribute)
 
-    except Exception as e:
-        print(f"Error fetching data for ASIN {asin}: {e}")
-        return (None, None)
 
+class PriceCache:
+    """Scraped (price, image_url) per ASIN, valid for `ttl` seconds"""
+
+    def __init__(self, ttl=PRICE_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}  # asin -> (expires_at, (price, image_url))
+
+    def get(self, asin):
+        entry = self._entries.get(asin)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.time() > expires_at:
+            self._entries.pop(asin, None)
+            return None
+        return result
+
+    def set(self, asin, result):
+        self._entries[asin] = (time.time() + self.ttl, result)
+
+    def clear(self):
+        self._entries.clear()
 
-def parse_price_text(price_text):
+
+class ScrapeJob:
+    """One product lookup handed to the pool; the worker fills in result and sets done"""
+
+    def __init__(self, asin):
+        self.asin = asin
+        self.result = (None, None)
+        self.done = False
+
+
+class BrowserPool:
     """
-    Parse price text into float
+    Long-lived headless browsers for scraping Amazon product pages.
+
+    Each worker thread owns one Chromium browser, context and page and reuses
+    them for every product, so a scrape only costs the page load. At most
+    `size` pages load at once; further jobs wait in the queue.
+
+    Callers wait for their job by polling with the `sleep` they pass to
+    fetch(). Socket handlers pass socketio.sleep, which yields to the other
+    greenlets under eventlet/gevent whether or not the stdlib is
+    monkey-patched (python app.py runs eventlet without patching), so the
+    server keeps serving while a scrape runs. The default time.sleep only
+    yields once the stdlib is patched (wsgi.py).
+
+    Results with a price are kept in `cache`; fetch() serves cached ASINs
+    without a scrape and prefetch() scrapes ASINs ahead of time.
+
+    A worker whose browser fails to launch retries with a doubling pause and
+    gives up after SCRAPER_LAUNCH_ATTEMPTS. Once every worker gave up, the
+    queued jobs fail and the pool is unavailable for SCRAPER_UNAVAILABLE_COOLDOWN
+    seconds: fetch() returns (None, None) at once instead of waiting for the
+    timeout, and the next scrape after that starts the workers again.
+    """
+
+    POLL_INTERVAL = 0.05
+    RETRY_DELAY = 1         # Seconds before the first browser relaunch
+    MAX_RETRY_DELAY = 30
+
+    def __init__(self, size=SCRAPER_POOL_SIZE, cache=None):
+        self.size = max(1, size)
+        self.cache = cache if cache is not None else PriceCache()
+        self._jobs = deque()
+        self._pending = {}      # asin -> queued or running ScrapeJob
+        self._workers_started = 0
+        self._warm = 0          # Workers whose browser is up
+        self._unavailable_until = 0.0
+        self._closing = False
+        # A real lock: the workers are OS threads even when the server is green
+        self._lock = _native('_thread', 'allocate_lock')()
+
+    def warm_up(self):
+        """
+        Start the workers (and their browsers) ahead of the first scrape; returns immediately.
+
+        Returns:
+            bool: False while the pool is unavailable after every worker gave up
+        """
+        start_new_thread = _native('_thread', 'start_new_thread')
+        with self._lock:
+            if self.unavailable:
+                return False
+            self._closing = False
+            while self._workers_started < self.size:
+                self._workers_started += 1
+                start_new_thread(self._worker_loop, (self._workers_started,))
+        return True
+
+    @property
+    def ready(self):
+        return self._warm > 0
+
+    @property
+    def unavailable(self):
+        return time.time() < self._unavailable_until
+
+    def submit(self, asin):
+        """
+        Queue a product for scraping; returns the ScrapeJob to wait on (shared if already queued).
+        While the pool is unavailable the job is returned already done, without a price.
+        """
+        if not self.warm_up():
+            job = ScrapeJob(asin)
+            job.done = True
+            return job
+
+        with self._lock:
+            job = self._pending.get(asin)
+            if job is None:
+                job = ScrapeJob(asin)
+                self._pending[asin] = job
+                self._jobs.append(job)
+        return job
+
+    def prefetch(self, asins):
+        """Queue scrapes for ASINs that are not cached yet; returns immediately"""
+        for asin in asins:
+            if self.unavailable:
+                return
+            if self.cache.get(asin) is None:
+                self.submit(asin)
+
+    def fetch(self, asin, timeout=SCRAPER_TIMEOUT, sleep=time.sleep):
+        """Return (price, image_url) from the cache, or scrape the product and wait
+        for it, polling with `sleep` (pass socketio.sleep from socket handlers)"""
+        cached = self.cache.get(asin)
+        if cached is not None:
+            print(f"Price cache hit for ASIN {asin}")
+            return cached
+
+        if self.unavailable:
+            print(f"Scraper unavailable, no price for ASIN {asin}")
+            return (None, None)
+
+        job = self.submit(asin)
+        deadline = time.time() + timeout
+        while not job.done:
+            if time.time() > deadline:
+                print(f"Scrape for ASIN {asin} timed out after {timeout}s")
+                return (None, None)
+            sleep(self.POLL_INTERVAL)
+        return job.result
+
+    def close(self):
+        """Stop the workers; each closes its browser when it finishes its current job"""
+        self._closing = True
+
+    def _worker_loop(self, worker_id):
+        sleep = _native('time', 'sleep')
+        warm = False
+        launch_failures = 0
+        try:
+            with sync_playwright() as p:
+                browser = None
+                page = None
+                while not self._closing:
+                    try:
+                        if browser is None or not browser.is_connected():
+                            if warm:
+                                warm = False
+                                with self._lock:
+                                    self._warm -= 1
+                            browser = None
+                            try:
+                                browser, page = self._open_browser(p)
+                            except Exception as e:
+                                launch_failures += 1
+                                if launch_failures >= SCRAPER_LAUNCH_ATTEMPTS:
+                                    print(f"Scraper worker {worker_id}: giving up after {launch_failures} failed browser launches: {e}")
+                                    break
+                                delay = min(self.RETRY_DELAY * 2 ** (launch_failures - 1), self.MAX_RETRY_DELAY)
+                                print(f"Scraper worker {worker_id}: browser launch failed ({e}), retrying in {delay}s")
+                                sleep(delay)
+                                continue
+                            launch_failures = 0
+                            warm = True
+                            with self._lock:
+                                self._warm += 1
+                            print(f"Scraper worker {worker_id}: browser ready")
+                        elif page is None or page.is_closed():
+                            page = browser.contexts[0].new_page()
+
+                        try:
+                            job = self._jobs.popleft()
+                        except IndexError:
+                            sleep(self.POLL_INTERVAL)
+                            continue
+
+                        try:
+                            job.result = self._scrape(page, job.asin)
+                            if job.result[0] is not None:
+                                self.cache.set(job.asin, job.result)
+                        finally:
+                            with self._lock:
+                                self._pending.pop(job.asin, None)
+                            job.done = True
+                    except Exception as e:
+                        print(f"Scraper worker {worker_id} error: {e}")
+                        # Start over with a fresh page (and browser, if it died)
+                        try:
+                            if page is not None:
+                                page.close()
+                        except Exception:
+                            pass
+                        page = None
+                        sleep(1)
+
+                if browser is not None:
+                    browser.close()
+        except Exception as e:
+            print(f"Scraper worker {worker_id} stopped: {e}")
+        finally:
+            self._worker_stopped(warm)
+
+    def _worker_stopped(self, warm):
+        with self._lock:
+            self._workers_started -= 1
+            if warm:
+                self._warm -= 1
+            if self._closing or self._workers_started > 0:
+                return
+
+            # The last worker gave up: fail the queued jobs instead of letting callers time out
+            self._unavailable_until = time.time() + SCRAPER_UNAVAILABLE_COOLDOWN
+            failed = list(self._jobs)
+            self._jobs.clear()
+            self._pending.clear()
+        for job in failed:
+            job.done = True
+        print(f"Scraper unavailable for {SCRAPER_UNAVAILABLE_COOLDOWN:.0f}s: no browser could be started")
+
+    @staticmethod
+    def _open_browser(p):
+        # Launch browser with anti-bot detection settings
+        browser = p.chromium.launch(headless=True, args=BROWSER_ARGS)
+        context = browser.new_context(**CONTEXT_OPTIONS)
+        context.add_init_script(MASK_WEBDRIVER_SCRIPT)
+        page = context.new_page()
+
+        # Warm-up: DNS, TLS and Amazon cookies are in place before the first product
+        try:
+            page.goto(AMAZON_BASE_URL, wait_until='domcontentloaded', timeout=30000)
+        except Exception as e:
+            print(f"Scraper warm-up navigation failed: {e}")
+
+        return browser, page
+
+    @staticmethod
+    def _scrape(page, asin):
+        # Navigate to product page
+        url = f'{AMAZON_BASE_URL}/dp/{asin}'
+        print(f"Fetching price from: {url}")
+        page.goto(url, wait_until='domcontentloaded', timeout=30000)
+
+        # Minimal delay to let dynamic content load
+        page.wait_for_timeout(500)
+
+        # One round-trip for the HTML, then a single parser pass over it
+        price, image_url = extract_price_and_image(page.content(), SCRAPER_PRICE_STRATEGIES)
+        if image_url:
+            print(f"Found image URL: {image_url}")
+
+        if price is not None:
+            print(f"Successfully fetched price: {price}€")
+        else:
+            print(f"Could not find price for ASIN: {asin}")
+
+        return (price, image_url)
+
+
+def fetch_amazon_price(asin, timeout=SCRAPER_TIMEOUT, sleep=time.sleep):
+    """
+    Fetch the current price and image URL for a product from Amazon.de
+
+    Served from the price cache when the product was scraped recently (or
+    prefetched), otherwise scraped with the shared browser pool; the first
+    scrape starts the browsers if warm_up() was not called before.
 
     Args:
-        price_text (str): Price string like "19,99 €" or "€19.99"
+        asin (str): Amazon Standard Identification Number
+        timeout (float): Seconds to wait for the scrape
+        sleep (callable): Sleep used while waiting; socketio.sleep keeps a green server responsive
 
     Returns:
-        float: Price value or None if parsing fails
+        tuple: (price, image_url) where price is float in euros or None,
+               and image_url is string or None
     """
     try:
-        # Remove currency symbols and extra whitespace
-        cleaned = price_text.replace('€', '').replace('EUR', '').strip()
+        return browser_pool.fetch(asin, timeout, sleep)
+    except Exception as e:
+        print(f"Error fetching data for ASIN {asin}: {e}")
+        return (None, None)
 
-        # Replace comma with dot for German prices
-        cleaned = cleaned.replace(',', '.')
 
-        # Remove any remaining non-numeric characters except dot
-        cleaned = re.sub(r'[^\d\.]', '', cleaned)
+def prefetch_amazon_prices(asins):
+    """Start scraping the given products in the background so later fetches hit the cache"""
+    browser_pool.prefetch(asins)
 
-        # Convert to float
-        price = float(cleaned)
 
-        return price
-    except Exception as e:
-        print(f"Error parsing price text '{price_text}': {e}")
-        return None
+# Create singleton instance
+browser_pool = BrowserPool()
+atexit.register(browser_pool.close)
 
 
 # Test function
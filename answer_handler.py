@@ -10,12 +10,19 @@ import string
 from typing import List, Dict, Tuple, Optional
 
 try:
-    from rapidfuzz import fuzz
+    from rapidfuzz import fuzz, process
     FUZZY_AVAILABLE = True
 except ImportError:
     FUZZY_AVAILABLE = False
     print("Warning: rapidfuzz not installed. Install with: pip install rapidfuzz")
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("Warning: numpy not installed. Install with: pip install numpy")
+
 
 class AnswerHandler:
     """Handles answer normalization and correctness evaluation."""
@@ -121,6 +128,50 @@ class AnswerHandler:
 
         return is_correct, best_score, matched_answer if is_correct else None
 
+    @classmethod
+    def batch_text_correctness(cls, user_answers: List[str],
+                               expected_answers: List[str]) -> List[Tuple[bool, float, Optional[str]]]:
+        """
+        Score many answers against all expected answers at once.
+
+        Gives the same result as calling calculate_text_correctness for each
+        answer, but computes the whole similarity matrix in a single
+        rapidfuzz cdist call.
+
+        Args:
+            user_answers: List of normalized user answers
+            expected_answers: List of normalized expected answers
+
+        Returns:
+            List of (is_correct, similarity_score, matched_answer) tuples, one per user answer
+        """
+        if not FUZZY_AVAILABLE or not NUMPY_AVAILABLE or not user_answers or not expected_answers:
+            return [cls.calculate_text_correctness(answer, expected_answers) for answer in user_answers]
+
+        # Similarity matrix: one row per user answer, one column per expected answer
+        scores = process.cdist(
+            user_answers,
+            [expected or '' for expected in expected_answers],
+            scorer=fuzz.token_sort_ratio,
+            dtype=np.float64  # Same precision as the per-pair scores
+        )
+        best_columns = scores.argmax(axis=1)  # First best match, like the sequential loop
+        best_scores = scores[np.arange(len(user_answers)), best_columns]
+
+        expected_set = set(expected_answers)
+        results = []
+        for answer, column, best_score in zip(user_answers, best_columns, best_scores):
+            if not answer:
+                results.append((False, 0.0, None))
+            elif answer in expected_set:
+                results.append((True, 100.0, answer))
+            else:
+                best_score = float(best_score)
+                is_correct = best_score >= cls.FUZZY_THRESHOLD
+                results.append((is_correct, best_score, expected_answers[column] if is_correct else None))
+
+        return results
+
     @classmethod
     def calculate_number_distance(cls, user_answer: str, expected_answer: str) -> Tuple[bool, float, float]:
         """
@@ -180,17 +231,18 @@ class AnswerHandler:
                 'is_exact': is_exact
             })
 
-        # Sort by distance (closest first)
+        if not results:
+            return results
+
+        # Sort by distance (closest first; stable, so ties keep submission order)
         results.sort(key=lambda x: x['distance'])
+        min_distance = results[0]['distance']
 
         # Assign ranks and determine winners
-        if results:
-            min_distance = results[0]['distance']
-
-            for i, result in enumerate(results, 1):
-                result['rank'] = i
-                # All users with the minimum distance are winners
-                result['is_winner'] = (result['distance'] == min_distance)
+        for i, result in enumerate(results, 1):
+            result['rank'] = i
+            # All users with the minimum distance are winners
+            result['is_winner'] = (result['distance'] == min_distance)
 
         return results
 
@@ -287,6 +339,22 @@ class AnswerHandler:
 
         return results
 
+    @staticmethod
+    def _bulk_update_correctness(db_session, answer_ids: List[int], correct_ids: List[int]):
+        """Set is_correct for all given answers with a single UPDATE statement."""
+        from models.game import AnswerUser
+        from sqlalchemy import case
+
+        if not answer_ids:
+            return
+
+        correct_ids = list(correct_ids)
+        is_correct = case((AnswerUser.id.in_(correct_ids), True), else_=False) if correct_ids else False
+        db_session.query(AnswerUser).filter(AnswerUser.id.in_(answer_ids)).update(
+            {AnswerUser.is_correct: is_correct},
+            synchronize_session=False
+        )
+
     @classmethod
     def evaluate_all_answers(cls, question_id: int, db_session) -> Dict:
         """
@@ -315,8 +383,14 @@ class AnswerHandler:
         if not expected_answers:
             return {'error': 'No expected answers configured'}
 
-        # Get all user answers
-        user_answers = db_session.query(AnswerUser).filter_by(question_id=question_id).all()
+        # Get all user answers (plain rows - correctness is written back in one UPDATE)
+        user_answers = db_session.query(
+            AnswerUser.id,
+            AnswerUser.user_id,
+            AnswerUser.answer_raw,
+            AnswerUser.answer_normalized,
+            AnswerUser.is_correct
+        ).filter_by(question_id=question_id).all()
 
         # Determine question type
         if question.question_type == 'mc':
@@ -361,13 +435,15 @@ class AnswerHandler:
 
             ranked_results = cls.rank_number_guesses(answer_data, primary_answer.answer_normalized)
 
-            # Update results and database
-            for result in ranked_results:
-                # Update database
-                answer = db_session.query(AnswerUser).filter_by(id=result['answer_id']).first()
-                if answer:
-                    answer.is_correct = result['is_winner']
+            # Update database
+            cls._bulk_update_correctness(
+                db_session,
+                [result['answer_id'] for result in ranked_results],
+                [result['answer_id'] for result in ranked_results if result['is_winner']]
+            )
 
+            # Update results
+            for result in ranked_results:
                 results['user_results'].append({
                     'user_id': result['user_id'],
                     'answer_raw': result['answer_raw'],
@@ -383,15 +459,19 @@ class AnswerHandler:
             # Normal text question
             expected_normalized = [ans.answer_normalized for ans in expected_answers]
 
-            for answer in user_answers:
-                is_correct, similarity, matched = cls.calculate_text_correctness(
-                    answer.answer_normalized,
-                    expected_normalized
-                )
+            evaluations = cls.batch_text_correctness(
+                [answer.answer_normalized or '' for answer in user_answers],
+                expected_normalized
+            )
 
-                # Update database
-                answer.is_correct = is_correct
+            # Update database
+            cls._bulk_update_correctness(
+                db_session,
+                [answer.id for answer in user_answers],
+                [answer.id for answer, (is_correct, _, _) in zip(user_answers, evaluations) if is_correct]
+            )
 
+            for answer, (is_correct, similarity, matched) in zip(user_answers, evaluations):
                 results['user_results'].append({
                     'user_id': answer.user_id,
                     'answer_raw': answer.answer_raw,
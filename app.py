@@ -1,10 +1,23 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_from_directory
 from flask_socketio import SocketIO, emit, join_room, leave_room
-from db import init_db, db
+from sqlalchemy.orm import load_only
+from db import init_db, create_schema, reset_game_state, db
 from models.user import User
-from models.game import GameState, SessionCategory, SessionQuestion, Category, Question, QuestionItem, MatchMeGame, PlayerGameState, SessionSetup, AnswerUser
+from models.game import GameState, SessionQuestion, Category, Question, QuestionItem, MatchMeGame, PlayerGameState, SessionSetup, AnswerUser
 from datetime import timedelta, datetime
 from games.game_manager import GameManager
+from game_state_store import game_state_store
+from player_state_store import player_state_store
+from buzzer_arbiter import create_buzzer_arbiter
+from round_state import round_state, QUESTION_FIELDS, FONT_GUESSER_FIELDS
+from state_backend import REDIS_URL, multi_worker_enabled
+from user_directory import user_directory
+from puzzle_tiles import SHEET_MAX_AGE, puzzle_tile_cache
+from board_state import ACTIVE_SESSION_NAME, board_state
+from question_serialization import question_serializer, session_board_dict
+from question_bundles import question_bundles
+from socket_rooms import ADMIN_ROOM, COMPACT_SUFFIX, DISPLAY_ROOM, PLAYERS_ROOM, client_rooms, emit_to_everyone, emit_to_rooms
+from wire_format import wire_keys_payload
 import os
 import secrets
 import time
@@ -19,22 +32,44 @@ from spotipy.oauth2 import SpotifyOAuth
 # Load environment variables from var.env
 load_dotenv('var.env')
 
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 
 # Create Flask app
 app = Flask(__name__)
-app.config['SECRET_KEY'] = secrets.token_hex(16)
+# Workers must share SECRET_KEY or a session cookie is only valid on the worker that issued it
+app.config['SECRET_KEY'] = os.getenv('SECRET_KEY') or secrets.token_hex(16)
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=31)
 
-# Initialize database
+# Configure the database (tables and migrations are handled by create_schema)
 init_db(app)
 
-# Initialize SocketIO with default settings
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Initialize SocketIO; with REDIS_URL set, workers share events through the Redis message queue
+# SOCKETIO_ASYNC_MODE is set by wsgi.py to match the gunicorn worker (eventlet or gevent)
+socketio = SocketIO(app, cors_allowed_origins="*", message_queue=REDIS_URL,
+                    async_mode=os.getenv('SOCKETIO_ASYNC_MODE') or None)
 
 # Initialize game manager
 game_manager = GameManager(socketio)
 
+
+def game_state_flush_loop():
+    """Background task that writes the in-memory game and player state to the database"""
+    while True:
+        socketio.sleep(game_state_store.flush_interval)
+        with app.app_context():
+            game_state_store.flush()
+            player_state_store.flush()
+
+
+def start_background_tasks():
+    """Start the server's background tasks. Called by the server entry points
+    (__main__ below, wsgi.py) only, so scripts importing app still exit."""
+    socketio.start_background_task(game_state_flush_loop)
+
+    # Multi-worker mode: mirror games started on other workers
+    if multi_worker_enabled():
+        socketio.start_background_task(game_manager.listen_for_game_events, app)
+
 # Setup utility handlers for movie questions (doesn't set active_game)
 game_manager.setup_utility_handlers('movie_guesser')
 
@@ -47,32 +82,15 @@ game_manager.setup_utility_handlers('price_guesser')
 # Note: Sorting game ('tt') handlers are registered when the game starts via game_manager.start_game('tt')
 # This is because the handlers need access to the active game instance
 
-# Global variable to track who buzzed for scoring
-current_buzzed_player = None
-# Multi-item question tracking
-current_question_data = None  # Stores the full question data for multi-item questions
-current_item_index = 0  # Tracks the current item being displayed
-total_items = 0  # Total number of items for the current question
-
-# Silhouette game phase tracking
-silhouette_phase = 'idle'  # Tracks current phase: 'idle', 'growing', 'revealing_color', 'complete'
-
-# Session configuration
-ACTIVE_SESSION_NAME = "playtest"  # Fallback default session name
+# First-buzz-wins arbitration; the winner is the player being scored
+buzzer_arbiter = create_buzzer_arbiter()
 
+# Question, multi-item, silhouette and font guesser state of the current round
+# lives in round_state (shared by all workers in multi-worker mode)
 
 def get_active_session():
-    """Get the currently active session from database or fallback to ACTIVE_SESSION_NAME"""
-    game_state = GameState.query.first()
-    if game_state and game_state.active_session_id:
-        session = SessionSetup.query.get(game_state.active_session_id)
-        if session:
-            return session
-    # Fallback to ACTIVE_SESSION_NAME or first available session
-    session = SessionSetup.query.filter_by(name=ACTIVE_SESSION_NAME).first()
-    if not session:
-        session = SessionSetup.query.first()
-    return session
+    """Get the currently active session (resolved once and cached with the board snapshot, see board_state.py)"""
+    return board_state.active_session()
 
 
 # Spotify configuration
@@ -84,7 +102,6 @@ SPOTIFY_REDIRECT_URI = os.getenv('REDIRECT_URL')
 scope = 'user-read-playback-state,user-modify-playback-state'
 auth_manager = None
 spotify_client = None
-current_spotify_track_id = None  # Track currently loaded Spotify track for resume functionality
 
 def get_spotify_client():
     """Get or create Spotify client with proper error handling"""
@@ -151,7 +168,7 @@ def validate_game_access(expected_game):
     # Check if platform is active (game board mode)
     if game_state.is_active:
         # In game board mode, check if current_question_data matches this game
-        global current_question_data
+        current_question_data = round_state.get('current_question_data')
 
         if not current_question_data:
             # No active question - redirect to waiting room
@@ -427,6 +444,13 @@ def game_coop_puzzle():
 
     return render_template('games/coop_puzzle.html')
 
+@app.route('/puzzle_tiles/<name>.webp')
+def puzzle_tiles(name):
+    """Pre-cut puzzle sprite sheet; the name contains the image hash, so it can be cached for good"""
+    response = send_from_directory(puzzle_tile_cache.cache_dir, f"{name}.webp", max_age=SHEET_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={SHEET_MAX_AGE}, immutable'
+    return response
+
 @app.route('/game/movie_guesser')
 @login_required
 def game_movie_guesser():
@@ -501,18 +525,24 @@ def api_users():
 @app.route('/api/game_state')
 def api_game_state():
     game_state = GameState.query.first()
-    return jsonify(game_state.to_dict() if game_state else {})
+    if not game_state:
+        return jsonify({})
+    state = game_state.to_dict()
+    # The in-memory store is authoritative; the column may lag behind by one flush interval
+    state['game_data'] = game_state_store.get()
+    return jsonify(state)
 
 @app.route('/api/current_session')
 def api_current_session():
     """API endpoint to get current game board session data"""
     try:
-        # Get the configured active session
-        session = get_active_session()
+        # Get the configured active session, with its board loaded in a few batched queries
+        session = board_state.active_session_with_board()
         if not session:
             return jsonify({'error': 'No session found'}), 404
 
-        session_data = session.to_dict()
+        # Questions with the board profile only (no items, answers or sorting rows)
+        session_data = session_board_dict(session)
         return jsonify(session_data)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -776,6 +806,7 @@ def api_start_platform():
         users_to_delete = User.query.filter(User.username != 'admin').all()
         
         # First, delete all PlayerGameState records for these users
+        player_state_store.discard()
         for user in users_to_delete:
             print(f"Deleting game states for user: {user.username}")
             PlayerGameState.query.filter_by(user_id=user.id).delete()
@@ -801,17 +832,26 @@ def api_start_platform():
         with db.session.no_autoflush:
             session_questions_updated = SessionQuestion.query.filter_by(used=True).update({'used': False})
         print(f"Reset {session_questions_updated} session questions")
+        # The bulk update bypasses the mapper events of the board snapshot
+        board_state.invalidate_on_commit(db.session)
+
+        # Questions may have been edited since the last game (seed scripts, other processes)
+        question_serializer.clear()
 
         # Clear game_data to reset ordering game submissions and other game state
         print("Clearing game_data...")
         game_state = GameState.query.first()
         if game_state:
+            game_state_store.reset()
             game_state.game_data = '{}'
             print("Game data cleared")
 
         db.session.commit()
         print(f"Cleared {len(users_to_delete)} players from the database")
 
+        # Precompile the select_question payloads of the board
+        question_bundles.precompile()
+
         # Use the database manager to set the platform active
         success = db_manager.set_platform_active(active=True, game=None)
         
@@ -846,10 +886,7 @@ def api_stop_platform():
 
     try:
         # Clear current question data (same as socket handler does)
-        global current_question_data, current_item_index, total_items
-        current_question_data = None
-        current_item_index = 0
-        total_items = 0
+        round_state.reset(*QUESTION_FIELDS)
         print("Cleared current question data")
 
         # Use the database manager to set the platform inactive
@@ -904,7 +941,10 @@ def api_platform_state():
 def api_get_sessions():
     """Get all available game sessions"""
     try:
-        sessions = SessionSetup.query.all()
+        # Only the listed columns - no categories or questions
+        sessions = SessionSetup.query.options(
+            load_only(SessionSetup.id, SessionSetup.name, SessionSetup.created_at)
+        ).all()
         game_state = GameState.query.first()
         active_session_id = game_state.active_session_id if game_state else None
 
@@ -987,6 +1027,54 @@ def api_get_active_session():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# GeoGuessr location index endpoints
+@app.route('/api/admin/geo/nearest')
+@admin_required
+def api_geo_nearest():
+    """Known locations closest to a point (?lat=..&lng=..&limit=..)"""
+    from location_index import location_index
+    try:
+        latitude = float(request.args['lat'])
+        longitude = float(request.args['lng'])
+        limit = min(int(request.args.get('limit', 1)), 20)
+    except (KeyError, ValueError):
+        return jsonify({'success': False, 'error': 'lat and lng are required'}), 400
+
+    return jsonify({'success': True, 'locations': location_index.nearest(latitude, longitude, limit)})
+
+
+@app.route('/api/admin/geo/duplicates', methods=['POST'])
+@admin_required
+def api_geo_duplicates():
+    """Existing locations overlapping a new one (JSON: latitude, longitude, loc_json, tolerance_km)"""
+    from location_index import location_index
+    try:
+        data = request.get_json()
+        duplicates = location_index.find_duplicates(
+            float(data['latitude']),
+            float(data['longitude']),
+            data.get('loc_json'),
+            float(data.get('tolerance_km', 1.0))
+        )
+        return jsonify({'success': True, 'duplicates': duplicates})
+    except Exception as e:
+        print(f"Error checking location duplicates: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+@app.route('/api/admin/geo/locations')
+@admin_required
+def api_geo_locations_in_region():
+    """Locations inside a bounding box (?bbox=min_lat,min_lng,max_lat,max_lng)"""
+    from location_index import location_index
+    try:
+        min_lat, min_lng, max_lat, max_lng = (float(value) for value in request.args['bbox'].split(','))
+    except (KeyError, ValueError):
+        return jsonify({'success': False, 'error': 'bbox=min_lat,min_lng,max_lat,max_lng is required'}), 400
+
+    return jsonify({'success': True, 'locations': location_index.in_region(min_lat, min_lng, max_lat, max_lng)})
+
+
 # Spotify API endpoints
 @app.route('/api/spotify/auth_url')
 def get_spotify_auth_url():
@@ -1080,15 +1168,13 @@ def handle_start_platform():
         print("Admin started the platform")
 
         # Clear global question data to ensure clean state
-        global current_question_data, current_item_index, total_items
-        current_question_data = None
-        current_item_index = 0
-        total_items = 0
+        round_state.reset(*QUESTION_FIELDS)
         print("Cleared global question data when starting platform")
 
         try:
             # Get game state in a new transaction to ensure fresh data
             with app.app_context():
+                game_state_store.reset()
                 game_state = GameState.query.first()
 
                 if game_state:
@@ -1134,10 +1220,7 @@ def handle_start_platform():
 def handle_stop_platform():
     if 'username' in session and session['username'] == 'admin':
         # Clear current question data
-        global current_question_data, current_item_index, total_items
-        current_question_data = None
-        current_item_index = 0
-        total_items = 0
+        round_state.reset(*QUESTION_FIELDS)
         print("Cleared current question data when stopping platform")
 
         # Update the game state to mark platform as inactive
@@ -1162,12 +1245,23 @@ def handle_stop_platform():
 @socketio.on('connect')
 def handle_connect(auth=None):
     print(f"Socket.IO: Client connected! Session ID: {request.sid}")
+    current_question_data = round_state.get('current_question_data')
+    current_item_index = round_state.get('current_item_index')
+    total_items = round_state.get('total_items')
+
+    # Audience rooms: players, display (auth role) or admin, see socket_rooms.py
+    auth = auth if isinstance(auth, dict) else {}
+    rooms = client_rooms(session.get('username'), auth.get('role'), bool(auth.get('compact')))
+    if any(room.endswith(COMPACT_SUFFIX) for room in rooms):
+        # Key table of the compact wire format, before any compact event can arrive
+        emit('wire_keys', wire_keys_payload())
+    for room in rooms:
+        join_room(room)
+    print(f"Socket.IO: Joined rooms {rooms}")
+
     if 'username' in session:
         username = session['username']
         print(f"Socket.IO: User {username} connected")
-        print(f"Socket.IO: Joining user {username} to room '{username}'")
-        join_room(username)
-        print(f"Socket.IO: User {username} successfully joined room")
         emit('user_joined', {'username': username}, broadcast=True)
 
         # RECONNECTION LOGIC: Restore game state for reconnecting users
@@ -1264,12 +1358,14 @@ def handle_connect(auth=None):
 
                     # Determine question type and emit appropriate forward event
                     question_type = current_question_data.get('question_type')
+                    # Forward events carry the player profile: no answers or solutions
+                    player_question = question_serializer.get(current_question_data.get('id'), 'player')
 
                     # Ordering game
                     if current_question_data.get('order_items'):
                         emit('forward_to_ordering_game', {
                             'question': current_question_data.get('question_text'),
-                            'questionData': current_question_data,
+                            'questionData': player_question,
                             'currentItemIndex': current_item_index,
                             'totalItems': total_items
                         })
@@ -1279,7 +1375,7 @@ def handle_connect(auth=None):
                     elif question_type == 'pg':
                         emit('forward_to_price_guesser', {
                             'question': current_question_data.get('question_text'),
-                            'questionData': current_question_data
+                            'questionData': player_question
                         })
                         print(f"Socket.IO: Forwarded {username} to price guesser")
 
@@ -1287,7 +1383,7 @@ def handle_connect(auth=None):
                     elif current_question_data.get('input_expected') and current_question_data.get('movie_id'):
                         emit('forward_to_movie_guesser', {
                             'question': current_question_data.get('question_text'),
-                            'questionData': current_question_data,
+                            'questionData': player_question,
                             'currentItemIndex': current_item_index,
                             'totalItems': total_items
                         })
@@ -1310,7 +1406,7 @@ def handle_connect(auth=None):
 
                         emit('forward_to_top_5', {
                             'question': current_question_data.get('question_text'),
-                            'questionData': current_question_data,
+                            'questionData': player_question,
                             'previousGuesses': previous_guesses
                         })
                         print(f"Socket.IO: Forwarded {username} to Top 5 with {len(previous_guesses)} previous guesses")
@@ -1319,7 +1415,7 @@ def handle_connect(auth=None):
                     elif question_type == 'mc':
                         emit('forward_to_mc', {
                             'question': current_question_data.get('question_text'),
-                            'questionData': current_question_data
+                            'questionData': player_question
                         })
                         print(f"Socket.IO: Forwarded {username} to multiple choice")
 
@@ -1327,7 +1423,7 @@ def handle_connect(auth=None):
                     elif current_question_data.get('input_expected'):
                         emit('forward_to_input', {
                             'question': current_question_data.get('question_text'),
-                            'questionData': current_question_data
+                            'questionData': player_question
                         })
                         print(f"Socket.IO: Forwarded {username} to question input")
 
@@ -1335,7 +1431,7 @@ def handle_connect(auth=None):
                     elif question_type in ['text', 'image', 'audio', 'video', 'silhouette', 'fg']:
                         emit('forward_to_buzzer', {
                             'question': current_question_data.get('question_text'),
-                            'questionData': current_question_data
+                            'questionData': player_question
                         })
                         print(f"Socket.IO: Forwarded {username} to buzzer")
 
@@ -1420,10 +1516,7 @@ def handle_end_game():
         print("Admin ending the current game")
 
         # Clear current question data to prevent reconnection issues
-        global current_question_data, current_item_index, total_items
-        current_question_data = None
-        current_item_index = 0
-        total_items = 0
+        round_state.reset(*QUESTION_FIELDS)
         print("Cleared current question data")
 
         # End the game using the game manager
@@ -1446,83 +1539,65 @@ def handle_end_game():
 @socketio.on('select_question')
 def handle_select_question(data):
     """Handle question selection for game board"""
-    global silhouette_phase
     try:
         # Reset silhouette phase for new question
-        silhouette_phase = 'idle'
+        round_state.set('silhouette_phase', 'idle')
+
+        # Buzzes from the previous question don't carry over
+        buzzer_arbiter.reset()
 
         category_position = int(data['category'])
         question_value = int(data['value'])
 
-        # Get the configured active session
-        session_setup = get_active_session()
-        if not session_setup:
+        # The board question's payload was precompiled at platform start
+        board = board_state.get()
+        if not board:
             emit('error', {'message': 'No session found'})
             return
-        
-        # Find the category at this position
-        session_category = SessionCategory.query.filter_by(
-            session_id=session_setup.id,
-            position=category_position
-        ).first()
-        
-        if not session_category:
+
+        if category_position not in board.category_ids:
             emit('error', {'message': 'Category not found'})
             return
-        
+
         # Find the question at this position (value / 100 = position)
         question_position = question_value // 100
-        session_question = SessionQuestion.query.filter_by(
-            session_category_id=session_category.id,
-            position=question_position
-        ).first()
-        
-        if not session_question:
+        bundle = question_bundles.get(category_position, question_position * 100)
+
+        if not bundle:
             emit('error', {'message': 'Question not found'})
             return
-        
+
+        question_id = bundle['question_id']
+
         # Delete old player answers for this question (from previous sessions)
-        from models.game import AnswerUser
-        deleted_count = AnswerUser.query.filter_by(question_id=session_question.question.id).delete()
-        print(f"DEBUG: Deleted {deleted_count} old answers for question ID {session_question.question.id}")
+        deleted_count = AnswerUser.query.filter_by(question_id=question_id).delete()
+        print(f"DEBUG: Deleted {deleted_count} old answers for question ID {question_id}")
 
-        # Mark question as used
-        session_question.used = True
+        # Mark question as used (the bulk update bypasses the board snapshot's mapper events)
+        SessionQuestion.query.filter_by(id=bundle['session_question_id']).update({'used': True})
+        board_state.invalidate_on_commit(db.session)
         db.session.commit()
-        print(f"DEBUG: Committed deletion of old answers for question ID {session_question.question.id}")
 
-        # Initialize multi-item tracking
-        global current_question_data, current_item_index, total_items
-        question_dict = session_question.question.to_dict()
-        current_question_data = question_dict
+        # Multi-item tracking: items are grouped by item_order in the bundle
+        # multi_item: 0 = cumulative display (add items), 1 = replacement display (replace items)
+        # Both modes use item_order grouping and navigation controls
+        question_dict = bundle['question']
+        items = question_dict.get('items', [])
+        total_items = bundle['total_items']
+        current_item_index = 0  # Start at first item_order group
+        # The forward_to_* events go to the players: player profile, without answers or solutions
+        player_question = bundle['player']
 
         print(f"DEBUG: Question selected - multi_item value: {question_dict.get('multi_item')}")
         print(f"DEBUG: Question type: {question_dict.get('question_type')}")
         print(f"DEBUG: Media URL: {question_dict.get('media_url')}")
 
-        # Determine total items for this question
-        # multi_item: 0 = cumulative display (add items), 1 = replacement display (replace items)
-        # Both modes use item_order grouping and navigation controls
-        items = question_dict.get('items', [])
-        if items:
-            # Get unique item_order values to determine total items
-            unique_orders = set(item['item_order'] for item in items)
-            total_items = len(unique_orders)
-
-            # Group items by item_order for easier access
-            items_by_order = {}
-            for item in items:
-                order = item['item_order']
-                if order not in items_by_order:
-                    items_by_order[order] = []
-                items_by_order[order].append(item)
-
-            question_dict['items_by_order'] = items_by_order
-            question_dict['order_sequence'] = sorted(unique_orders)
-            current_item_index = 0  # Start at first item_order group
-        else:
-            total_items = 1
-            current_item_index = 0
+        current_question_data = question_dict
+        round_state.update(
+            current_question_data=current_question_data,
+            current_item_index=current_item_index,
+            total_items=total_items
+        )
 
         # Emit to all clients
         print(f"DEBUG: Emitting question_selected with:")
@@ -1532,36 +1607,29 @@ def handle_select_question(data):
         print(f"  - items count: {len(items)}")
         print(f"  - unique item_orders: {total_items}")
 
-        # Get answer from answers_expected table (use primary answer or fallback to question.answer)
-        answer_to_display = session_question.question.answer  # Fallback
-        if session_question.question.expected_answers:
-            # Get primary answer or first answer
-            primary_answer = next((ans for ans in session_question.question.expected_answers if ans.is_primary), None)
-            if primary_answer:
-                answer_to_display = primary_answer.answer_raw
-            elif session_question.question.expected_answers:
-                answer_to_display = session_question.question.expected_answers[0].answer_raw
+        # Primary expected answer, else the first, else question.answer
+        answer_to_display = bundle['answer']
 
         # Note: 'question_selected' event is now emitted only for questions that stay on the game board
         # Special game types (match_me, geo_guessr, etc.) handle their own display logic
 
         # Check if this is an ordering game question
-        if session_question.question.order_items and len(session_question.question.order_items) > 0:
-            emit('question_selected', {
+        if question_dict.get('order_items'):
+            emit_to_everyone(socketio, 'question_selected', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
+                'question': question_dict['question_text'],
                 'answer': answer_to_display,
                 'questionData': question_dict,
                 'currentItemIndex': current_item_index,
                 'totalItems': total_items
-            }, broadcast=True)
+            })
 
             emit('forward_to_ordering_game', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
-                'questionData': question_dict,
+                'question': question_dict['question_text'],
+                'questionData': player_question,
                 'currentItemIndex': current_item_index,
                 'totalItems': total_items
             }, broadcast=True)
@@ -1569,17 +1637,17 @@ def handle_select_question(data):
             print(f"Question selected: Category {category_position}, Value {question_value} (Ordering Game)")
             print("Players forwarded to ordering game interface")
         # Check if this is a geo guesser question
-        elif session_question.question.question_type == 'gg':
-            # Get the location data for this question
-            from models.game import GeoGuessrLocation
-            location = GeoGuessrLocation.query.filter_by(question_id=session_question.question.id).first()
+        elif question_dict['question_type'] == 'gg':
+            # Location data of this question
+            location_data = bundle['location']
 
-            if not location:
+            if not location_data:
                 emit('error', {'message': 'No location found for this geo_guessr question'})
                 return
 
             # Update game state in database
             print("Updating game state in database for geo_guessr...")
+            game_state_store.reset()
             game_state = GameState.query.first()
             if not game_state:
                 game_state = GameState(is_active=True, active_game='geo_guessr')
@@ -1598,8 +1666,8 @@ def handle_select_question(data):
             # Create game instance with location and media URL
             geo_game = GeoGuessrGame(
                 socketio,
-                location_data=location.to_dict(),
-                media_url=session_question.question.media_url
+                location_data=location_data,
+                media_url=question_dict['media_url']
             )
 
             # Set as active game
@@ -1607,13 +1675,17 @@ def handle_select_question(data):
 
             # Initialize the game
             geo_game.initialize()
+            game_manager.publish_active_game('geo_guessr', {
+                'location_data': location_data,
+                'media_url': question_dict['media_url']
+            })
 
             # Forward players to geo_guessr page
             emit('forward_to_geo_guessr', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
-                'questionData': question_dict
+                'question': question_dict['question_text'],
+                'questionData': player_question
             }, broadcast=True)
 
             # Trigger display redirect
@@ -1622,17 +1694,17 @@ def handle_select_question(data):
             print(f"Question selected: Category {category_position}, Value {question_value} (GeoGuessr)")
             print("Players and display forwarded to geo_guessr interface")
         # Check if this is a match me question
-        elif session_question.question.question_type == 'mm':
-            # Get the category data for this question
-            from models.game import MatchMeCategory
-            category = MatchMeCategory.query.filter_by(question_id=session_question.question.id).first()
+        elif question_dict['question_type'] == 'mm':
+            # Match Me category of this question
+            match_me_category_id = bundle['match_me_category_id']
 
-            if not category:
+            if not match_me_category_id:
                 emit('error', {'message': 'No category found for this match_me question'})
                 return
 
             # Update game state in database
             print("Updating game state in database for match_me...")
+            game_state_store.reset()
             game_state = GameState.query.first()
             if not game_state:
                 game_state = GameState(is_active=True, active_game='match_me')
@@ -1651,8 +1723,8 @@ def handle_select_question(data):
             # Create game instance with category ID and question text
             match_me_game = MatchMeGame(
                 socketio,
-                category_id=category.id,
-                question_text=session_question.question.question_text
+                category_id=match_me_category_id,
+                question_text=question_dict['question_text']
             )
 
             # Set as active game
@@ -1660,32 +1732,31 @@ def handle_select_question(data):
 
             # Initialize the game
             match_me_game.initialize()
+            game_manager.publish_active_game('match_me', {
+                'category_id': match_me_category_id,
+                'question_text': question_dict['question_text']
+            })
 
             # Emit question_selected for Admin Panel and Players (but not Display)
             # This prevents the display from showing the standard question card before redirecting
             question_data = {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
+                'question': question_dict['question_text'],
                 'answer': answer_to_display,
                 'questionData': question_dict,
                 'currentItemIndex': current_item_index,
                 'totalItems': total_items
             }
             
-            emit('question_selected', question_data, room='admin')
-            
-            # Send to all players individually
-            users = User.query.filter(User.username != 'admin').all()
-            for user in users:
-                emit('question_selected', question_data, room=user.username)
+            emit_to_rooms(socketio, 'question_selected', question_data, ADMIN_ROOM, PLAYERS_ROOM)
 
             # Forward players to match_me page
             emit('forward_to_match_me', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
-                'questionData': question_dict
+                'question': question_dict['question_text'],
+                'questionData': player_question
             }, broadcast=True)
 
             # Trigger display redirect
@@ -1694,9 +1765,10 @@ def handle_select_question(data):
             print(f"Question selected: Category {category_position}, Value {question_value} (MatchMe)")
             print("Players and display forwarded to match_me interface")
         # Check if this is a puzzle question
-        elif session_question.question.question_type == 'puzzle':
+        elif question_dict['question_type'] == 'puzzle':
             # Update game state in database
             print("Updating game state in database for coop_puzzle...")
+            game_state_store.reset()
             game_state = GameState.query.first()
             if not game_state:
                 game_state = GameState(is_active=True, active_game='coop_puzzle')
@@ -1715,7 +1787,7 @@ def handle_select_question(data):
             # Create game instance with media URL from question
             puzzle_game = CoopPuzzleGame(
                 socketio,
-                media_url=session_question.question.media_url
+                media_url=question_dict['media_url']
             )
 
             # Set as active game
@@ -1723,13 +1795,16 @@ def handle_select_question(data):
 
             # Initialize the game
             puzzle_game.initialize()
+            game_manager.publish_active_game('coop_puzzle', {
+                'media_url': question_dict['media_url']
+            })
 
             # Forward players to coop_puzzle page
             emit('forward_to_coop_puzzle', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
-                'questionData': question_dict
+                'question': question_dict['question_text'],
+                'questionData': player_question
             }, broadcast=True)
 
             # Trigger display redirect
@@ -1738,7 +1813,7 @@ def handle_select_question(data):
             print(f"Question selected: Category {category_position}, Value {question_value} (Puzzle)")
             print("Players and display forwarded to coop_puzzle interface")
         # Check if this is a price guesser question
-        elif session_question.question.question_type == 'pg':
+        elif question_dict['question_type'] == 'pg':
             # Initialize price_guesser game (registers socket events)
             print("Initializing price_guesser game...")
             game_manager.start_game('price_guesser')
@@ -1747,14 +1822,14 @@ def handle_select_question(data):
             emit('forward_to_price_guesser', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
-                'questionData': question_dict
+                'question': question_dict['question_text'],
+                'questionData': player_question
             }, broadcast=True)
 
             # Trigger product selection in price_guesser game
             # This event will now be received because we just registered the handlers
             emit('pg_question_selected', {
-                'question_text': session_question.question.question_text
+                'question_text': question_dict['question_text']
             })
 
             # Trigger display redirect
@@ -1763,17 +1838,17 @@ def handle_select_question(data):
             print(f"Question selected: Category {category_position}, Value {question_value} (Price Guesser)")
             print("Display forwarded to price guesser interface")
         # Check if this is a This or That question
-        elif session_question.question.question_type == 'tt':
+        elif question_dict['question_type'] == 'tt':
             # Emit question_selected for admin panel and game board display
-            emit('question_selected', {
+            emit_to_everyone(socketio, 'question_selected', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
+                'question': question_dict['question_text'],
                 'answer': answer_to_display,
                 'questionData': question_dict,
                 'currentItemIndex': current_item_index,
                 'totalItems': total_items
-            }, broadcast=True)
+            })
 
             # Initialize This or That (registers socket events)
             print("Initializing This or That...")
@@ -1783,59 +1858,59 @@ def handle_select_question(data):
             emit('forward_to_sorting_game', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
-                'questionData': question_dict
+                'question': question_dict['question_text'],
+                'questionData': player_question
             }, broadcast=True)
 
             # Game is initialized, waiting for admin to click "Start Game"
             print(f"Question selected: Category {category_position}, Value {question_value} (This or That)")
             print("Players forwarded to This or That interface, waiting for admin to start")
         # Check if this is a multiple choice question
-        elif session_question.question.question_type == 'mc':
-            emit('question_selected', {
+        elif question_dict['question_type'] == 'mc':
+            emit_to_everyone(socketio, 'question_selected', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
+                'question': question_dict['question_text'],
                 'answer': answer_to_display,
                 'questionData': question_dict,
                 'currentItemIndex': current_item_index,
                 'totalItems': total_items
-            }, broadcast=True)
+            })
 
             emit('forward_to_mc', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
-                'questionData': question_dict
+                'question': question_dict['question_text'],
+                'questionData': player_question
             }, broadcast=True)
 
             print(f"Question selected: Category {category_position}, Value {question_value} (Multiple Choice)")
             print("Players forwarded to multiple choice interface")
         # Check if this question expects input from players
-        elif session_question.question.input_expected:
+        elif question_dict['input_expected']:
             print(f"DEBUG: Checking input question routing:")
-            print(f"  - movie_id: {session_question.question.movie_id}")
-            print(f"  - question_type from DB model: '{session_question.question.question_type}' (type: {type(session_question.question.question_type)})")
-            print(f"  - question_type == 'ac': {session_question.question.question_type == 'ac'}")
+            print(f"  - movie_id: {question_dict['movie_id']}")
+            print(f"  - question_type from DB model: '{question_dict['question_type']}' (type: {type(question_dict['question_type'])})")
+            print(f"  - question_type == 'ac': {question_dict['question_type'] == 'ac'}")
 
             # Emit question_selected for game board display
-            emit('question_selected', {
+            emit_to_everyone(socketio, 'question_selected', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
+                'question': question_dict['question_text'],
                 'answer': answer_to_display,
                 'questionData': question_dict,
                 'currentItemIndex': current_item_index,
                 'totalItems': total_items
-            }, broadcast=True)
+            })
 
             # Check if this is a movie question - forward to movie_guesser page
-            if session_question.question.movie_id:
+            if question_dict['movie_id']:
                 emit('forward_to_movie_guesser', {
                     'category': category_position,
                     'value': question_value,
-                    'question': session_question.question.question_text,
-                    'questionData': question_dict,
+                    'question': question_dict['question_text'],
+                    'questionData': player_question,
                     'currentItemIndex': current_item_index,
                     'totalItems': total_items
                 }, broadcast=True)
@@ -1843,12 +1918,12 @@ def handle_select_question(data):
                 print(f"Question selected: Category {category_position}, Value {question_value} (Movie Question)")
                 print("Players forwarded to movie guesser interface")
             # Check if this is a Top 5 auto-complete question (question_type = 'ac')
-            elif session_question.question.question_type == 'ac':
+            elif question_dict['question_type'] == 'ac':
                 emit('forward_to_top_5', {
                     'category': category_position,
                     'value': question_value,
-                    'question': session_question.question.question_text,
-                    'questionData': question_dict,
+                    'question': question_dict['question_text'],
+                    'questionData': player_question,
                     'previousGuesses': []  # Empty for new question
                 }, broadcast=True)
 
@@ -1859,35 +1934,35 @@ def handle_select_question(data):
                 emit('forward_to_input', {
                     'category': category_position,
                     'value': question_value,
-                    'question': session_question.question.question_text,
-                    'questionData': question_dict
+                    'question': question_dict['question_text'],
+                    'questionData': player_question
                 }, broadcast=True)
 
                 print(f"Question selected: Category {category_position}, Value {question_value} (Input Expected)")
                 print("Players forwarded to question input interface")
         else:
             # Check if this question type should use buzzer
-            question_type = session_question.question.question_type
+            question_type = question_dict['question_type']
             buzzer_question_types = ['text', 'image', 'audio', 'video', 'silhouette', 'fg']
 
             # Emit question_selected for game board display
-            emit('question_selected', {
+            emit_to_everyone(socketio, 'question_selected', {
                 'category': category_position,
                 'value': question_value,
-                'question': session_question.question.question_text,
+                'question': question_dict['question_text'],
                 'answer': answer_to_display,
                 'questionData': question_dict,
                 'currentItemIndex': current_item_index,
                 'totalItems': total_items
-            }, broadcast=True)
+            })
 
             if question_type in buzzer_question_types:
                 # Forward players to buzzer interface for these question types
                 emit('forward_to_buzzer', {
                     'category': category_position,
                     'value': question_value,
-                    'question': session_question.question.question_text,
-                    'questionData': session_question.question.to_dict()
+                    'question': question_dict['question_text'],
+                    'questionData': bundle['display']
                 }, broadcast=True)
                 print(f"Question selected: Category {category_position}, Value {question_value} (Type: {question_type})")
                 print("Players forwarded to buzzer interface")
@@ -1903,11 +1978,13 @@ def handle_select_question(data):
 @socketio.on('next_item')
 def handle_next_item():
     """Handle admin navigation to next item/group in question with multiple item_order values"""
-    global current_question_data, current_item_index, total_items
-
     if 'username' not in session or session['username'] != 'admin':
         return
 
+    current_question_data = round_state.get('current_question_data')
+    current_item_index = round_state.get('current_item_index')
+    total_items = round_state.get('total_items')
+
     # Check if question has items with multiple distinct item_order values
     if not current_question_data or total_items <= 1:
         emit('error', {'message': 'No items to navigate'})
@@ -1920,6 +1997,7 @@ def handle_next_item():
 
     # Increment index
     current_item_index += 1
+    round_state.set('current_item_index', current_item_index)
     print(f"Moving to item {current_item_index + 1}/{total_items}")
 
     # Emit update to all clients
@@ -1933,11 +2011,13 @@ def handle_next_item():
 @socketio.on('previous_item')
 def handle_previous_item():
     """Handle admin navigation to previous item/group in question with multiple item_order values"""
-    global current_question_data, current_item_index, total_items
-
     if 'username' not in session or session['username'] != 'admin':
         return
 
+    current_question_data = round_state.get('current_question_data')
+    current_item_index = round_state.get('current_item_index')
+    total_items = round_state.get('total_items')
+
     # Check if question has items with multiple distinct item_order values
     if not current_question_data or total_items <= 1:
         emit('error', {'message': 'No items to navigate'})
@@ -1950,6 +2030,7 @@ def handle_previous_item():
 
     # Decrement index
     current_item_index -= 1
+    round_state.set('current_item_index', current_item_index)
     print(f"Moving to item {current_item_index + 1}/{total_items}")
 
     # Emit update to all clients
@@ -1963,16 +2044,16 @@ def handle_previous_item():
 @socketio.on('request_input_question')
 def handle_request_input_question():
     """Send current input question to a player who just connected"""
-    global current_question_data
-
     if 'username' not in session or session['username'] == 'admin':
         return
 
+    current_question_data = round_state.get('current_question_data')
+
     # If there's a current question and it expects input, send it
     if current_question_data and current_question_data.get('input_expected'):
         emit('question_selected', {
             'question': current_question_data.get('question_text'),
-            'questionData': current_question_data
+            'questionData': question_serializer.get(current_question_data.get('id'), 'player')
         })
         print(f"Sent current input question to {session['username']}")
 
@@ -1980,15 +2061,15 @@ def handle_request_input_question():
 @socketio.on('request_mc_question')
 def handle_request_mc_question():
     """Send current MC question to a player who just connected"""
-    global current_question_data
-
     if 'username' not in session or session['username'] == 'admin':
         return
 
+    current_question_data = round_state.get('current_question_data')
+
     if current_question_data and current_question_data.get('question_type') == 'mc':
         emit('forward_to_mc', {
             'question': current_question_data.get('question_text'),
-            'questionData': current_question_data
+            'questionData': question_serializer.get(current_question_data.get('id'), 'player')
         })
         print(f"Sent current MC question to {session['username']}")
 
@@ -2304,20 +2385,16 @@ def handle_close_input_round(data):
             return
 
         # Add usernames to results
+        usernames = user_directory.usernames({r['user_id'] for r in results['user_results']})
         for user_result in results['user_results']:
-            user = User.query.filter_by(id=user_result['user_id']).first()
-            if user:
-                user_result['username'] = user.username
+            if user_result['user_id'] in usernames:
+                user_result['username'] = usernames[user_result['user_id']]
 
         # Award points to winners/correct answerers
+        awarded = []  # (user_result, points) for every scored answer
         if results['input_type'] == 'guess':
             # Award points to all winners (closest guesses)
-            for user_result in results['user_results']:
-                if user_result.get('is_winner'):
-                    user = User.query.filter_by(id=user_result['user_id']).first()
-                    if user:
-                        user.overall_score += 1
-                        user_result['new_score'] = user.overall_score
+            awarded = [(r, 1) for r in results['user_results'] if r.get('is_winner')]
         elif results['input_type'] == 'movie':
             # Award points based on round (early guesses get more points)
             for user_result in results['user_results']:
@@ -2334,22 +2411,25 @@ def handle_close_input_round(data):
                     else:
                         points = 0  # No points for rounds beyond 5
 
-                    user = User.query.filter_by(id=user_result['user_id']).first()
-                    if user:
-                        user.overall_score += points
-                        user_result['new_score'] = user.overall_score
-                        user_result['points_earned'] = points  # Add to results for display
+                    user_result['points_earned'] = points  # Add to results for display
+                    awarded.append((user_result, points))
         else:
             # Award points to all correct answers (normal text questions)
-            for user_result in results['user_results']:
-                if user_result.get('is_correct'):
-                    user = User.query.filter_by(id=user_result['user_id']).first()
-                    if user:
-                        user.overall_score += 1
-                        user_result['new_score'] = user.overall_score
+            awarded = [(r, 1) for r in results['user_results'] if r.get('is_correct')]
+
+        # Apply all score changes in one UPDATE
+        awarded = [(r, points) for r, points in awarded if r['user_id'] in usernames]
+        deltas = {}
+        for user_result, points in awarded:
+            deltas[user_result['user_id']] = deltas.get(user_result['user_id'], 0) + points
+        user_directory.increment_scores(deltas)
 
         db.session.commit()
 
+        new_scores = user_directory.scores({r['user_id'] for r, _ in awarded})
+        for user_result, _ in awarded:
+            user_result['new_score'] = new_scores.get(user_result['user_id'], 0)
+
         # Broadcast results to all clients
         emit('input_question_results', results, broadcast=True)
 
@@ -2364,8 +2444,8 @@ def handle_close_input_round(data):
 @socketio.on('reveal_top_5')
 def handle_reveal_top_5(data):
     """Handle admin revealing Top 5 results and calculating scores"""
-    from models.game import Question, AnswerExpected, AnswerUser
-    from answer_handler import AnswerHandler
+    from models.game import Question
+    from top5_scoring import score_top_5_question
 
     print(f"DEBUG: reveal_top_5 handler called with data: {data}")
 
@@ -2377,103 +2457,23 @@ def handle_reveal_top_5(data):
         question_id = int(data['question_id'])
         print(f"DEBUG: Revealing Top 5 results for question {question_id}")
 
-        # Get question and expected answers
+        # Get question
         question = Question.query.filter_by(id=question_id).first()
         if not question:
             emit('error', {'message': 'Question not found'})
             return
 
-        expected_answers = AnswerExpected.query.filter_by(question_id=question_id).all()
-        if not expected_answers:
-            emit('error', {'message': 'No expected answers found'})
+        # Score all submissions against all expected answers in one pass
+        scoring = score_top_5_question(question_id, db.session)
+        if 'error' in scoring:
+            emit('error', {'message': scoring['error']})
             return
 
-        # Get all player submissions for this question
-        all_submissions = AnswerUser.query.filter_by(question_id=question_id).all()
-
-        # Normalize expected answers for comparison
-        expected_normalized = {ans.rank: ans.answer_normalized for ans in expected_answers}
-
-        # Organize submissions by player
-        player_results = {}
-        for submission in all_submissions:
-            user_id = submission.user_id
-            if user_id not in player_results:
-                player_results[user_id] = {
-                    'user_id': user_id,
-                    'guesses': []
-                }
-
-            # Check if this answer matches any expected answer using fuzzy matching
-            is_correct = False
-            matched_rank = None
-
-            for rank, expected_norm in expected_normalized.items():
-                is_match, similarity, matched_text = AnswerHandler.calculate_text_correctness(
-                    submission.answer_normalized,
-                    [expected_norm]
-                )
-
-                if is_match:
-                    is_correct = True
-                    matched_rank = rank
-                    break
-
-            # Add guess to player's results
-            player_results[user_id]['guesses'].append({
-                'answer_raw': submission.answer_raw,
-                'answer_normalized': submission.answer_normalized,
-                'is_correct': is_correct,
-                'matched_rank': matched_rank,
-                'round': submission.round
-            })
-
-            # Update is_correct in database
-            submission.is_correct = is_correct
-
-        # Add username and calculate correct_count for each player
-        for user_id, result in player_results.items():
-            user = User.query.filter_by(id=user_id).first()
-            if user:
-                result['username'] = user.username
-                result['correct_count'] = sum(1 for g in result['guesses'] if g['is_correct'])
-                result['points_earned'] = 0
-
-        # Find the highest correct_count
-        max_correct = max((r.get('correct_count', 0) for r in player_results.values()), default=0)
-
-        # Award 1 point only to player(s) with the highest correct_count
-        if max_correct > 0:
-            for user_id, result in player_results.items():
-                if result.get('correct_count', 0) == max_correct:
-                    user = User.query.filter_by(id=user_id).first()
-                    if user:
-                        user.overall_score += 1
-                        result['points_earned'] = 1
-                        result['new_score'] = user.overall_score
-
-        db.session.commit()
-
         # Prepare results for broadcast
         results = {
             'question_id': question_id,
-            'expected_answers': [
-                {
-                    'rank': ans.rank,
-                    'answer_raw': ans.answer_raw,
-                    'answer_normalized': ans.answer_normalized
-                }
-                for ans in expected_answers
-            ],
-            'player_results': [
-                {
-                    'username': result['username'],
-                    'guesses': result['guesses'],
-                    'points_earned': result.get('points_earned', 0),
-                    'new_score': result.get('new_score', 0)
-                }
-                for result in player_results.values()
-            ]
+            'expected_answers': scoring['expected_answers'],
+            'player_results': scoring['player_results']
         }
 
         # Broadcast results to all clients
@@ -2482,7 +2482,7 @@ def handle_reveal_top_5(data):
         emit('top_5_results', results, broadcast=True)
 
         print(f"Top 5 results revealed for question {question_id}")
-        print(f"Total players: {len(player_results)}")
+        print(f"Total players: {len(results['player_results'])}")
 
     except Exception as e:
         print(f"Error revealing Top 5 results: {e}")
@@ -2495,23 +2495,9 @@ def handle_reveal_top_5(data):
 def handle_get_board_state():
     """Send current board state to client"""
     try:
-        # Get the configured active session
-        session_setup = get_active_session()
-        if not session_setup:
-            emit('game_board_state', {'questions': {}})
-            return
-        
-        # Build the board state
-        board_state = {'questions': {}}
-        
-        for session_category in session_setup.session_categories:
-            for session_question in session_category.selected_questions:
-                if session_question.used:
-                    key = f"{session_category.position}-{session_question.position * 100}"
-                    board_state['questions'][key] = True
-        
-        emit('game_board_state', board_state)
-        
+        # Answered from the in-memory board snapshot of the active session
+        emit('game_board_state', board_state.board_state())
+
     except Exception as e:
         print(f"Error getting board state: {e}")
         emit('game_board_state', {'questions': {}})
@@ -2564,7 +2550,7 @@ def handle_admin_reveal_question():
                 if scraping_status == 'not_started':
                     print("Price Guesser detected - starting deferred scraping now...")
                     print("Calling show_next_product() to scrape Amazon data...")
-                    # This will block for 2-4 seconds, but that's OK - happens when admin clicks
+                    # Waits for the page load in the scraper pool; the server stays responsive meanwhile
                     active_game.show_next_product()
                     print("Scraping complete!")
 
@@ -2583,13 +2569,20 @@ def handle_admin_reveal_question():
 @socketio.on('buzzer_buzz')
 def handle_buzzer_buzz():
     """Handle player buzzing in"""
-    global current_buzzed_player, current_question_data
     if 'username' in session and session['username'] != 'admin':
         username = session['username']
-        print(f"Player {username} buzzed in")
+        accepted, buzz_queue = buzzer_arbiter.buzz(username)
 
-        # Store the buzzed player globally for scoring
-        current_buzzed_player = username
+        # Every buzz updates the ordered queue (runners-up with their delay behind the winner),
+        # shown on the admin panel and the display only
+        emit_to_rooms(socketio, 'buzzer_queue_updated', {'queue': buzz_queue}, ADMIN_ROOM, DISPLAY_ROOM)
+
+        if not accepted:
+            print(f"Player {username} buzzed in too late")
+            return
+
+        print(f"Player {username} buzzed in first")
+        current_question_data = round_state.get('current_question_data')
 
         # Broadcast to all clients that this player buzzed
         emit('buzzer_player_buzzed', {
@@ -2603,27 +2596,27 @@ def handle_buzzer_buzz():
 
         # If this is a font guesser question, auto-pause the animation
         if current_question_data and current_question_data.get('question_type') == 'fg':
-            global fg_is_running
             print("Auto-pausing font guesser animation due to buzz")
-            fg_is_running = False
+            round_state.set('fg_is_running', False)
             emit('fg_paused', broadcast=True)
 
 @socketio.on('buzzer_reset')
 def handle_buzzer_reset():
     """Handle admin resetting the buzzer"""
-    global current_buzzed_player
     if 'username' in session and session['username'] == 'admin':
         print("Admin reset the buzzer")
-        current_buzzed_player = None  # Clear the buzzed player
+        buzzer_arbiter.reset()  # Clear the buzzed player and the queue
         emit('buzzer_reset', broadcast=True)
 
 @socketio.on('buzzer_correct')
 def handle_buzzer_correct():
     """Handle admin marking answer as correct"""
-    global current_buzzed_player, current_question_data, silhouette_phase
     if 'username' in session and session['username'] == 'admin':
         print("Admin marked answer as correct")
+        current_question_data = round_state.get('current_question_data')
+        silhouette_phase = round_state.get('silhouette_phase')
 
+        current_buzzed_player = buzzer_arbiter.winner
         if current_buzzed_player:
             # Find the user and update their score
             user = User.query.filter_by(username=current_buzzed_player).first()
@@ -2656,11 +2649,11 @@ def handle_buzzer_correct():
                 }, broadcast=True)
 
                 # Clear the buzzed player
-                current_buzzed_player = None
+                buzzer_arbiter.reset()
             else:
                 print(f"User {current_buzzed_player} not found for scoring")
                 emit('buzzer_answer_correct', broadcast=True)
-                current_buzzed_player = None
+                buzzer_arbiter.reset()
         else:
             print("No buzzed player found for scoring")
             emit('buzzer_answer_correct', broadcast=True)
@@ -2668,10 +2661,12 @@ def handle_buzzer_correct():
 @socketio.on('buzzer_wrong')
 def handle_buzzer_wrong():
     """Handle admin marking answer as wrong"""
-    global current_buzzed_player, current_question_data, silhouette_phase
     if 'username' in session and session['username'] == 'admin':
         print("Admin marked answer as wrong")
+        current_question_data = round_state.get('current_question_data')
+        silhouette_phase = round_state.get('silhouette_phase')
 
+        current_buzzed_player = buzzer_arbiter.winner
         if current_buzzed_player:
             # Find the user and update their score
             user = User.query.filter_by(username=current_buzzed_player).first()
@@ -2706,11 +2701,11 @@ def handle_buzzer_wrong():
                 }, broadcast=True)
 
                 # Clear the buzzed player
-                current_buzzed_player = None
+                buzzer_arbiter.reset()
             else:
                 print(f"User {current_buzzed_player} not found for scoring")
                 emit('buzzer_answer_wrong', broadcast=True)
-                current_buzzed_player = None
+                buzzer_arbiter.reset()
         else:
             print("No buzzed player found for scoring")
             emit('buzzer_answer_wrong', broadcast=True)
@@ -2718,10 +2713,9 @@ def handle_buzzer_wrong():
 @socketio.on('silhouette_start_growth')
 def handle_silhouette_start_growth():
     """Handle admin starting silhouette growth animation"""
-    global silhouette_phase
     if 'username' in session and session['username'] == 'admin':
         print("Admin started silhouette growth")
-        silhouette_phase = 'growing'
+        round_state.set('silhouette_phase', 'growing')
         emit('silhouette_start_growth', broadcast=True)
 
 @socketio.on('silhouette_pause_growth')
@@ -2741,19 +2735,17 @@ def handle_silhouette_resume_growth():
 @socketio.on('silhouette_color_reveal_started')
 def handle_silhouette_color_reveal_started():
     """Handle notification that color reveal phase has started"""
-    global silhouette_phase
     print("Silhouette color reveal phase started")
-    silhouette_phase = 'revealing_color'
+    round_state.set('silhouette_phase', 'revealing_color')
 
 @socketio.on('silhouette_reveal')
 def handle_silhouette_reveal():
     """Handle admin revealing the silhouette answer"""
-    global silhouette_phase
     if 'username' in session and session['username'] == 'admin':
         print("Admin revealed silhouette answer")
-        silhouette_phase = 'complete'
+        round_state.set('silhouette_phase', 'complete')
         # Get answer from current question data
-        global current_question_data
+        current_question_data = round_state.get('current_question_data')
         answer_text = ""
         if current_question_data and current_question_data.get('expected_answers'):
             # Get all expected answers
@@ -2766,79 +2758,74 @@ def handle_silhouette_reveal():
             'answer': answer_text
         }, broadcast=True)
 
-# Font Guesser state
-fg_target = ''
-fg_current_chars = []
-fg_space_indices = []
-fg_is_running = False
-fg_swap_interval = 2.5
+# Font Guesser state lives in round_state (fg_target, fg_current_chars,
+# fg_space_indices, fg_is_running, fg_swap_interval)
 
-def fg_get_random_wrong_index():
+def fg_get_random_wrong_index(current_chars, target, space_indices):
     """Find a random index where current char doesn't match target (excluding spaces)"""
-    global fg_current_chars, fg_target, fg_space_indices
     wrong_indices = [
-        i for i, c in enumerate(fg_current_chars)
-        if i not in fg_space_indices and c != fg_target[i]
+        i for i, c in enumerate(current_chars)
+        if i not in space_indices and c != target[i]
     ]
     if not wrong_indices:
         return None
     return random.choice(wrong_indices)
 
-def fg_find_char_position(char, exclude_index):
+def fg_find_char_position(char, exclude_index, current_chars, target, space_indices):
     """Find where a specific character is currently located, excluding a given index.
     Only returns positions where the character is MISPLACED (not already correct),
     to avoid moving letters that are already in their final position."""
-    global fg_current_chars, fg_space_indices, fg_target
-    for i, c in enumerate(fg_current_chars):
-        if i != exclude_index and i not in fg_space_indices and c == char:
+    for i, c in enumerate(current_chars):
+        if i != exclude_index and i not in space_indices and c == char:
             # Only return this position if the character here is misplaced
             # (i.e., it doesn't match what should be at this position)
-            if c != fg_target[i]:
+            if c != target[i]:
                 return i
     return None
 
 def fg_perform_swap():
     """Pick a random wrong position and swap with the correct letter's current location"""
-    global fg_current_chars, fg_target, fg_is_running
+    target = round_state.get('fg_target')
+    current_chars = round_state.get('fg_current_chars')
+    space_indices = round_state.get('fg_space_indices')
 
-    idx_a = fg_get_random_wrong_index()
+    idx_a = fg_get_random_wrong_index(current_chars, target, space_indices)
 
     if idx_a is None:
         socketio.emit('fg_complete', {'message': 'Word revealed!'})
-        fg_is_running = False
+        round_state.set('fg_is_running', False)
         return False
 
-    needed_char = fg_target[idx_a]
-    idx_b = fg_find_char_position(needed_char, idx_a)
+    needed_char = target[idx_a]
+    idx_b = fg_find_char_position(needed_char, idx_a, current_chars, target, space_indices)
 
     if idx_b is None:
-        fg_is_running = False
+        round_state.set('fg_is_running', False)
         return False
 
-    fg_current_chars[idx_a], fg_current_chars[idx_b] = fg_current_chars[idx_b], fg_current_chars[idx_a]
+    current_chars[idx_a], current_chars[idx_b] = current_chars[idx_b], current_chars[idx_a]
+    round_state.set('fg_current_chars', current_chars)
 
-    socketio.emit('fg_swap', {
+    emit_to_everyone(socketio, 'fg_swap', {
         'indexA': idx_a,
         'indexB': idx_b
     })
 
-    print(f"Font Guesser swap: {idx_a} <-> {idx_b}, current: {''.join(fg_current_chars)}")
+    print(f"Font Guesser swap: {idx_a} <-> {idx_b}, current: {''.join(current_chars)}")
     return True
 
 def fg_game_loop():
     """Background task that triggers swaps at intervals"""
-    global fg_is_running, fg_swap_interval
-    while fg_is_running:
-        socketio.sleep(fg_swap_interval)
-        if fg_is_running:
+    # fg_is_running is re-read every tick so a pause from any worker stops the loop
+    while round_state.get('fg_is_running'):
+        socketio.sleep(round_state.get('fg_swap_interval'))
+        if round_state.get('fg_is_running'):
             if not fg_perform_swap():
                 break
 
 @socketio.on('fg_init')
 def handle_fg_init(data):
     """Initialize font guesser with target text and font URL"""
-    global fg_target, fg_current_chars, fg_space_indices, fg_is_running
-
     if 'username' not in session or session['username'] != 'admin':
         return
 
@@ -2849,44 +2836,46 @@ def handle_fg_init(data):
         print("Font Guesser: No target text provided")
         return
 
-    fg_target = target
-    fg_is_running = False
-
-    fg_space_indices = [i for i, c in enumerate(fg_target) if c == ' ']
+    space_indices = [i for i, c in enumerate(target) if c == ' ']
 
-    non_space_chars = [c for c in fg_target if c != ' ']
+    non_space_chars = [c for c in target if c != ' ']
     random.shuffle(non_space_chars)
 
-    fg_current_chars = []
+    current_chars = []
     non_space_idx = 0
-    for i, c in enumerate(fg_target):
+    for i, c in enumerate(target):
         if c == ' ':
-            fg_current_chars.append(' ')
+            current_chars.append(' ')
         else:
-            fg_current_chars.append(non_space_chars[non_space_idx])
+            current_chars.append(non_space_chars[non_space_idx])
             non_space_idx += 1
 
+    round_state.update(
+        fg_target=target,
+        fg_is_running=False,
+        fg_space_indices=space_indices,
+        fg_current_chars=current_chars
+    )
+
     emit('fg_init', {
-        'chars': fg_current_chars,
+        'chars': current_chars,
         'font_url': font_url,
-        'length': len(fg_target)
+        'length': len(target)
     }, broadcast=True)
 
-    print(f"Font Guesser initialized: target='{fg_target}', shuffled={''.join(fg_current_chars)}")
+    print(f"Font Guesser initialized: target='{target}', shuffled={''.join(current_chars)}")
 
 @socketio.on('fg_start')
 def handle_fg_start(data=None):
     """Start the font guesser swap animation"""
-    global fg_is_running, fg_target
-
     if 'username' not in session or session['username'] != 'admin':
         return
 
-    if not fg_target:
+    if not round_state.get('fg_target'):
         print("Font Guesser: No target set, cannot start")
         return
 
-    fg_is_running = True
+    round_state.set('fg_is_running', True)
     emit('fg_started', {}, broadcast=True)
     socketio.start_background_task(fg_game_loop)
     print("Font Guesser animation started")
@@ -2894,27 +2883,23 @@ def handle_fg_start(data=None):
 @socketio.on('fg_pause')
 def handle_fg_pause(data=None):
     """Pause the font guesser animation"""
-    global fg_is_running
-
     if 'username' not in session or session['username'] != 'admin':
         return
 
-    fg_is_running = False
+    round_state.set('fg_is_running', False)
     emit('fg_paused', {}, broadcast=True)
     print("Font Guesser animation paused")
 
 @socketio.on('fg_resume')
 def handle_fg_resume(data=None):
     """Resume the font guesser animation"""
-    global fg_is_running, fg_target
-
     if 'username' not in session or session['username'] != 'admin':
         return
 
-    if not fg_target:
+    if not round_state.get('fg_target'):
         return
 
-    fg_is_running = True
+    round_state.set('fg_is_running', True)
     emit('fg_resumed', {}, broadcast=True)
     socketio.start_background_task(fg_game_loop)
     print("Font Guesser animation resumed")
@@ -2922,27 +2907,26 @@ def handle_fg_resume(data=None):
 @socketio.on('fg_reveal')
 def handle_fg_reveal(data=None):
     """Reveal the final answer"""
-    global fg_is_running, fg_target, fg_current_chars
-
     if 'username' not in session or session['username'] != 'admin':
         return
 
-    fg_is_running = False
-    fg_current_chars = list(fg_target)
+    target = round_state.get('fg_target')
+    current_chars = list(target)
+    round_state.update(fg_is_running=False, fg_current_chars=current_chars)
 
     emit('fg_reveal', {
-        'answer': fg_target,
-        'chars': fg_current_chars
+        'answer': target,
+        'chars': current_chars
     }, broadcast=True)
 
-    print(f"Font Guesser answer revealed: {fg_target}")
+    print(f"Font Guesser answer revealed: {target}")
 
 @socketio.on('buzzer_reveal_answer')
 def handle_buzzer_reveal_answer():
     """Handle admin revealing the answer for any buzzer question"""
     if 'username' in session and session['username'] == 'admin':
         print("Admin revealed buzzer answer")
-        global current_question_data
+        current_question_data = round_state.get('current_question_data')
         answer_text = ""
 
         if current_question_data:
@@ -2980,17 +2964,8 @@ def handle_back_to_game_board():
         print("Admin sending players back to game board")
 
         # Clear current question data to prevent reconnection loop
-        global current_question_data, current_item_index, total_items, silhouette_phase
-        global fg_target, fg_current_chars, fg_space_indices, fg_is_running
-        current_question_data = None
-        current_item_index = 0
-        total_items = 0
-        silhouette_phase = 'idle'
-        # Reset font guesser state
-        fg_target = ''
-        fg_current_chars = []
-        fg_space_indices = []
-        fg_is_running = False
+        # (also resets the silhouette phase and the font guesser state)
+        round_state.reset(*QUESTION_FIELDS, 'silhouette_phase', *FONT_GUESSER_FIELDS)
         print("Cleared current question data")
 
         # End the current game if one is active
@@ -3002,6 +2977,7 @@ def handle_back_to_game_board():
         game_state = GameState.query.first()
         if game_state:
             game_state.active_game = None
+            game_state_store.reset()
             game_state.game_data = '{}'
             db.session.commit()
             print("Game state cleared: active_game=None")
@@ -3015,10 +2991,7 @@ def handle_admin_goto_game_board():
         print("Admin navigating to game board")
 
         # Clear current question data to prevent reconnection loop
-        global current_question_data, current_item_index, total_items
-        current_question_data = None
-        current_item_index = 0
-        total_items = 0
+        round_state.reset(*QUESTION_FIELDS)
         print("Cleared current question data")
 
         # End the current game if one is active
@@ -3031,6 +3004,7 @@ def handle_admin_goto_game_board():
         if game_state:
             game_state.is_active = True
             game_state.active_game = None
+            game_state_store.reset()
             game_state.game_data = '{}'
             db.session.commit()
             print("Game state updated: is_active=True, active_game=None")
@@ -3047,10 +3021,7 @@ def handle_admin_goto_waiting_room():
         print("Admin navigating to waiting room")
 
         # Clear current question data to prevent reconnection loop
-        global current_question_data, current_item_index, total_items
-        current_question_data = None
-        current_item_index = 0
-        total_items = 0
+        round_state.reset(*QUESTION_FIELDS)
         print("Cleared current question data")
 
         # End the current game if one is active
@@ -3063,6 +3034,7 @@ def handle_admin_goto_waiting_room():
         if game_state:
             game_state.is_active = False
             game_state.active_game = None
+            game_state_store.reset()
             game_state.game_data = '{}'
             db.session.commit()
             print("Game state updated: is_active=False, active_game=None")
@@ -3233,7 +3205,7 @@ def handle_price_guesser_calculate_results(data):
 # Spotify control functions
 def handle_spotify_control(action, track_id):
     """Handle Spotify playback control on the server"""
-    global current_spotify_track_id
+    current_spotify_track_id = round_state.get('current_spotify_track_id')
 
     try:
         client = get_spotify_client()
@@ -3268,7 +3240,7 @@ def handle_spotify_control(action, track_id):
                 try:
                     client.start_playback(uris=[track_uri])
                     print(f"Started playing new Spotify track: {track_id}")
-                    current_spotify_track_id = track_id  # Update currently playing track
+                    round_state.set('current_spotify_track_id', track_id)  # Update currently playing track
                 except spotipy.exceptions.SpotifyException as e:
                     if e.http_status == 404:
                         # Try to find and activate a device
@@ -3278,7 +3250,7 @@ def handle_spotify_control(action, track_id):
                             print(f"Trying to activate device: {device_id}")
                             client.start_playback(device_id=device_id, uris=[track_uri])
                             print(f"Started playing Spotify track on device: {track_id}")
-                            current_spotify_track_id = track_id  # Update currently playing track
+                            round_state.set('current_spotify_track_id', track_id)  # Update currently playing track
                         else:
                             raise
                     else:
@@ -3292,7 +3264,7 @@ def handle_spotify_control(action, track_id):
         elif action == 'stop':
             # Stop playback and clear the current track (next play will start from beginning)
             client.pause_playback()
-            current_spotify_track_id = None
+            round_state.set('current_spotify_track_id', None)
             print("Stopped Spotify playback (track cleared)")
             
     except spotipy.exceptions.SpotifyException as e:
@@ -3311,27 +3283,19 @@ def handle_spotify_control(action, track_id):
 # Game-specific SocketIO events are implemented in their respective game modules
 
 if __name__ == '__main__':
-    # Reset game state on server start
-    with app.app_context():
-        # Find existing game state or create new one
-        game_state = GameState.query.first()
-        if game_state:
-            # Reset to inactive state
-            game_state.is_active = False
-            game_state.active_game = None
-            db.session.commit()
-            print("Game state reset to inactive on server start")
-        else:
-            # Create a new game state if none exists
-            initial_state = GameState(is_active=False)
-            db.session.add(initial_state)
-            db.session.commit()
-            print("New inactive game state created on server start")
-    
+    # Development server. Production runs gunicorn with wsgi.py (see gunicorn.conf.py),
+    # after bootstrap.py has prepared the database once.
+    create_schema(app)
+    reset_game_state(app)
+    start_background_tasks()
+
+    debug = os.getenv('FLASK_DEBUG', '0') == '1'
+    port = int(os.getenv('PORT', '5000'))
+
     # Start the server
     print("\n" + "="*60)
-    print("Starting server on port 5000...")
-    print("Access the application at: http://192.168.178.75:5000")
+    print(f"Starting server on port {port}...")
+    print(f"Access the application at: http://192.168.178.75:{port}")
     print("Spotify Web API control is fully supported over HTTP")
     print("="*60 + "\n")
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True)
+    socketio.run(app, host='0.0.0.0', port=port, debug=debug, use_reloader=debug)
@@ -0,0 +1,166 @@
+"""
+Price Extraction Benchmark
+==========================
+
+Measures price_extraction.py against the product pages in
+fixtures/amazon_pages, without touching Amazon. manifest.json holds the
+expected price, image and winning strategy of every page, and its source:
+'recorded' for pages saved from Amazon.de with --record, 'reconstructed' for
+pages rebuilt by hand from the Amazon.de markup (trimmed to the head, image,
+price and buy box sections) to cover a layout no recorded page has yet.
+
+For each strategy on its own it reports how many pages it finds a price on,
+how many of those prices are correct and the extraction time per page; then
+the same for the full strategy chain used by the scraper. Use it to decide
+which strategies SCRAPER_PRICE_STRATEGIES should keep.
+
+    python benchmark_price_extraction.py
+    python benchmark_price_extraction.py --repeat 500
+
+Record new pages (saved with the scraper's browser settings; the manifest
+entry is filled from the current extraction and marked unverified, check the
+price against the product page by hand):
+
+    python benchmark_price_extraction.py --record B0CQVMZBBG B07XJ8C8F5
+"""
+
+import argparse
+import json
+import os
+import time
+
+from price_extraction import PRICE_STRATEGIES, extract_price_details
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'amazon_pages')
+MANIFEST_FILE = 'manifest.json'
+
+
+def load_fixtures(fixtures_dir):
+    """Return [(name, html, expected)] for every page listed in the manifest"""
+    with open(os.path.join(fixtures_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    fixtures = []
+    for name, expected in manifest.items():
+        with open(os.path.join(fixtures_dir, name), encoding='utf-8') as f:
+            fixtures.append((name, f.read(), expected))
+    return fixtures
+
+
+def price_matches(price, expected_price):
+    if price is None or expected_price is None:
+        return price is None and expected_price is None
+    return abs(price - expected_price) < 0.005
+
+
+def measure(fixtures, strategies, repeat):
+    """Run the extraction over all fixtures; returns (found, correct, mean µs per page, details per page)"""
+    found = 0
+    correct = 0
+    elapsed = 0.0
+    details = {}
+
+    for name, html, expected in fixtures:
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            result = extract_price_details(html, strategies)
+        elapsed += time.perf_counter() - started_at
+
+        details[name] = result
+        if result['price'] is not None:
+            found += 1
+            if price_matches(result['price'], expected.get('price')):
+                correct += 1
+
+    mean_us = elapsed / (repeat * len(fixtures)) * 1e6 if fixtures else 0.0
+    return found, correct, mean_us, details
+
+
+def run_benchmark(fixtures_dir, repeat):
+    fixtures = load_fixtures(fixtures_dir)
+    with_price = sum(1 for _, _, expected in fixtures if expected.get('price') is not None)
+    recorded = sum(1 for _, _, expected in fixtures if expected.get('source') == 'recorded')
+    print(f"{len(fixtures)} fixture page(s) ({recorded} recorded, {len(fixtures) - recorded} reconstructed), "
+          f"{with_price} with a price, {repeat} run(s) each\n")
+
+    print(f"{'strategy':<14}{'found':>8}{'correct':>9}{'µs/page':>10}")
+    for strategy in PRICE_STRATEGIES:
+        found, correct, mean_us, _ = measure(fixtures, (strategy,), repeat)
+        print(f"{strategy:<14}{found:>8}{correct:>9}{mean_us:>10.1f}")
+
+    found, correct, mean_us, details = measure(fixtures, PRICE_STRATEGIES, repeat)
+    print(f"{'full chain':<14}{found:>8}{correct:>9}{mean_us:>10.1f}\n")
+
+    # Per-page check of the full chain against the manifest
+    failures = 0
+    for name, _, expected in fixtures:
+        result = details[name]
+        problems = []
+        if not price_matches(result['price'], expected.get('price')):
+            problems.append(f"price {result['price']} != {expected.get('price')}")
+        if result['image_url'] != expected.get('image_url'):
+            problems.append(f"image {result['image_url']} != {expected.get('image_url')}")
+        if 'strategy' in expected and result['strategy'] != expected['strategy']:
+            problems.append(f"strategy {result['strategy']} != {expected['strategy']}")
+
+        if problems:
+            failures += 1
+            print(f"MISMATCH {name}: {'; '.join(problems)}")
+    print(f"{len(fixtures) - failures}/{len(fixtures)} page(s) match the manifest")
+
+
+def record_pages(fixtures_dir, asins):
+    """Save product pages as fixtures, loaded with the same browser settings as the scraper"""
+    from playwright.sync_api import sync_playwright
+    from amazon_scraper import AMAZON_BASE_URL, BROWSER_ARGS, CONTEXT_OPTIONS, MASK_WEBDRIVER_SCRIPT
+
+    manifest_path = os.path.join(fixtures_dir, MANIFEST_FILE)
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=BROWSER_ARGS)
+        context = browser.new_context(**CONTEXT_OPTIONS)
+        context.add_init_script(MASK_WEBDRIVER_SCRIPT)
+        page = context.new_page()
+
+        for asin in asins:
+            page.goto(f'{AMAZON_BASE_URL}/dp/{asin}', wait_until='domcontentloaded', timeout=30000)
+            page.wait_for_timeout(500)
+            html = page.content()
+
+            name = f'{asin}.html'
+            with open(os.path.join(fixtures_dir, name), 'w', encoding='utf-8') as f:
+                f.write(html)
+
+            result = extract_price_details(html)
+            manifest[name] = {
+                'price': result['price'],
+                'image_url': result['image_url'],
+                'strategy': result['strategy'],
+                'source': 'recorded',
+                'verified': False
+            }
+            print(f"Recorded {name}: price={result['price']} ({result['strategy']})")
+
+        browser.close()
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark price extraction on recorded Amazon pages")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="Fixture folder with manifest.json")
+    parser.add_argument('--repeat', type=int, default=200, help="Extractions per page and strategy")
+    parser.add_argument('--record', nargs='+', metavar='ASIN', help="Record product pages as new fixtures")
+    args = parser.parse_args()
+
+    if args.record:
+        record_pages(args.fixtures, args.record)
+    else:
+        run_benchmark(args.fixtures, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
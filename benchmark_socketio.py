@@ -0,0 +1,446 @@
+"""
+Socket.IO Load Test
+===================
+
+Simulates a game night against a real server and measures it: N player
+clients plus the admin panel and the display connect over Socket.IO and play
+
+    start_platform -> for each round:
+        select_question (buzzer)   -> every player buzzer_buzz   -> buzzer_reset
+        select_question (input)    -> every player submit_answer -> close_input_round
+        select_question (Top 5)    -> every player submit_top_5_answer -> reveal_top_5
+
+For every step it reports p50/p95/p99 round-trip latency (emit until the
+reply event arrives at the sender) and, for admin actions, the broadcast
+fan-out latency (emit until each player has the broadcast). The display
+connects with the display role, so the events sent to the display room are
+timed as well: the buzzes (the buzz queue goes to the admin panel and the
+display only) and the admin actions the display shows. Events per second
+counts every emitted and received event of a run.
+
+Each run repeats the scenario for every transport configuration (see
+socketio_test_configs.py for the server side of the same options).
+
+By default the script seeds a fresh SQLite database and starts its own server
+for every configuration:
+
+    python benchmark_socketio.py --players 30 --rounds 3
+    python benchmark_socketio.py --server gunicorn --configs websocket_only
+
+To benchmark against a local MySQL stand-in, point DATABASE_URL at it (the
+benchmark session is added next to the existing data). To load-test a server
+that is already running (and already has a session with buzzer, input and
+Top 5 questions in categories 1-3), pass its URL:
+
+    python benchmark_socketio.py --url http://localhost:5000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+import socketio
+
+BENCHMARK_SESSION_NAME = "benchmark"
+
+# Client transports per configuration
+TRANSPORT_CONFIGS = {
+    'default': ['polling', 'websocket'],   # Polling first, then upgrade to WebSocket
+    'polling_only': ['polling'],
+    'websocket_only': ['websocket']
+}
+
+# Server events the simulated clients listen for
+REPLY_EVENTS = [
+    'game_ended', 'display_refresh', 'user_joined',
+    'question_selected', 'forward_to_buzzer', 'forward_to_input', 'forward_to_top_5',
+    'buzzer_queue_updated', 'buzzer_player_buzzed', 'buzzer_reset',
+    'answer_submitted', 'input_answer_received', 'input_question_results',
+    'top_5_answer_submitted', 'top_5_answer_received', 'top_5_results',
+    'error'
+]
+
+# Category positions of the seeded session
+BUZZER_CATEGORY = 1
+INPUT_CATEGORY = 2
+TOP_5_CATEGORY = 3
+
+TOP_5_ANSWERS = ['Germany', 'France', 'Italy', 'Spain', 'Poland']
+
+
+# ============================================================================
+# Database seeding
+# ============================================================================
+def seed_database(rounds):
+    """Create tables and a session with one buzzer, input and Top 5 question per round"""
+    from flask import Flask
+    from db import db, init_db, create_schema, reset_game_state
+    from models.game import (
+        GameState, Category, Question, AnswerExpected,
+        SessionSetup, SessionCategory, SessionQuestion
+    )
+
+    app = Flask(__name__)
+    init_db(app)
+    create_schema(app)
+    reset_game_state(app)
+
+    with app.app_context():
+        old_session = SessionSetup.query.filter_by(name=BENCHMARK_SESSION_NAME).first()
+        if old_session:
+            db.session.delete(old_session)
+            db.session.commit()
+
+        setup = SessionSetup(name=BENCHMARK_SESSION_NAME)
+        db.session.add(setup)
+
+        specs = [
+            (BUZZER_CATEGORY, 'Benchmark Buzzer', 'text', False),
+            (INPUT_CATEGORY, 'Benchmark Input', 'text', False),
+            (TOP_5_CATEGORY, 'Benchmark Top 5', 'ac', True)
+        ]
+        for position, name, question_type, is_top_5 in specs:
+            category = Category(name=name)
+            db.session.add(category)
+            session_category = SessionCategory(session=setup, category=category, position=position)
+            db.session.add(session_category)
+
+            for round_num in range(1, rounds + 1):
+                question = Question(
+                    question_text=f"{name} question {round_num}",
+                    answer='Berlin' if not is_top_5 else ', '.join(TOP_5_ANSWERS),
+                    difficulty=round_num,
+                    question_type=question_type,
+                    input_expected=position != BUZZER_CATEGORY,
+                    category=category
+                )
+                db.session.add(question)
+
+                if is_top_5:
+                    for rank, answer in enumerate(TOP_5_ANSWERS, start=1):
+                        db.session.add(AnswerExpected(
+                            question=question, input_type='ac', hint='Country',
+                            answer_raw=answer, answer_normalized=answer.lower(), rank=rank
+                        ))
+                elif position == INPUT_CATEGORY:
+                    db.session.add(AnswerExpected(
+                        question=question, input_type='normal', hint='City',
+                        answer_raw='Berlin', answer_normalized='berlin'
+                    ))
+
+                db.session.add(SessionQuestion(
+                    session_category=session_category, question=question, position=round_num
+                ))
+
+        db.session.flush()
+        game_state = GameState.query.first()
+        game_state.active_session_id = setup.id
+        db.session.commit()
+        print(f"Seeded benchmark session with {rounds} round(s)")
+
+
+# ============================================================================
+# Server process
+# ============================================================================
+def start_server(server, port, env):
+    """Start the app (development server or gunicorn) and wait until it answers HTTP"""
+    if server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+    else:
+        command = [sys.executable, 'app.py']
+
+    process = subprocess.Popen(
+        command,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            requests.get(f"{base_url}/login", timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.25)
+
+    process.terminate()
+    raise RuntimeError("Server did not start within 60 seconds")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# ============================================================================
+# Simulated clients
+# ============================================================================
+class Waiter:
+    """One expected server event; records when it arrived"""
+
+    def __init__(self, predicate=None):
+        self.predicate = predicate
+        self.done = threading.Event()
+        self.data = None
+        self.received_at = None
+
+
+class BenchClient:
+    """A Socket.IO client (player, admin or display) that can wait for server events"""
+
+    def __init__(self, name, transports):
+        self.name = name
+        self.transports = transports
+        self.sio = socketio.Client(reconnection=False)
+        self.sent = 0
+        self.received = 0
+        self._waiters = defaultdict(list)
+        self._lock = threading.Lock()
+
+        for event in REPLY_EVENTS:
+            self.sio.on(event, self._make_handler(event))
+
+    def _make_handler(self, event):
+        def handler(*args):
+            received_at = time.perf_counter()
+            data = args[0] if args else None
+            with self._lock:
+                self.received += 1
+                for waiter in list(self._waiters[event]):
+                    if waiter.predicate is None or waiter.predicate(data):
+                        waiter.data = data
+                        waiter.received_at = received_at
+                        waiter.done.set()
+                        self._waiters[event].remove(waiter)
+        return handler
+
+    def login(self, base_url):
+        """Log in over HTTP like the browser does; returns the session cookie header"""
+        http = requests.Session()
+        http.post(f"{base_url}/login", data={'username': self.name}, allow_redirects=False, timeout=10)
+        cookie = http.cookies.get('session')
+        if not cookie:
+            raise RuntimeError(f"Login failed for {self.name}")
+        return {'Cookie': f"session={cookie}"}
+
+    def connect(self, base_url, role=None):
+        """Connect as a logged-in user, or without a login for role='display' (joins the display room)"""
+        if role:
+            self.sio.connect(base_url, auth={'role': role}, transports=self.transports, wait_timeout=10)
+        else:
+            self.sio.connect(base_url, headers=self.login(base_url), transports=self.transports, wait_timeout=10)
+
+    def disconnect(self):
+        if self.sio.connected:
+            self.sio.disconnect()
+
+    def expect(self, event, predicate=None):
+        """Register interest in an event before triggering it"""
+        waiter = Waiter(predicate)
+        with self._lock:
+            self._waiters[event].append(waiter)
+        return waiter
+
+    def emit(self, event, data=None):
+        self.sent += 1
+        if data is None:
+            self.sio.emit(event)
+        else:
+            self.sio.emit(event, data)
+        return time.perf_counter()
+
+
+class LatencyRecorder:
+    """Collects latency samples (ms) and timeouts per step name"""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.samples = defaultdict(list)
+        self.timeouts = defaultdict(int)
+
+    def collect(self, name, started_at, waiter):
+        if waiter.done.wait(self.timeout):
+            self.samples[name].append((waiter.received_at - started_at) * 1000)
+            return waiter.data
+        self.timeouts[name] += 1
+        return None
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+# ============================================================================
+# Scenario
+# ============================================================================
+def admin_step(recorder, admin, players, name, event, data, reply, fan_out=None, display=None):
+    """Admin emits an event; measure the admin's reply and the broadcast reaching every player
+    (and the display, if given)"""
+    admin_waiter = admin.expect(reply)
+    player_waiters = [player.expect(fan_out or reply) for player in players]
+    display_waiter = display.expect(fan_out or reply) if display else None
+
+    started_at = admin.emit(event, data)
+
+    result = recorder.collect(name, started_at, admin_waiter)
+    for waiter in player_waiters:
+        recorder.collect(f"{name} (fan-out)", started_at, waiter)
+    if display_waiter:
+        recorder.collect(f"{name} (display)", started_at, display_waiter)
+    return result
+
+
+def player_step(recorder, players, name, event, make_data, reply, predicate=None, observer=None):
+    """Every player emits an event at once; measure each player's own reply
+    (or, with an observer, the event reaching the observer, e.g. the display)"""
+    pending = []
+    for player in players:
+        waiter = (observer or player).expect(reply, predicate(player) if predicate else None)
+        pending.append((player.emit(event, make_data(player)), waiter))
+
+    for started_at, waiter in pending:
+        recorder.collect(name, started_at, waiter)
+
+
+def play_round(recorder, admin, display, players, round_num):
+    value = round_num * 100
+
+    # Buzzer question: everyone buzzes, first buzz wins, every buzz updates the queue
+    # (sent to the admin panel and the display only, so the buzz is timed until the display has it)
+    admin_step(recorder, admin, players, 'select_question', 'select_question',
+               {'category': BUZZER_CATEGORY, 'value': value}, 'question_selected', display=display)
+    player_step(recorder, players, 'buzzer_buzz (display)', 'buzzer_buzz', lambda player: None,
+                'buzzer_queue_updated',
+                predicate=lambda player: lambda data: any(entry['username'] == player.name for entry in data['queue']),
+                observer=display)
+    admin_step(recorder, admin, players, 'buzzer_reset', 'buzzer_reset', None, 'buzzer_reset', display=display)
+
+    # Input question: everyone answers, admin closes the round
+    selected = admin_step(recorder, admin, players, 'select_question', 'select_question',
+                          {'category': INPUT_CATEGORY, 'value': value}, 'question_selected')
+    if selected:
+        question_id = selected['questionData']['id']
+        player_step(recorder, players, 'submit_answer', 'submit_answer',
+                    lambda player: {'question_id': question_id, 'answer': 'Berlin' if hash(player.name) % 2 else 'Bern', 'round': 1},
+                    'answer_submitted')
+        admin_step(recorder, admin, players, 'close_input_round', 'close_input_round',
+                   {'question_id': question_id}, 'input_question_results', display=display)
+
+    # Top 5 question: everyone submits two guesses, admin reveals
+    selected = admin_step(recorder, admin, players, 'select_question', 'select_question',
+                          {'category': TOP_5_CATEGORY, 'value': value}, 'question_selected')
+    if selected:
+        question_id = selected['questionData']['id']
+        for guess in range(2):
+            player_step(recorder, players, 'submit_top_5_answer', 'submit_top_5_answer',
+                        lambda player: {'question_id': question_id, 'answer': TOP_5_ANSWERS[(hash(player.name) + guess) % 5]},
+                        'top_5_answer_submitted')
+        admin_step(recorder, admin, players, 'reveal_top_5', 'reveal_top_5',
+                   {'question_id': question_id}, 'top_5_results', display=display)
+
+
+def run_scenario(base_url, transports, player_count, rounds, timeout):
+    """Play the whole scenario once; returns (recorder, events, elapsed seconds)"""
+    recorder = LatencyRecorder(timeout)
+    admin = BenchClient('admin', transports)
+    display = BenchClient('display', transports)
+    players = [BenchClient(f"bench_player_{i:03d}", transports) for i in range(1, player_count + 1)]
+    clients = [admin, display] + players
+
+    try:
+        for client in clients:
+            started_at = time.perf_counter()
+            client.connect(base_url, role='display' if client is display else None)
+            recorder.samples['connect'].append((time.perf_counter() - started_at) * 1000)
+
+        started_at = time.perf_counter()
+        admin_step(recorder, admin, players, 'start_platform', 'start_platform', None, 'game_ended')
+        for round_num in range(1, rounds + 1):
+            play_round(recorder, admin, display, players, round_num)
+        elapsed = time.perf_counter() - started_at
+    finally:
+        for client in clients:
+            client.disconnect()
+
+    events = sum(client.sent + client.received for client in clients)
+    return recorder, events, elapsed
+
+
+def print_report(config_name, recorder, events, elapsed):
+    print(f"\n=== {config_name} ===")
+    print(f"{'step':<34}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'timeouts':>10}")
+    for name, values in recorder.samples.items():
+        print(f"{name:<34}{len(values):>7}{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}"
+              f"{percentile(values, 99):>10.1f}{recorder.timeouts.get(name, 0):>10}")
+    for name, count in recorder.timeouts.items():
+        if name not in recorder.samples:
+            print(f"{name:<34}{0:>7}{'-':>10}{'-':>10}{'-':>10}{count:>10}")
+    print(f"Events/sec: {events / elapsed:.1f} ({events} events in {elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO load test simulating a game night")
+    parser.add_argument('--players', type=int, default=20, help="Number of simulated players")
+    parser.add_argument('--rounds', type=int, default=3, help="Question rounds per category")
+    parser.add_argument('--configs', default=','.join(TRANSPORT_CONFIGS),
+                        help=f"Comma-separated transport configs ({', '.join(TRANSPORT_CONFIGS)})")
+    parser.add_argument('--url', help="Benchmark an already running server instead of starting one")
+    parser.add_argument('--server', choices=['app', 'gunicorn'], default='app',
+                        help="How to start the server: development server (app.py) or gunicorn")
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--timeout', type=float, default=10.0, help="Seconds to wait for each reply")
+    args = parser.parse_args()
+
+    config_names = [name.strip() for name in args.configs.split(',') if name.strip()]
+    unknown = [name for name in config_names if name not in TRANSPORT_CONFIGS]
+    if unknown:
+        parser.error(f"Unknown config(s): {', '.join(unknown)}")
+
+    env = dict(os.environ)
+    if not args.url:
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.gettempdir(), 'web_game_benchmark.db')}")
+        env.update({'PORT': str(args.port), 'FLASK_DEBUG': '0', 'LOG_LEVEL': 'warning', 'REDIS_URL': ''})
+        # db.py reads DATABASE_URL at import time
+        os.environ['DATABASE_URL'] = env['DATABASE_URL']
+        print(f"Database: {env['DATABASE_URL']}")
+
+    for config_name in config_names:
+        process = None
+        try:
+            if args.url:
+                base_url = args.url.rstrip('/')
+            else:
+                # Fresh data and a fresh server per configuration
+                seed_database(args.rounds)
+                process, base_url = start_server(args.server, args.port, env)
+
+            recorder, events, elapsed = run_scenario(
+                base_url, TRANSPORT_CONFIGS[config_name], args.players, args.rounds, args.timeout
+            )
+            print_report(f"{config_name} ({args.players} players, {args.rounds} rounds)", recorder, events, elapsed)
+        finally:
+            if process:
+                stop_server(process)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Board State
+
+Snapshot of the active session's game board, held in memory.
+
+get_active_session used to resolve the session with up to three queries on
+every call, and building the board state then lazy-loaded session_categories
+and selected_questions one relationship at a time. The snapshot resolves the
+active session once, loads its categories and questions with selectinload and
+answers get_board_state and position lookups from memory.
+
+The snapshot is dropped after a commit that changed the board:
+SessionQuestion.used (or any session question/category/session row) or
+GameState.active_session_id, detected through mapper events. Bulk updates
+bypass those events and call board_state.invalidate_on_commit() themselves. In
+multi-worker mode (REDIS_URL) a version counter in Redis tells the other
+workers to reload as well.
+"""
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session, selectinload
+import threading
+
+from models.game import Category, GameState, SessionCategory, SessionQuestion, SessionSetup
+from db import db
+from state_backend import get_redis, redis_key
+
+ACTIVE_SESSION_NAME = "playtest"  # Fallback default session name
+
+
+class _BoardSnapshot:
+    """Immutable board of one session: positions, ids and used questions"""
+
+    def __init__(self, session_setup):
+        self.session_id = session_setup.id
+        self.session_name = session_setup.name
+        self.category_ids = {}  # {category position: SessionCategory.id}
+        self.question_ids = {}  # {(category position, value): SessionQuestion.id}
+        self.used = set()       # {"category-value"} of used questions
+
+        for session_category in session_setup.session_categories:
+            self.category_ids[session_category.position] = session_category.id
+            for session_question in session_category.selected_questions:
+                value = session_question.position * 100
+                self.question_ids[(session_category.position, value)] = session_question.id
+                if session_question.used:
+                    self.used.add(f"{session_category.position}-{value}")
+
+    def board_state(self):
+        """Payload of the game_board_state event"""
+        return {'questions': {key: True for key in self.used}}
+
+
+class BoardStateCache:
+    def __init__(self):
+        self._snapshot = None
+        self._loaded = False
+        self._version = None
+        self._lock = threading.Lock()
+        self._redis = get_redis()
+        self._version_key = redis_key('board_state:version')
+
+    def _remote_version(self):
+        return self._redis.get(self._version_key) if self._redis is not None else None
+
+    @staticmethod
+    def invalidate_on_commit(session):
+        """Drop the snapshot once this database session commits (e.g. after a bulk update)"""
+        session.info['board_state_changed'] = True
+
+    def mark_changed(self, target):
+        """Called by the mapper events for changed board rows"""
+        session = object_session(target)
+        if session is not None:
+            self.invalidate_on_commit(session)
+
+    def invalidate(self):
+        """Drop the snapshot (on every worker); it is reloaded on the next lookup"""
+        with self._lock:
+            self._snapshot = None
+            self._loaded = False
+        if self._redis is not None:
+            self._redis.incr(self._version_key)
+
+    @staticmethod
+    def _resolve_active_session_id():
+        """Active session id from the game state, else ACTIVE_SESSION_NAME, else the first session"""
+        row = db.session.query(GameState.active_session_id).first()
+        if row and row.active_session_id:
+            if db.session.query(SessionSetup.id).filter_by(id=row.active_session_id).first():
+                return row.active_session_id
+
+        row = db.session.query(SessionSetup.id).filter_by(name=ACTIVE_SESSION_NAME).first()
+        if not row:
+            row = db.session.query(SessionSetup.id).first()
+        return row.id if row else None
+
+    def get(self):
+        """The board snapshot of the active session, or None if there is no session.
+        Must be called inside an application context."""
+        version = self._remote_version()
+        with self._lock:
+            if self._loaded and version == self._version:
+                return self._snapshot
+
+            session_id = self._resolve_active_session_id()
+            snapshot = None
+            if session_id is not None:
+                session_setup = SessionSetup.query.options(
+                    selectinload(SessionSetup.session_categories).selectinload(SessionCategory.selected_questions)
+                ).get(session_id)
+                if session_setup:
+                    snapshot = _BoardSnapshot(session_setup)
+
+            self._snapshot = snapshot
+            self._loaded = True
+            self._version = version
+            return snapshot
+
+    def active_session(self, *options):
+        """The active SessionSetup (one primary key query), with optional loader options"""
+        snapshot = self.get()
+        if snapshot is None:
+            return None
+        query = SessionSetup.query.options(*options) if options else SessionSetup.query
+        return query.get(snapshot.session_id)
+
+    def active_session_with_board(self):
+        """The active SessionSetup with its categories and session questions loaded up front
+        (the questions come from question_serialization.session_board_dict)"""
+        return self.active_session(
+            selectinload(SessionSetup.session_categories).joinedload(SessionCategory.category).load_only(Category.name),
+            selectinload(SessionSetup.session_categories).selectinload(SessionCategory.selected_questions)
+        )
+
+    def board_state(self):
+        snapshot = self.get()
+        return snapshot.board_state() if snapshot else {'questions': {}}
+
+
+# Create singleton instance
+board_state = BoardStateCache()
+
+
+@event.listens_for(SessionSetup, 'after_insert')
+@event.listens_for(SessionSetup, 'after_delete')
+@event.listens_for(SessionCategory, 'after_insert')
+@event.listens_for(SessionCategory, 'after_update')
+@event.listens_for(SessionCategory, 'after_delete')
+@event.listens_for(SessionQuestion, 'after_insert')
+@event.listens_for(SessionQuestion, 'after_update')
+@event.listens_for(SessionQuestion, 'after_delete')
+def board_rows_changed(mapper, connection, target):
+    board_state.mark_changed(target)
+
+
+@event.listens_for(GameState, 'after_insert')
+@event.listens_for(GameState, 'after_update')
+def active_session_changed(mapper, connection, target):
+    # game_data is written often; only a session switch changes the board
+    if inspect(target).attrs.active_session_id.history.has_changes():
+        board_state.mark_changed(target)
+
+
+@event.listens_for(Session, 'after_commit')
+def board_state_committed(session):
+    if session.info.pop('board_state_changed', False):
+        board_state.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def board_state_rolled_back(session):
+    session.info.pop('board_state_changed', None)
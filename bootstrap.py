@@ -0,0 +1,35 @@
+"""
+One-time startup tasks, run before the server workers start:
+
+    python bootstrap.py
+
+Creates missing tables, runs the schema migrations and resets the game state
+to inactive. In multi-worker mode (REDIS_URL) it also clears the shared round
+and game state left in Redis by the previous run.
+"""
+
+from flask import Flask
+
+from db import init_db, create_schema, reset_game_state
+from state_backend import multi_worker_enabled
+
+
+def main():
+    app = Flask(__name__)
+    init_db(app)
+    create_schema(app)
+    reset_game_state(app)
+
+    if multi_worker_enabled():
+        from round_state import round_state
+        from game_state_store import game_state_store
+        from player_state_store import player_state_store
+
+        round_state.reset()
+        game_state_store.invalidate()
+        player_state_store.discard()
+        print("Cleared shared round and game state in Redis")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Buzzer Arbiter
+
+First-buzz-wins arbitration for buzzer questions.
+
+Every buzz is stamped with a monotonic server receive time as soon as it
+arrives. The first buzz after a reset wins (compare-and-set under a lock);
+later buzzes are kept in an ordered queue together with their delay behind
+the winner so admin and display can show the runners-up. Nothing here touches
+the database.
+
+In multi-worker mode (REDIS_URL) RedisBuzzerArbiter does the same
+compare-and-set in a Lua script, stamping buzzes with the Redis server clock
+so buzzes received by different workers are ordered on one timeline.
+"""
+
+from dataclasses import dataclass
+import threading
+import time
+
+from state_backend import get_redis, redis_key
+
+
+@dataclass
+class BuzzEntry:
+    username: str
+    received_ns: int  # time.monotonic_ns() when the server received the buzz
+
+
+class BuzzerArbiter:
+    def __init__(self, is_open=True):
+        self._lock = threading.Lock()
+        self._entries = []
+        self._is_open = is_open
+
+    def buzz(self, username):
+        """Register a buzz.
+
+        Returns (accepted, queue): accepted is True only for the winning buzz,
+        queue is the ordered buzz list (see queue()). Repeated buzzes from a
+        player already in the queue are ignored.
+        """
+        received_ns = time.monotonic_ns()
+        with self._lock:
+            if not self._is_open or any(e.username == username for e in self._entries):
+                return False, self._queue_locked()
+
+            self._entries.append(BuzzEntry(username=username, received_ns=received_ns))
+            accepted = len(self._entries) == 1
+            return accepted, self._queue_locked()
+
+    @property
+    def winner(self):
+        """Username of the player who buzzed first, or None"""
+        with self._lock:
+            return self._entries[0].username if self._entries else None
+
+    def queue(self):
+        """Ordered buzz list: [{'username', 'position', 'delta_ms'}] where delta_ms is the gap to the winner"""
+        with self._lock:
+            return self._queue_locked()
+
+    def _queue_locked(self):
+        return self._format_queue(self._entries)
+
+    @staticmethod
+    def _format_queue(entries):
+        if not entries:
+            return []
+        first_ns = entries[0].received_ns
+        return [
+            {
+                'username': entry.username,
+                'position': position,
+                'delta_ms': round((entry.received_ns - first_ns) / 1_000_000, 3)
+            }
+            for position, entry in enumerate(entries, 1)
+        ]
+
+    def reset(self):
+        """Clear the queue and accept buzzes again"""
+        with self._lock:
+            self._entries = []
+            self._is_open = True
+
+    def close(self):
+        """Stop accepting buzzes (the queue is kept)"""
+        with self._lock:
+            self._is_open = False
+
+
+# KEYS: queue list, members set, closed flag. ARGV: username.
+# Returns {accepted (1/0), queue entries "username|microseconds"}.
+_BUZZ_SCRIPT = """
+local accepted = 0
+if redis.call('EXISTS', KEYS[3]) == 0 and redis.call('SADD', KEYS[2], ARGV[1]) == 1 then
+    local now = redis.call('TIME')
+    local entry = ARGV[1] .. '|' .. now[1] .. string.format('%06d', tonumber(now[2]))
+    if redis.call('RPUSH', KEYS[1], entry) == 1 then
+        accepted = 1
+    end
+end
+return {accepted, redis.call('LRANGE', KEYS[1], 0, -1)}
+"""
+
+
+class RedisBuzzerArbiter(BuzzerArbiter):
+    """First-buzz-wins arbitration shared by all workers"""
+
+    def __init__(self, client, name='buzzer', is_open=True):
+        self.client = client
+        self.queue_key = redis_key(f'{name}:queue')
+        self.members_key = redis_key(f'{name}:members')
+        self.closed_key = redis_key(f'{name}:closed')
+        self._buzz = client.register_script(_BUZZ_SCRIPT)
+        if not is_open:
+            self.client.set(self.closed_key, 1)
+
+    @staticmethod
+    def _parse(raw_entries):
+        entries = []
+        for raw in raw_entries:
+            username, micros = raw.rsplit('|', 1)
+            entries.append(BuzzEntry(username=username, received_ns=int(micros) * 1000))
+        return entries
+
+    def buzz(self, username):
+        accepted, raw_entries = self._buzz(keys=[self.queue_key, self.members_key, self.closed_key], args=[username])
+        return bool(accepted), self._format_queue(self._parse(raw_entries))
+
+    @property
+    def winner(self):
+        first = self.client.lindex(self.queue_key, 0)
+        return first.rsplit('|', 1)[0] if first else None
+
+    def queue(self):
+        return self._format_queue(self._parse(self.client.lrange(self.queue_key, 0, -1)))
+
+    def reset(self):
+        self.client.delete(self.queue_key, self.members_key, self.closed_key)
+
+    def close(self):
+        self.client.set(self.closed_key, 1)
+
+
+def create_buzzer_arbiter(name='buzzer', is_open=True):
+    """Arbiter for this deployment: Redis-backed in multi-worker mode, in-process otherwise"""
+    client = get_redis()
+    if client is not None:
+        return RedisBuzzerArbiter(client, name=name, is_open=is_open)
+    return BuzzerArbiter(is_open=is_open)
@@ -0,0 +1,12 @@
+"""
+Shared pytest setup
+
+db.py reads DATABASE_URL when it is first imported, so the tests point it at
+a throwaway SQLite file here, before any test module imports the app or the
+models (the MySQL server from var.env is never touched).
+"""
+
+import os
+import tempfile
+
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_web_game.db')}"
@@ -4,7 +4,7 @@ Create a new game session featuring all media questions
 """
 
 from app import app
-from db import db
+from db import db, create_schema
 from models.game import Category, Question, SessionSetup, SessionCategory, SessionQuestion
 
 def create_media_session():
@@ -148,5 +148,6 @@ def update_api_to_use_media_session():
             print(f"To:     session = SessionSetup.query.get({media_session.id})")
 
 if __name__ == "__main__":
+    create_schema(app)
     create_media_session()
     update_api_to_use_media_session()
\ No newline at end of file
@@ -16,22 +16,65 @@ MYSQL_PORT = os.getenv('MYSQL_PORT')
 MYSQL_SERVER = os.getenv('MYSQL_SERVER')
 MYSQL_TABLE_USERS = os.getenv('MYSQL_TABLE_USERS')
 
+# Full SQLAlchemy URL overriding the MySQL settings above, e.g.
+# sqlite:////tmp/web_game.db for the load-test benchmark (benchmark_socketio.py)
+DATABASE_URL = os.getenv('DATABASE_URL') or None
+
 def init_db(app):
-    connector_string = f"mysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
+    connector_string = DATABASE_URL or f"mysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
     app.config['SQLALCHEMY_DATABASE_URI'] = connector_string
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     db.init_app(app)
 
+
+def create_schema(app):
+    """Create missing tables and run the migrations.
+
+    Called by bootstrap.py, the __main__ block of app.py and the seed and
+    maintenance scripts, instead of on every import of app, so forked server
+    workers don't each run create_all and the migrations.
+    """
+    # Importing the models registers their tables for create_all
+    import models.user, models.game  # noqa: F401
+
     with app.app_context():
         db.create_all()
         # Run migrations for schema updates
         run_migrations()
 
 
+def reset_game_state(app):
+    """Reset the game state to inactive on server start.
+
+    Only for server start (bootstrap.py, the __main__ block of app.py): the seed
+    and maintenance scripts may run during a game and must leave it active.
+    """
+    from models.game import GameState
+
+    with app.app_context():
+        game_state = GameState.query.first()
+        if game_state:
+            # Reset to inactive state
+            game_state.is_active = False
+            game_state.active_game = None
+            db.session.commit()
+            print("Game state reset to inactive on server start")
+        else:
+            # Create a new game state if none exists
+            initial_state = GameState(is_active=False)
+            db.session.add(initial_state)
+            db.session.commit()
+            print("New inactive game state created on server start")
+
+
 def run_migrations():
     """Run database migrations for schema updates"""
     from sqlalchemy import text
 
+    # The migrations only patch old MySQL schemas; create_all builds other databases complete
+    if db.engine.dialect.name != 'mysql':
+        return
+
     # Migration: Add active_session_id column to game_state table
     try:
         # Check if column exists
@@ -0,0 +1,232 @@
+"""
+Game State Store
+
+Process-local, authoritative copy of GameState.game_data.
+
+Games read and mutate the game data through this store instead of running
+GameState.query.first() + json.loads/json.dumps on every call. The data is
+written back to MySQL in the background on a configurable cadence
+(GAME_STATE_FLUSH_INTERVAL in var.env, seconds) and explicitly at phase
+boundaries (round start/end, end_game) via flush().
+
+In multi-worker mode (REDIS_URL) the data lives in a Redis hash instead,
+one field per top-level key, so update() keeps its dict.update semantics
+across workers.
+"""
+
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+import json
+import os
+import threading
+
+from state_backend import get_redis, redis_key, try_lock, release_lock
+
+load_dotenv('var.env')
+GAME_STATE_FLUSH_INTERVAL = float(os.getenv('GAME_STATE_FLUSH_INTERVAL', '2.0'))
+
+
+@dataclass
+class GameStateSnapshot:
+    """In-memory mirror of the game_data column."""
+    data: dict = field(default_factory=dict)
+    version: int = 0           # Bumped on every mutation
+    flushed_version: int = 0   # Last version written to the database
+    loaded: bool = False       # True once the row has been read from the database
+
+    @property
+    def dirty(self):
+        return self.version != self.flushed_version
+
+
+class GameStateStore:
+    def __init__(self, flush_interval=GAME_STATE_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._state = GameStateSnapshot()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _copy(data):
+        # JSON round-trip keeps the exact semantics callers had with the
+        # database column (string keys, lists instead of tuples) and hands
+        # out a private copy that can be mutated freely.
+        return json.loads(json.dumps(data))
+
+    def _ensure_loaded(self):
+        """Load game_data from the database the first time it is needed"""
+        if self._state.loaded:
+            return
+
+        from models.game import GameState
+
+        game_state = GameState.query.first()
+        data = json.loads(game_state.game_data) if game_state and game_state.game_data else {}
+        self._state = GameStateSnapshot(data=data, loaded=True)
+
+    def get(self):
+        """Return a copy of the current game data"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._copy(self._state.data)
+
+    def update(self, data):
+        """Merge data into the game data (same semantics as dict.update)"""
+        with self._lock:
+            self._ensure_loaded()
+            self._state.data.update(self._copy(data))
+            self._state.version += 1
+
+    def reset(self, data=None):
+        """Replace the game data, e.g. when a new game or question starts"""
+        with self._lock:
+            self._state.data = self._copy(data) if data else {}
+            self._state.loaded = True
+            self._state.version += 1
+
+    def invalidate(self):
+        """Forget the in-memory copy so the next access reloads from the database"""
+        with self._lock:
+            self._state = GameStateSnapshot()
+
+    def flush(self):
+        """Write the game data back to the database if it changed.
+
+        Must be called inside an application context. Returns True if a write happened.
+        """
+        from models.game import GameState
+        from db import db
+
+        with self._lock:
+            if not self._state.loaded or not self._state.dirty:
+                return False
+            state = self._state
+            payload = json.dumps(state.data)
+            version = state.version
+
+        try:
+            game_state = GameState.query.first()
+            if not game_state:
+                return False
+            game_state.game_data = payload
+            db.session.commit()
+        except Exception as e:
+            print(f"GameStateStore: Error flushing game state: {e}")
+            db.session.rollback()
+            return False
+
+        with self._lock:
+            # Anything mutated while we were writing stays dirty for the next flush
+            state.flushed_version = max(state.flushed_version, version)
+        return True
+
+
+class RedisGameStateStore(GameStateStore):
+    """Game data shared by all workers through Redis"""
+
+    def __init__(self, client, flush_interval=GAME_STATE_FLUSH_INTERVAL):
+        super().__init__(flush_interval)
+        self.client = client
+        self.data_key = redis_key('game_state:data')
+        self.loaded_key = redis_key('game_state:loaded')
+        self.version_key = redis_key('game_state:version')
+        self.flushed_key = redis_key('game_state:flushed_version')
+
+    @staticmethod
+    def _encode(data):
+        return {key: json.dumps(value) for key, value in data.items()}
+
+    def _ensure_loaded(self):
+        """Seed Redis from the database once; the first worker to get here wins"""
+        if self.client.exists(self.loaded_key):
+            return
+
+        from models.game import GameState
+        import redis
+
+        game_state = GameState.query.first()
+        data = json.loads(game_state.game_data) if game_state and game_state.game_data else {}
+
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(self.loaded_key)
+                if pipe.exists(self.loaded_key):
+                    return
+                pipe.multi()
+                pipe.delete(self.data_key)
+                if data:
+                    pipe.hset(self.data_key, mapping=self._encode(data))
+                pipe.set(self.loaded_key, 1)
+                pipe.execute()
+            except redis.WatchError:
+                pass  # Another worker loaded it first
+
+    def get(self):
+        self._ensure_loaded()
+        return {key: json.loads(value) for key, value in self.client.hgetall(self.data_key).items()}
+
+    def update(self, data):
+        self._ensure_loaded()
+        if not data:
+            return
+        pipe = self.client.pipeline()
+        pipe.hset(self.data_key, mapping=self._encode(data))
+        pipe.incr(self.version_key)
+        pipe.execute()
+
+    def reset(self, data=None):
+        pipe = self.client.pipeline()
+        pipe.delete(self.data_key)
+        if data:
+            pipe.hset(self.data_key, mapping=self._encode(data))
+        pipe.set(self.loaded_key, 1)
+        pipe.incr(self.version_key)
+        pipe.execute()
+
+    def invalidate(self):
+        self.client.delete(self.loaded_key, self.data_key)
+
+    def flush(self):
+        """Write the shared game data back to the database (one worker at a time)"""
+        from models.game import GameState
+        from db import db
+
+        token = try_lock(self.client, 'game_state_flush', int(max(self.flush_interval, 1) * 5000))
+        if not token:
+            return False
+
+        try:
+            pipe = self.client.pipeline()
+            pipe.exists(self.loaded_key)
+            pipe.get(self.version_key)
+            pipe.get(self.flushed_key)
+            pipe.hgetall(self.data_key)
+            loaded, version, flushed, raw = pipe.execute()
+            if not loaded or int(version or 0) == int(flushed or 0):
+                return False
+
+            payload = json.dumps({key: json.loads(value) for key, value in raw.items()})
+            try:
+                game_state = GameState.query.first()
+                if not game_state:
+                    return False
+                game_state.game_data = payload
+                db.session.commit()
+            except Exception as e:
+                print(f"GameStateStore: Error flushing game state: {e}")
+                db.session.rollback()
+                return False
+
+            # Only the lock holder writes this, so it never goes backwards
+            self.client.set(self.flushed_key, int(version or 0))
+            return True
+        finally:
+            release_lock(self.client, 'game_state_flush', token)
+
+
+def create_game_state_store():
+    client = get_redis()
+    return RedisGameStateStore(client) if client is not None else GameStateStore()
+
+
+# Create singleton instance
+game_state_store = create_game_state_store()
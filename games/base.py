@@ -1,8 +1,9 @@
 from flask import session
-from models.game import GameState
-from models.user import User
 from db import db
-import json
+from game_state_store import game_state_store
+from player_state_store import player_state_store
+from socket_rooms import ADMIN_ROOM, DISPLAY_ROOM, PLAYERS_ROOM, emit_to_rooms
+from user_directory import user_directory
 
 class BaseGame:
     def __init__(self, socketio):
@@ -19,43 +20,35 @@ class BaseGame:
         """Register SocketIO event handlers specific to this game"""
         pass
     
+    def restore_from_state(self):
+        """Rebuild in-process attributes from the shared game state.
+        Called when another worker started this game (multi-worker mode)."""
+        pass
+    
     def update_game_state(self, data):
-        """Update the game state in the database"""
-        game_state = GameState.query.first()
-        if game_state:
-            current_data = json.loads(game_state.game_data) if game_state.game_data else {}
-            current_data.update(data)
-            game_state.game_data = json.dumps(current_data)
-            db.session.commit()
+        """Update the game state (in memory, written to the database in the background)"""
+        game_state_store.update(data)
     
     def get_game_state(self):
-        """Get the game state from the database"""
-        game_state = GameState.query.first()
-        if game_state and game_state.game_data:
-            return json.loads(game_state.game_data)
-        return {}
+        """Get the game state from the in-memory store"""
+        return game_state_store.get()
+
+    def persist_game_state(self):
+        """Write the game state to the database now (called at phase boundaries)"""
+        game_state_store.flush()
+        player_state_store.flush()
     
     def update_player_score(self, username, game_type, score_change):
         """Update a player's score for a specific game"""
-        user = User.query.filter_by(username=username).first()
-        if user:
-            if game_type == 'match_me':
-                user.match_me_score += score_change
-            elif game_type == 'geo_guessr':
-                user.geo_guessr_score += score_change
-            elif game_type == 'flappy_birds':
-                user.flappy_birds_score += score_change
-            elif game_type == 'buzzer':
-                user.buzzer_score += score_change
-            
+        column = f'{game_type}_score'
+        if game_type in ('match_me', 'geo_guessr', 'flappy_birds', 'buzzer'):
+            user_directory.increment_scores_by_username({username: score_change}, column)
             db.session.commit()
     
     def award_overall_point(self, username):
         """Award a point to the overall score for a player"""
-        user = User.query.filter_by(username=username).first()
-        if user:
-            user.overall_score += 1
-            db.session.commit()
+        user_directory.increment_scores_by_username({username: 1})
+        db.session.commit()
     
     def end_game(self):
         """End the current game session"""
@@ -63,6 +56,8 @@ class BaseGame:
         
         # Determine winner based on game-specific logic
         self.determine_winner()
+
+        self.persist_game_state()
     
     def determine_winner(self):
         """Determine the winner of the game and award points
@@ -70,12 +65,12 @@ class BaseGame:
         pass
     
     def emit_to_display(self, event, data):
-        """Send an event to the game display"""
-        self.socketio.emit(event, data, broadcast=True)
+        """Send an event to the game display (and the admin panel, which mirrors it)"""
+        emit_to_rooms(self.socketio, event, data, DISPLAY_ROOM, ADMIN_ROOM)
     
     def emit_to_admin(self, event, data):
         """Send an event to the admin"""
-        self.socketio.emit(event, data, room='admin')
+        self.socketio.emit(event, data, room=ADMIN_ROOM)
     
     def emit_to_player(self, username, event, data):
         """Send an event to a specific player"""
@@ -83,4 +78,8 @@ class BaseGame:
     
     def emit_to_all_players(self, event, data):
         """Send an event to all players"""
-        self.socketio.emit(event, data, broadcast=True)
+        emit_to_rooms(self.socketio, event, data, PLAYERS_ROOM)
+
+    def emit_to_rooms(self, event, data, *rooms):
+        """Send an event to the given audience rooms (see socket_rooms.py)"""
+        emit_to_rooms(self.socketio, event, data, *rooms)
@@ -1,4 +1,5 @@
 from games.base import BaseGame
+from buzzer_arbiter import create_buzzer_arbiter
 from models.user import User
 from db import db
 from flask import session
@@ -10,11 +11,15 @@ class BuzzerGame(BaseGame):
         self.game_name = "buzzer"
         self.buzzer_active = False
         self.current_buzzed_player = None
+        self.arbiter = create_buzzer_arbiter('buzzer_game')
     
     def initialize(self):
         """Initialize the Buzzer game"""
         super().initialize()
         
+        # No buzzes until the admin starts the buzzer
+        self.arbiter.close()
+        
         # Reset player scores for this game
         users = User.query.all()
         for user in users:
@@ -73,6 +78,7 @@ class BuzzerGame(BaseGame):
         self.is_active = True
         self.buzzer_active = True
         self.current_buzzed_player = None
+        self.arbiter.reset()
         
         self.update_game_state({
             'status': 'active',
@@ -90,6 +96,7 @@ class BuzzerGame(BaseGame):
         """Reset the buzzer after a player has buzzed"""
         self.buzzer_active = True
         self.current_buzzed_player = None
+        self.arbiter.reset()
         
         self.update_game_state({
             'buzzer_active': True,
@@ -104,10 +111,13 @@ class BuzzerGame(BaseGame):
     
     def player_buzz(self, username):
         """Handle a player buzzing in"""
-        game_state = self.get_game_state()
+        # The arbiter decides who was first without touching the database
+        accepted, buzz_queue = self.arbiter.buzz(username)
+        
+        # Runners-up only update the buzz queue shown to admin and display
+        self.emit_to_display('buzzer_queue_updated', {'queue': buzz_queue})
         
-        # Only accept buzzes if buzzer is active and no one has buzzed yet
-        if not game_state.get('buzzer_active', False) or game_state.get('current_buzzed_player'):
+        if not accepted:
             return
         
         # Record the buzz
@@ -137,7 +147,7 @@ class BuzzerGame(BaseGame):
     def mark_answer_correct(self):
         """Mark the current buzzed player's answer as correct"""
         game_state = self.get_game_state()
-        username = game_state.get('current_buzzed_player')
+        username = self.arbiter.winner
         
         if not username:
             return
@@ -171,7 +181,7 @@ class BuzzerGame(BaseGame):
     def mark_answer_wrong(self):
         """Mark the current buzzed player's answer as wrong"""
         game_state = self.get_game_state()
-        username = game_state.get('current_buzzed_player')
+        username = self.arbiter.winner
         
         if not username:
             return
@@ -1,20 +1,38 @@
 from games.base import BaseGame
 from models.user import User
+from player_state_store import player_state_store
+from puzzle_tiles import PUZZLE_GRID, parse_grid, puzzle_tile_cache
+from user_directory import user_directory
 from db import db
-from flask import session
+from flask import request, session
+from flask_socketio import join_room
 import os
 import random
+import threading
+
+# Frames per second of the teammate drag relay (moves between two frames are coalesced)
+DRAG_RELAY_HZ = 20
+
+# Piece positions are relayed as integers in 1/DRAG_QUANTIZATION of the board size,
+# so they mean the same on every screen size
+DRAG_QUANTIZATION = 1000
 
 
 class CoopPuzzleGame(BaseGame):
-    def __init__(self, socketio, media_url=None):
+    def __init__(self, socketio, media_url=None, grid=None):
         super().__init__(socketio)
         self.game_name = "coop_puzzle"
-        self.rows = 5
-        self.cols = 5
+        self.rows, self.cols = parse_grid(grid, PUZZLE_GRID)  # grid like "8x8", PUZZLE_GRID in var.env by default
         self.teams = {}  # {team_id: [usernames]}
-        self.player_states = {}  # {username: {piece_id: {x, y, isLocked}}}
+        self.team_of = {}  # {username: team_id}
+        self.team_locked = {}  # {team_id: bitset of pieces locked by any member (bit n = piece n)}, rebuilt on each lock
+        self.player_locked = {}  # {username: bitset of pieces this player locked}
+        self.pending_moves = {}  # {team_id: {piece_id: [piece_id, qx, qy, username, locked]}} since the last frame
+        self.last_relayed = {}  # {team_id: {piece_id: (qx, qy, locked)}} last frame sent per piece
+        self.relay_lock = threading.Lock()
+        self.relay_running = False
         self.current_image = None  # Path to the current puzzle image
+        self.tiles = None  # Sprite sheet of the pre-cut pieces (see puzzle_tiles.py), None = clients slice the image
         self.media_url = media_url  # Media URL from question (if question-based)
 
         # Testing mode: Set to True to put all players in one team
@@ -52,6 +70,8 @@ class CoopPuzzleGame(BaseGame):
 
         # Assign teams based on player count
         self.assign_teams(users)
+        self.reset_progress()
+        player_state_store.clear(self.game_name)
 
         # Use media_url from question if provided, otherwise select random image
         if self.media_url:
@@ -64,29 +84,29 @@ class CoopPuzzleGame(BaseGame):
         else:
             self.select_random_image()
 
+        # Pre-cut pieces for the grid (cached per image and grid)
+        self.tiles = puzzle_tile_cache.get_sheet(self.current_image, self.rows, self.cols)
+
         # Initialize game state
         self.update_game_state({
             'status': 'ready',
             'teams': self.teams,
-            'player_states': self.player_states,
             'game_over': False,
             'winning_team': None,
-            'image_path': self.current_image
+            'image_path': self.current_image,
+            'rows': self.rows,
+            'cols': self.cols,
+            'tiles': self.tiles
         })
 
-        # Notify players with their team assignments and image path
-        self.emit_to_all_players('coop_puzzle_ready', {
-            'teams': self.teams,
-            'total_pieces': self.rows * self.cols,
-            'image_path': self.current_image
-        })
+        # Notify players with their team assignments, grid and image
+        self.emit_to_all_players('coop_puzzle_ready', self.puzzle_data())
 
         # Notify display
-        self.emit_to_display('coop_puzzle_init', {
-            'teams': self.teams,
-            'users': [user.to_dict() for user in users if user.username != 'admin'],
-            'image_path': self.current_image
-        })
+        self.emit_to_display('coop_puzzle_init', dict(
+            self.puzzle_data(),
+            users=[user.to_dict() for user in users if user.username != 'admin']
+        ))
 
         print(f"CoopPuzzle: Initialized with teams: {self.teams}")
 
@@ -104,8 +124,6 @@ class CoopPuzzleGame(BaseGame):
         # TEST MODE: All players in one team
         if self.test_mode_single_team:
             self.teams["team_1"] = usernames
-            for username in usernames:
-                self.player_states[username] = {}
             print(f"CoopPuzzle: TEST MODE - All {player_count} players in team_1")
             return
 
@@ -114,15 +132,12 @@ class CoopPuzzleGame(BaseGame):
             # Individual play - each player is their own team
             for i, username in enumerate(usernames):
                 self.teams[f"team_{i+1}"] = [username]
-                self.player_states[username] = {}
             print("CoopPuzzle: Individual play (< 4 players)")
 
         elif player_count == 4:
             # 2 teams of 2
             self.teams["team_1"] = usernames[:2]
             self.teams["team_2"] = usernames[2:4]
-            for username in usernames:
-                self.player_states[username] = {}
             print("CoopPuzzle: 2 teams of 2")
 
         else:
@@ -137,11 +152,34 @@ class CoopPuzzleGame(BaseGame):
                 end_idx = min(start_idx + team_size, player_count)
                 self.teams[team_id] = usernames[start_idx:end_idx]
 
-            for username in usernames:
-                self.player_states[username] = {}
-
             print(f"CoopPuzzle: {num_teams} teams of ~{team_size}")
 
+    def reset_progress(self):
+        """Start every team and player with no locked pieces"""
+        self.team_of = {username: team_id for team_id, members in self.teams.items() for username in members}
+        self.team_locked = {team_id: 0 for team_id in self.teams}
+        self.player_locked = {username: 0 for username in self.team_of}
+
+    def restore_from_state(self):
+        """Pick up the teams and locked pieces of a puzzle started on another worker"""
+        game_state = self.get_game_state()
+        self.teams = game_state.get('teams', {})
+        self.current_image = game_state.get('image_path')
+        self.rows = game_state.get('rows', self.rows)
+        self.cols = game_state.get('cols', self.cols)
+        self.tiles = game_state.get('tiles')
+        self.reset_progress()
+        if game_state.get('status') == 'active':
+            self.start_drag_relay()
+
+        for username, state in player_state_store.all(self.game_name).items():
+            team_id = self.team_of.get(username)
+            if team_id is None:
+                continue
+            locked = state.get('locked', 0)
+            self.player_locked[username] = locked
+            self.team_locked[team_id] |= locked
+
     def register_socket_events(self):
         """Register SocketIO events for Cooperative Puzzle game"""
         @self.socketio.on('coop_puzzle_start')
@@ -153,14 +191,26 @@ class CoopPuzzleGame(BaseGame):
         def handle_update_piece(data):
             username = session.get('username')
             if username and username != 'admin' and self.is_active:
-                self.update_piece_position(username, data)
+                # Final drop position for the teammates
+                self.queue_move(username, data, locked=data.get('isLocked', False))
 
-                # Only check completion and broadcast when piece is locked
+                # Only locks change progress; plain moves need no server state
                 if data.get('isLocked', False):
-                    self.broadcast_team_progress()
-                    winning_team = self.check_team_completion()
-                    if winning_team:
-                        self.handle_game_completion(winning_team)
+                    team_id = self.lock_piece(username, data.get('piece_id'))
+                    if team_id:
+                        progress = self.broadcast_team_progress(team_id)
+                        # Teammates on two workers may both lock the last pieces
+                        if (progress['pieces_locked'] == progress['total_pieces']
+                                and not self.get_game_state().get('game_over')):
+                            print(f"CoopPuzzle: {team_id} completed the puzzle!")
+                            self.handle_game_completion(team_id)
+
+        @self.socketio.on('coop_puzzle_drag')
+        def handle_drag(data):
+            """Intermediate drag position, relayed to the teammates in the next frame"""
+            username = session.get('username')
+            if username and username != 'admin' and self.is_active:
+                self.queue_move(username, data)
 
         @self.socketio.on('coop_puzzle_end')
         def handle_end(data):
@@ -171,21 +221,27 @@ class CoopPuzzleGame(BaseGame):
         def handle_request_state(data):
             """Send current game state to requesting client (display)"""
             print("CoopPuzzle: Display state requested, sending teams data")
-            self.socketio.emit('coop_puzzle_init', {
-                'teams': self.teams,
-                'total_pieces': self.rows * self.cols,
-                'image_path': self.current_image
-            })
+            self.socketio.emit('coop_puzzle_init', self.puzzle_data(), room=request.sid)
 
         @self.socketio.on('coop_puzzle_request_ready')
         def handle_request_ready(data):
             """Send ready state to requesting player"""
             print("CoopPuzzle: Player state requested, sending ready data")
-            self.socketio.emit('coop_puzzle_ready', {
-                'teams': self.teams,
-                'total_pieces': self.rows * self.cols,
-                'image_path': self.current_image
-            })
+            team_id = self.team_of.get(session.get('username'))
+            if team_id:
+                join_room(self.team_room(team_id))
+            self.socketio.emit('coop_puzzle_ready', self.puzzle_data(), room=request.sid)
+
+    def puzzle_data(self):
+        """Teams, grid and image of the puzzle, as sent to players and the display"""
+        return {
+            'teams': self.teams,
+            'rows': self.rows,
+            'cols': self.cols,
+            'total_pieces': self.rows * self.cols,
+            'image_path': self.current_image,
+            'tiles': self.tiles
+        }
 
     def start_game(self):
         """Start the cooperative puzzle game"""
@@ -198,6 +254,9 @@ class CoopPuzzleGame(BaseGame):
             'game_over': False
         })
 
+        # Relay teammates' drags while the puzzle is being solved
+        self.start_drag_relay()
+
         # Notify all players to start
         self.emit_to_all_players('coop_puzzle_started', {})
 
@@ -206,87 +265,122 @@ class CoopPuzzleGame(BaseGame):
 
         print("CoopPuzzle: Game started")
 
-    def update_piece_position(self, username, data):
-        """Update a piece position for a player"""
-        piece_id = data.get('piece_id')
-        x = data.get('x')
-        y = data.get('y')
-        is_locked = data.get('isLocked', False)
+    def team_room(self, team_id):
+        """Socket.IO room of a team's players (joined on coop_puzzle_request_ready)"""
+        return f"coop_puzzle:{team_id}"
 
-        if username not in self.player_states:
-            self.player_states[username] = {}
+    def queue_move(self, username, data, locked=False):
+        """Keep the latest position of a moved piece for the team's next relay frame.
 
-        self.player_states[username][piece_id] = {
-            'x': x,
-            'y': y,
-            'isLocked': is_locked
-        }
+        x/y are board-relative (0..1 spans the board) and quantized to
+        integers in 1/DRAG_QUANTIZATION; only the last move per piece and
+        frame is kept."""
+        team_id = self.team_of.get(username)
+        piece_id = data.get('piece_id')
+        if team_id is None or not isinstance(piece_id, int):
+            return
 
-        # Only update database when piece is locked (reduces excessive writes)
-        if is_locked:
-            game_state = self.get_game_state()
-            game_state['player_states'] = self.player_states
-            self.update_game_state(game_state)
+        try:
+            qx = round(float(data.get('x')) * DRAG_QUANTIZATION)
+            qy = round(float(data.get('y')) * DRAG_QUANTIZATION)
+        except (TypeError, ValueError):
+            return
 
-    def broadcast_team_progress(self):
-        """Calculate and broadcast progress for all teams to the display"""
+        with self.relay_lock:
+            self.pending_moves.setdefault(team_id, {})[piece_id] = [piece_id, qx, qy, username, 1 if locked else 0]
+
+    def start_drag_relay(self):
+        if not self.relay_running:
+            self.relay_running = True
+            self.socketio.start_background_task(self.drag_relay_loop)
+
+    def drag_relay_loop(self):
+        """Background task that sends every team one delta frame per tick:
+        the pieces moved since the last frame, sent only to that team's room"""
+        try:
+            while self.is_active and not self.get_game_state().get('game_over'):
+                self.socketio.sleep(1 / DRAG_RELAY_HZ)
+                self.send_drag_frames()
+        finally:
+            self.relay_running = False
+
+    def send_drag_frames(self):
+        with self.relay_lock:
+            pending, self.pending_moves = self.pending_moves, {}
+
+        for team_id, moves in pending.items():
+            last = self.last_relayed.setdefault(team_id, {})
+            frame = []
+            for piece_id, move in moves.items():
+                position = (move[1], move[2], move[4])
+                if last.get(piece_id) != position:
+                    last[piece_id] = position
+                    frame.append(move)
+            if frame:
+                self.socketio.emit('coop_puzzle_moves', {'moves': frame}, room=self.team_room(team_id))
+
+    def lock_piece(self, username, piece_id):
+        """Record a piece locked by a player.
+
+        Stores only this player's locked pieces (one player_game_state row on
+        the next flush), then rebuilds the team bitset by OR-ing the members'
+        bitsets from player_state_store, so locks made by teammates on other
+        workers (multi-worker mode) count too.
+
+        Returns:
+            The player's team_id if the piece was newly locked for the team, otherwise None
+        """
+        team_id = self.team_of.get(username)
         total_pieces = self.rows * self.cols
-        team_progress = {}
-
-        for team_id, team_members in self.teams.items():
-            # Track which pieces are correctly placed by ANY team member
-            correctly_placed = set()
-
-            for username in team_members:
-                if username not in self.player_states:
-                    continue
-
-                player_pieces = self.player_states[username]
-                for piece_id, piece_data in player_pieces.items():
-                    if piece_data.get('isLocked', False):
-                        correctly_placed.add(piece_id)
-
-            # Calculate percentage
-            pieces_locked = len(correctly_placed)
-            percentage = (pieces_locked / total_pieces) * 100 if total_pieces > 0 else 0
-            team_progress[team_id] = {
-                'pieces_locked': pieces_locked,
-                'total_pieces': total_pieces,
-                'percentage': percentage
-            }
-
-        # Log progress for debugging
-        if any(p['pieces_locked'] > 0 for p in team_progress.values()):
-            print(f"CoopPuzzle: Broadcasting progress: {team_progress}")
-
-        # Broadcast to display
-        self.emit_to_display('coop_puzzle_progress', {
-            'team_progress': team_progress
-        })
-
-    def check_team_completion(self):
-        """Check if any team has completed the puzzle"""
+        if team_id is None or not isinstance(piece_id, int) or not 0 <= piece_id < total_pieces:
+            return None
+
+        bit = 1 << piece_id
+        player_locked = self.player_locked[username] | self.stored_locked(username)
+        if player_locked & bit:
+            return None
+
+        self.player_locked[username] = player_locked | bit
+        player_state_store.update(self.game_name, username, {'locked': self.player_locked[username]})
+
+        # Read the teammates after writing our own lock, so of two concurrent
+        # locks on different workers at least the later one sees both
+        teammates_locked = 0
+        for member in self.teams.get(team_id, []):
+            if member != username:
+                teammates_locked |= self.stored_locked(member)
+        self.team_locked[team_id] = teammates_locked | self.player_locked[username]
+
+        if teammates_locked & bit:
+            return None
+        return team_id
+
+    def stored_locked(self, username):
+        """Bitset of the pieces a player locked, as stored in player_state_store"""
+        state = player_state_store.get(self.game_name, username)
+        return state.get('locked', 0) if state else 0
+
+    def team_progress(self, team_id):
+        """Locked pieces of a team (by any member) and the percentage of the puzzle"""
         total_pieces = self.rows * self.cols
+        pieces_locked = bin(self.team_locked.get(team_id, 0)).count('1')
+        return {
+            'pieces_locked': pieces_locked,
+            'total_pieces': total_pieces,
+            'percentage': (pieces_locked / total_pieces) * 100 if total_pieces > 0 else 0
+        }
 
-        for team_id, team_members in self.teams.items():
-            # Track which pieces are correctly placed by ANY team member
-            correctly_placed = set()
-
-            for username in team_members:
-                if username not in self.player_states:
-                    continue
-
-                player_pieces = self.player_states[username]
-                for piece_id, piece_data in player_pieces.items():
-                    if piece_data.get('isLocked', False):
-                        correctly_placed.add(piece_id)
-
-            # Check if all pieces are placed correctly
-            if len(correctly_placed) == total_pieces:
-                print(f"CoopPuzzle: {team_id} completed the puzzle!")
-                return team_id
+    def broadcast_team_progress(self, team_id):
+        """Broadcast the progress of the team that just locked a piece to the display.
+        Returns the team's progress (complete when pieces_locked == total_pieces)."""
+        progress = self.team_progress(team_id)
+        print(f"CoopPuzzle: Broadcasting progress: {{'{team_id}': {progress}}}")
 
-        return None
+        # The display merges per-team entries, so only the changed team is sent
+        self.emit_to_display('coop_puzzle_progress', {
+            'team_progress': {team_id: progress}
+        })
+        return progress
 
     def handle_game_completion(self, winning_team):
         """Handle when a team completes the puzzle"""
@@ -295,13 +389,9 @@ class CoopPuzzleGame(BaseGame):
         # Award points to winning team members
         team_members = self.teams.get(winning_team, [])
 
-        for username in team_members:
-            user = User.query.filter_by(username=username).first()
-            if user:
-                user.overall_score += 1
-                print(f"CoopPuzzle: Awarded 1 point to {username}")
-
+        user_directory.increment_scores_by_username({username: 1 for username in team_members})
         db.session.commit()
+        print(f"CoopPuzzle: Awarded 1 point to {', '.join(team_members)}")
 
         # Update game state
         self.update_game_state({
@@ -1,5 +1,6 @@
 from games.base import BaseGame
 from models.user import User
+from user_directory import user_directory
 from db import db
 from flask import session
 import json
@@ -100,13 +101,8 @@ class FlappyBirdsGame(BaseGame):
             print(f"FLAPPY DEBUG: Winner determined: {winner_username} with score {winner[1]}")
 
             # Update database scores
-            for username, score in player_scores.items():
-                user = User.query.filter_by(username=username).first()
-                if user:
-                    print(f"FLAPPY DEBUG: Setting {username}.flappy_birds_score = {score}")
-                    user.flappy_birds_score = score
-                else:
-                    print(f"FLAPPY DEBUG: User {username} not found in database!")
+            print(f"FLAPPY DEBUG: Setting flappy_birds_score for {len(player_scores)} players")
+            user_directory.set_scores_by_username(player_scores, 'flappy_birds_score')
 
             # Award overall point to winner
             print(f"FLAPPY DEBUG: Awarding overall point to {winner_username}")
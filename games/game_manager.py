@@ -1,9 +1,14 @@
 from flask import session
 from models.game import GameState
 from db import db
+from game_state_store import game_state_store
+from state_backend import get_redis, redis_key, WORKER_ID
 import importlib
 import json
 
+# Pub/sub channel used to mirror the active game on all workers
+GAME_EVENTS_CHANNEL = 'game_events'
+
 class GameManager:
     def __init__(self, socketio):
         self.socketio = socketio
@@ -18,6 +23,11 @@ class GameManager:
             'ordering_game': 'games.ordering_game.OrderingGame',  # Hidden from admin, used for ordering questions
             'tt': 'games.sorting_game.SortingGame'  # Hidden from admin, used for sorting questions
         }
+        # Games that are only started from question selection in app.py
+        self.question_games = {
+            'geo_guessr': 'games.geo_guessr.GeoGuessrGame',
+            'match_me': 'games.match_me.MatchMeGame'
+        }
         self.active_game = None
 
     def get_available_games(self):
@@ -69,6 +79,7 @@ class GameManager:
                 game_state.active_game = game_name
                 game_state.game_data = '{}'
             
+            game_state_store.reset()
             db.session.commit()
             print(f"Database updated successfully")
             
@@ -85,6 +96,8 @@ class GameManager:
             print(f"Calling game.initialize()...")
             self.active_game.initialize()
             print(f"Game initialized successfully")
+
+            self.publish_active_game(game_name)
             
             return True
             
@@ -102,6 +115,7 @@ class GameManager:
         self.active_game.end_game()
 
         # THEN update game state in database (clear game info but keep platform active)
+        game_state_store.reset()
         game_state = GameState.query.first()
         if game_state:
             # Keep is_active as True - platform stays active, just no game running
@@ -110,6 +124,7 @@ class GameManager:
             db.session.commit()
 
         self.active_game = None
+        self._publish_game_event({'action': 'deactivate'})
 
         return True
     
@@ -117,9 +132,62 @@ class GameManager:
         return self.active_game
     
     def update_game_data(self, data):
-        game_state = GameState.query.first()
-        if game_state:
-            current_data = json.loads(game_state.game_data) if game_state.game_data else {}
-            current_data.update(data)
-            game_state.game_data = json.dumps(current_data)
-            db.session.commit()
+        game_state_store.update(data)
+
+    def _publish_game_event(self, event):
+        client = get_redis()
+        if client is None:
+            return
+        event['origin'] = WORKER_ID
+        client.publish(redis_key(GAME_EVENTS_CHANNEL), json.dumps(event))
+
+    def publish_active_game(self, game_name, init_kwargs=None):
+        """Tell the other workers to mirror the game this worker just started (multi-worker mode only).
+        init_kwargs are the constructor arguments besides socketio and must be JSON serializable."""
+        self._publish_game_event({'action': 'activate', 'game': game_name, 'kwargs': init_kwargs or {}})
+
+    def _mirror_game_event(self, event):
+        """Apply an activate/deactivate event published by another worker"""
+        if event.get('origin') == WORKER_ID:
+            return
+
+        if event.get('action') == 'deactivate':
+            self.active_game = None
+            print("GameManager: Active game cleared by another worker")
+            return
+
+        game_name = event.get('game')
+        class_path = self.games.get(game_name) or self.question_games.get(game_name)
+        if not class_path:
+            print(f"GameManager: Cannot mirror unknown game {game_name}")
+            return
+
+        module_path, class_name = class_path.rsplit('.', 1)
+        game_class = getattr(importlib.import_module(module_path), class_name)
+        game = game_class(self.socketio, **event.get('kwargs', {}))
+
+        # The starting worker already initialized the game (database, game state, emits);
+        # here we only need its socket handlers and in-process attributes
+        game.register_socket_events()
+        game.is_active = True
+        game.restore_from_state()
+        self.active_game = game
+        print(f"GameManager: Mirrored {game_name} started by another worker")
+
+    def listen_for_game_events(self, app):
+        """Background task: keep this worker's active game in sync with the other workers"""
+        client = get_redis()
+        if client is None:
+            return
+
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(redis_key(GAME_EVENTS_CHANNEL))
+        while True:
+            message = pubsub.get_message(timeout=1.0)
+            if message:
+                try:
+                    with app.app_context():
+                        self._mirror_game_event(json.loads(message['data']))
+                except Exception as e:
+                    print(f"GameManager: Error mirroring game event: {e}")
+            self.socketio.sleep(0)
@@ -1,9 +1,19 @@
 from games.base import BaseGame
 from models.user import User
+from player_state_store import player_state_store
+from user_directory import user_directory
 from db import db
-from flask import session
+from flask import current_app, session
 import math
-from shapely.geometry import shape, Point
+from geo_geometry import geometry_cache
+from geo_round_results import compute_round_results, determine_winners
+from location_index import location_index
+
+# Seconds between live guess feed updates to the display (guesses are batched per tick)
+GUESS_FEED_INTERVAL = 0.5
+
+# Decimals of the anonymized pins in the guess feed (2 decimals is roughly 1 km)
+GUESS_FEED_PIN_DECIMALS = 2
 
 class GeoGuessrGame(BaseGame):
     def __init__(self, socketio, location_data=None, media_url=None):
@@ -27,6 +37,9 @@ class GeoGuessrGame(BaseGame):
         for user in users:
             user.geo_guessr_score = 0
         db.session.commit()
+
+        # Guesses are kept per player in the player state store, not in the game state
+        player_state_store.clear(self.game_name)
         
         # Set initial game state
         self.update_game_state({
@@ -35,7 +48,6 @@ class GeoGuessrGame(BaseGame):
             'total_rounds': self.total_rounds,
             'current_location': None,
             'played_locations': [],
-            'player_guesses': {},
             'round_results': {},
             'player_total_distances': {}
         })
@@ -49,6 +61,10 @@ class GeoGuessrGame(BaseGame):
             'total_rounds': self.total_rounds
         })
     
+    def restore_from_state(self):
+        """Pick up the round started on another worker"""
+        self.current_round = self.get_game_state().get('current_round', 0)
+
     def start_game(self):
         """Start the GeoGuessr game by starting the first round"""
         print("GeoGuessr: start_game() called - starting first round")
@@ -108,12 +124,13 @@ class GeoGuessrGame(BaseGame):
             print(f"GeoGuessr: Using polygon centroid: lat={centroid_lat}, lon={centroid_lon}")
 
         # Update game state
+        player_state_store.clear(self.game_name)
         self.update_game_state({
             'status': 'active',
             'current_round': self.current_round,
-            'current_location': location_data,
-            'player_guesses': {}
+            'current_location': location_data
         })
+        self.persist_game_state()
 
         # Use media_url from question
         image_url = self.question_media_url if self.question_media_url else f"{location_name}.png"
@@ -130,13 +147,51 @@ class GeoGuessrGame(BaseGame):
             'round': self.current_round,
             'total_rounds': self.total_rounds
         })
+
+        # Live "N players have guessed" feed for the display while the round is active
+        self.socketio.start_background_task(self.guess_feed_loop, current_app._get_current_object(), self.current_round)
     
+    def guess_feed_loop(self, app, round_number):
+        """Background task that sends the display the guesses of the active round.
+        Guesses arriving between two ticks are coalesced into one update, and an
+        update is only sent when the guesses changed."""
+        last_feed = None
+        with app.app_context():
+            total_players = len([username for username in user_directory.all_usernames() if username != 'admin'])
+
+            while True:
+                self.socketio.sleep(GUESS_FEED_INTERVAL)
+
+                game_state = self.get_game_state()
+                if game_state.get('status') != 'active' or game_state.get('current_round') != round_number:
+                    break
+
+                feed = self.guess_feed(total_players)
+                if feed != last_feed:
+                    self.emit_to_display('geo_guessr_guess_feed', feed)
+                    last_feed = feed
+
+    def guess_feed(self, total_players):
+        """Guess count and anonymized pins (rounded, sorted - no usernames) of the active round"""
+        player_guesses = player_state_store.all(self.game_name)
+        pins = sorted(
+            [round(float(guess['latitude']), GUESS_FEED_PIN_DECIMALS),
+             round(float(guess['longitude']), GUESS_FEED_PIN_DECIMALS)]
+            for guess in player_guesses.values()
+        )
+        return {
+            'round': self.current_round,
+            'count': len(player_guesses),
+            'total_players': total_players,
+            'pins': pins
+        }
+
     def end_round(self):
         """End the current round and calculate results"""
         print(f"GeoGuessr: end_round called")
         game_state = self.get_game_state()
         current_location = game_state.get('current_location')
-        player_guesses = game_state.get('player_guesses', {})
+        player_guesses = player_state_store.all(self.game_name)
         player_total_distances = game_state.get('player_total_distances', {})
         print(f"GeoGuessr: Current location: {current_location}")
         print(f"GeoGuessr: Player guesses: {player_guesses}")
@@ -145,69 +200,18 @@ class GeoGuessrGame(BaseGame):
             print("GeoGuessr: ERROR - No current location found!")
             return
         
-        # Calculate distances for all players and add to cumulative total
+        # Distances, penalties, totals, ranking and winners for all players in one pass
         print("GeoGuessr: Calculating distances...")
-        results = {}
-        loc_json = current_location.get('loc_json')
-
-        for username, guess in player_guesses.items():
-            print(f"GeoGuessr: Processing guess for {username}")
-
-            # Use area-based calculation if loc_json is available
-            if loc_json:
-                distance = self.calculate_distance_to_area(
-                    loc_json,
-                    guess['latitude'],
-                    guess['longitude']
-                )
-                print(f"GeoGuessr: Area-based distance calculated: {distance:.2f} km")
-            else:
-                distance = self.calculate_distance(
-                    current_location['latitude'],
-                    current_location['longitude'],
-                    guess['latitude'],
-                    guess['longitude']
-                )
-                print(f"GeoGuessr: Point-based distance calculated: {distance:.2f} km")
-            
-            # Add to cumulative distance
-            if username not in player_total_distances:
-                player_total_distances[username] = 0
-            player_total_distances[username] += distance
-            
-            results[username] = {
-                'guess': guess,
-                'distance': distance,
-                'total_distance': player_total_distances[username]
-            }
-            
-            print(f"GeoGuessr: {username} total distance now: {player_total_distances[username]:.2f} km")
-        
-        # Add penalty for players who didn't submit a guess
-        all_users = User.query.filter(User.username != 'admin').all()
-        penalty_distance = 20000.0  # 20,000 km penalty
-        
-        for user in all_users:
-            username = user.username
-            if username not in player_guesses:
-                print(f"GeoGuessr: {username} did not submit a guess, applying {penalty_distance}km penalty")
-                
-                # Add to cumulative distance
-                if username not in player_total_distances:
-                    player_total_distances[username] = 0
-                player_total_distances[username] += penalty_distance
-                
-                # Add to results with penalty
-                results[username] = {
-                    'guess': {'latitude': 0, 'longitude': 0},  # Dummy coordinates for display
-                    'distance': penalty_distance,
-                    'total_distance': player_total_distances[username]
-                }
-                
-                print(f"GeoGuessr: {username} total distance now: {player_total_distances[username]:.2f} km (with penalty)")
-        
-        print(f"GeoGuessr: All results: {results}")
-        
+        players = [username for username in user_directory.all_usernames() if username != 'admin']
+        round_result = compute_round_results(current_location, player_guesses, players, player_total_distances)
+        results = round_result['results']
+        player_total_distances = round_result['player_total_distances']
+        winners = round_result['winners']
+
+        for username, result in results.items():
+            penalty_note = '' if username in player_guesses else ' (no guess, penalty)'
+            print(f"GeoGuessr: {username} distance: {result['distance']:.2f} km, total: {result['total_distance']:.2f} km{penalty_note}")
+
         # Update round results
         round_results = game_state.get('round_results', {})
         round_results[str(self.current_round)] = {
@@ -215,58 +219,59 @@ class GeoGuessrGame(BaseGame):
             'results': results
         }
         
-        # Update game state with cumulative distances
+        # Update game state with cumulative distances and the winners used for scoring
         self.update_game_state({
             'status': 'round_ended',
             'round_results': round_results,
-            'player_total_distances': player_total_distances
+            'player_total_distances': player_total_distances,
+            'round_winners': winners
         })
+        self.persist_game_state()
 
-        # Calculate points for display (before storing in database)
-        PERFECT_GUESS_THRESHOLD = 0.25  # 250m in km
-        winners = []
-        for username, distance in player_total_distances.items():
-            if distance <= PERFECT_GUESS_THRESHOLD:
-                winners.append(username)
-
-        # If no one is within 250m, award point to closest player
-        if not winners:
-            sorted_players = sorted(player_total_distances.items(), key=lambda x: x[1])
-            if sorted_players:
-                winners = [sorted_players[0][0]]
+        print(f"GeoGuessr: Winners: {winners}")
 
-        print(f"GeoGuessr: Winners for display: {winners}")
-
-        # Prepare display data with points
+        # Prepare display data with points, players sorted by distance (ascending)
         display_data = {
             'round': self.current_round,
             'location': current_location,
             'players': []
         }
 
-        for username, result in results.items():
-            points = 1 if username in winners else 0
+        for rank, username in enumerate(round_result['ranking'], start=1):
+            result = results[username]
             display_data['players'].append({
                 'username': username,
                 'latitude': result['guess']['latitude'],
                 'longitude': result['guess']['longitude'],
                 'distance': result['distance'],
                 'total_distance': result['total_distance'],
-                'points': points
+                'points': 1 if username in winners else 0,
+                'rank': rank,
+                'nearest_location': self.nearest_location_hint(result['guess'], current_location) if username in player_guesses else None
             })
 
-        # Sort players by distance (ascending)
-        display_data['players'].sort(key=lambda p: p['distance'])
-
         # Notify players and display
         self.emit_to_all_players('geo_guessr_round_ended', display_data)
         self.emit_to_display('geo_guessr_show_results', display_data)
 
-        # Single round completed - calculate scores and store in database
+        # Single round completed - store the scores in database
         if self.current_round >= self.total_rounds:
-            self.calculate_scores()
+            self.calculate_scores(winners)
             # Don't emit all_rounds_completed - game will end when admin clicks end game
     
+    def nearest_location_hint(self, guess, current_location):
+        """Name of the known location (other than the one played) closest to a guess, for the display"""
+        try:
+            nearest = location_index.nearest(
+                float(guess['latitude']),
+                float(guess['longitude']),
+                exclude_ids=[current_location.get('id')]
+            )
+            return nearest[0]['location_name'] if nearest else None
+        except Exception as e:
+            print(f"GeoGuessr: Nearest location lookup failed: {e}")
+            return None
+
     def submit_guess(self, username, latitude, longitude):
         """Submit a guess for a player"""
         print(f"GeoGuessr: submit_guess called - username: {username}, lat: {latitude}, lng: {longitude}")
@@ -278,16 +283,12 @@ class GeoGuessrGame(BaseGame):
             print(f"GeoGuessr: Rejecting guess - round not active (status: {game_state.get('status')})")
             return
         
-        # Store the guess
-        player_guesses = game_state.get('player_guesses', {})
-        player_guesses[username] = {
+        # Store the guess (only this player's entry; the display learns about it on the next feed tick)
+        print(f"GeoGuessr: Storing guess for {username}: lat={latitude}, lng={longitude}")
+        player_state_store.update(self.game_name, username, {
             'latitude': latitude,
             'longitude': longitude
-        }
-        print(f"GeoGuessr: Storing guess for {username}: lat={latitude}, lng={longitude}")
-        print(f"GeoGuessr: All player guesses now: {player_guesses}")
-        
-        self.update_game_state({'player_guesses': player_guesses})
+        })
         
         # Notify the player
         print(f"GeoGuessr: Sending confirmation to {username}")
@@ -315,55 +316,21 @@ class GeoGuessrGame(BaseGame):
         return c * r
 
     def calculate_distance_to_area(self, loc_json, guess_lat, guess_lon):
-        """Calculate the distance from a guess to an area (GeoJSON polygon).
+        """Calculate the distance from a guess to an area (GeoJSON polygon or multipolygon).
         Returns 0 if the guess is inside the area, otherwise returns
-        the distance to the nearest edge in kilometers."""
-        # Extract geometry from GeoJSON (handle FeatureCollection or direct geometry)
-        if loc_json.get('type') == 'FeatureCollection':
-            geometry = loc_json['features'][0]['geometry']
-        elif loc_json.get('type') == 'Feature':
-            geometry = loc_json['geometry']
-        else:
-            geometry = loc_json
-
-        # Create Shapely objects
-        polygon = shape(geometry)
-        guess_point = Point(guess_lon, guess_lat)  # Note: Shapely uses (lon, lat) order
-
-        # Check if point is inside polygon
-        if polygon.contains(guess_point):
-            return 0.0
-
-        # Find nearest point on polygon boundary
-        nearest_point = polygon.exterior.interpolate(polygon.exterior.project(guess_point))
-        nearest_lon = nearest_point.x
-        nearest_lat = nearest_point.y
-
-        # Calculate geodesic distance using Haversine
-        return self.calculate_distance(guess_lat, guess_lon, nearest_lat, nearest_lon)
+        the distance to the nearest edge (including hole edges) in kilometers."""
+        return geometry_cache.get(loc_json).distance_km(guess_lat, guess_lon)
 
     def get_polygon_centroid(self, loc_json):
-        """Calculate the centroid of a GeoJSON polygon.
+        """Calculate the centroid of a GeoJSON area.
         Returns (latitude, longitude) tuple."""
-        # Extract geometry from GeoJSON (handle FeatureCollection or direct geometry)
-        if loc_json.get('type') == 'FeatureCollection':
-            geometry = loc_json['features'][0]['geometry']
-        elif loc_json.get('type') == 'Feature':
-            geometry = loc_json['geometry']
-        else:
-            geometry = loc_json
-
-        # Create Shapely polygon and get centroid
-        polygon = shape(geometry)
-        centroid = polygon.centroid
-
-        # Return as (lat, lon) - Shapely uses (lon, lat) internally
-        return (centroid.y, centroid.x)
+        return geometry_cache.get(loc_json).centroid
 
-    def calculate_scores(self):
+    def calculate_scores(self, winners=None):
         """Calculate scores after the round
         Award 1 point to all players within 250m of the location
-        If no one is within 250m, award 1 point to the closest player"""
+        If no one is within 250m, award 1 point to the closest player
+        winners: the round's winners as computed by end_round (recomputed if not given)"""
         print("GeoGuessr: Calculating scores...")
         game_state = self.get_game_state()
         player_total_distances = game_state.get('player_total_distances', {})
@@ -372,33 +339,24 @@ class GeoGuessrGame(BaseGame):
             print("GeoGuessr: No player distances found!")
             return
 
-        # Convert distances from km to meters for easier comparison
-        PERFECT_GUESS_THRESHOLD = 0.25  # 250m in km
-
-        # Find players within 250m
-        winners = []
-        for username, distance in player_total_distances.items():
-            if distance <= PERFECT_GUESS_THRESHOLD:
-                winners.append(username)
-
-        # If no one is within 250m, award point to closest player
-        if not winners:
-            sorted_players = sorted(player_total_distances.items(), key=lambda x: x[1])
-            if sorted_players:
-                winners = [sorted_players[0][0]]  # Closest player
+        if winners is None:
+            winners = game_state.get('round_winners')
+        if winners is None:
+            winners = determine_winners(player_total_distances)
 
         print(f"GeoGuessr: Winners (within 250m or closest): {winners}")
 
         # Award points to winners
         for username in player_total_distances.keys():
-            user = User.query.filter_by(username=username).first()
-            if user:
-                if username in winners:
-                    user.geo_guessr_score = 1
-                    print(f"GeoGuessr: Awarded 1 point to {username} (distance: {player_total_distances[username]:.2f}km)")
-                else:
-                    user.geo_guessr_score = 0
-                    print(f"GeoGuessr: No points awarded to {username} (distance: {player_total_distances[username]:.2f}km)")
+            if username in winners:
+                print(f"GeoGuessr: Awarded 1 point to {username} (distance: {player_total_distances[username]:.2f}km)")
+            else:
+                print(f"GeoGuessr: No points awarded to {username} (distance: {player_total_distances[username]:.2f}km)")
+
+        user_directory.set_scores_by_username(
+            {username: 1 if username in winners else 0 for username in player_total_distances},
+            'geo_guessr_score'
+        )
 
         db.session.commit()
         print("GeoGuessr: Scores committed to database")
@@ -2,7 +2,8 @@ from games.base import BaseGame
 from models.game import MatchMeCategory, MatchMeItem
 from models.user import User
 from db import db
-from flask import session
+from player_state_store import player_state_store
+from flask import request, session
 import random
 import json
 
@@ -49,11 +50,11 @@ class MatchMeGame(BaseGame):
             'used_titles': [],
             'used_artists': [],
             'used_answers': [],
-            'used_questions': [],
-            'player_states': {}
+            'used_questions': []
         })
         
         # Prepare initial player states
+        player_state_store.clear(self.game_name)
         for user in users:
             if user.username != 'admin':
                 player_state = {
@@ -97,7 +98,7 @@ class MatchMeGame(BaseGame):
             self.socketio.emit('match_me_init', {
                 'users': [user.to_dict() for user in users],
                 'question_text': self.question_text
-            })
+            }, room=request.sid)
     
     def start_game(self):
         """Start the Match Me game"""
@@ -113,6 +114,8 @@ class MatchMeGame(BaseGame):
         for user in users:
             question = self.generate_question(user.username)
             self.emit_to_player(user.username, 'match_me_question', question)
+
+        self.persist_game_state()
     
     def generate_question(self, username):
         """Generate a question for a player"""
@@ -436,17 +439,12 @@ class MatchMeGame(BaseGame):
         return None
     
     def update_player_state(self, username, state):
-        """Update a player's state in the game state"""
-        game_state = self.get_game_state()
-        player_states = game_state.get('player_states', {})
-        player_states[username] = state
-        self.update_game_state({'player_states': player_states})
+        """Update a player's state (only this player's record is written)"""
+        player_state_store.update(self.game_name, username, state)
     
     def get_player_state(self, username):
-        """Get a player's state from the game state"""
-        game_state = self.get_game_state()
-        player_states = game_state.get('player_states', {})
-        return player_states.get(username, {
+        """Get a player's state"""
+        return player_state_store.get(self.game_name, username, default={
             'current_question': 0,
             'correct_answers': 0,
             'completed': False,
@@ -456,8 +454,7 @@ class MatchMeGame(BaseGame):
     
     def all_players_completed(self):
         """Check if all players have completed the game"""
-        game_state = self.get_game_state()
-        player_states = game_state.get('player_states', {})
+        player_states = player_state_store.all(self.game_name)
         
         for username, state in player_states.items():
             if not state.get('completed', False) and username != 'admin':
@@ -479,8 +476,7 @@ class MatchMeGame(BaseGame):
     
     def get_remaining_players(self):
         """Get list of players who haven't completed the game"""
-        game_state = self.get_game_state()
-        player_states = game_state.get('player_states', {})
+        player_states = player_state_store.all(self.game_name)
         
         remaining = []
         for username, state in player_states.items():
@@ -492,8 +488,7 @@ class MatchMeGame(BaseGame):
     def end_game_for_all_players(self):
         """End the game for all players when the first player finishes"""
         # Mark all players as completed
-        game_state = self.get_game_state()
-        player_states = game_state.get('player_states', {})
+        player_states = player_state_store.all(self.game_name)
         
         # Notify all remaining players that the game has ended
         for username, state in player_states.items():
@@ -535,7 +530,7 @@ class MatchMeGame(BaseGame):
             return
 
         users = User.query.filter(User.username != 'admin').all()
-        player_states = game_state.get('player_states', {})
+        player_states = player_state_store.all(self.game_name)
 
         # Create scores dictionary with points from player states
         scores = {}
@@ -1,9 +1,9 @@
 from games.base import BaseGame
-from models.game import Movie, AnswerUser
+from models.game import AnswerUser
 from models.user import User
 from db import db
 from flask import session, request
-from rapidfuzz import fuzz
+from movie_search import movie_search_index
 
 class MovieGuessrGame(BaseGame):
     def __init__(self, socketio):
@@ -46,37 +46,11 @@ class MovieGuessrGame(BaseGame):
                 self.socketio.emit('movie_search_results', [], room=request.sid)
                 return
 
-            # Get all movies from database
-            all_movies = Movie.query.all()
-
-            query_lower = query.lower()
-            results = []
-
-            for movie in all_movies:
-                title_lower = movie.title.lower()
-
-                # Calculate fuzzy match score
-                fuzzy_score = fuzz.partial_ratio(query_lower, title_lower)
-
-                # Check if movie title starts with query (prioritize these)
-                starts_with = title_lower.startswith(query_lower)
-
-                # Only include movies with reasonable match (60%+ fuzzy score)
-                if fuzzy_score >= 60:
-                    results.append({
-                        'id': movie.id,
-                        'title': movie.title,
-                        'year': movie.year,
-                        'display': f"{movie.title} ({movie.year})",
-                        'fuzzy_score': fuzzy_score,
-                        'starts_with': starts_with
-                    })
-
-            # Sort results: prioritize starts_with, then by fuzzy_score
-            results.sort(key=lambda x: (not x['starts_with'], -x['fuzzy_score']))
+            # Candidates come from the in-memory title index, only they are fuzzy scored
+            results = movie_search_index.search(query, limit=10)
 
             # Return max 10 results to the requesting client only
-            self.socketio.emit('movie_search_results', results[:10], room=request.sid)
+            self.socketio.emit('movie_search_results', results, room=request.sid)
 
         @self.socketio.on('check_player_guessed')
         def handle_check_player_guessed(data):
@@ -2,6 +2,7 @@ from games.base import BaseGame
 from models.game import OrderItem, Question
 from models.user import User
 from db import db
+from socket_rooms import ADMIN_ROOM, DISPLAY_ROOM, PLAYERS_ROOM
 from flask import session, request
 import json
 
@@ -82,10 +83,10 @@ class OrderingGame(BaseGame):
             # Notify admin about the submission count
             submission_count = len(game_state['player_submissions'])
             total_players = User.query.filter(User.username != 'admin').count()
-            self.socketio.emit('submission_update', {
+            self.emit_to_rooms('submission_update', {
                 'count': submission_count,
                 'total': total_players
-            }, broadcast=True)
+            }, PLAYERS_ROOM, ADMIN_ROOM)
 
         @self.socketio.on('check_player_submitted')
         def handle_check_player_submitted(data):
@@ -150,13 +151,13 @@ class OrderingGame(BaseGame):
             # Sort results by score descending
             results.sort(key=lambda x: x['score'], reverse=True)
 
-            # Emit results to all clients
-            self.socketio.emit('ordering_results', {
+            # Emit results to the display and the players
+            self.emit_to_rooms('ordering_results', {
                 'correct_order': correct_order,
                 'correct_items': [item.to_dict() for item in order_items],
                 'results': results,
                 'winners': winners
-            }, broadcast=True)
+            }, DISPLAY_ROOM, PLAYERS_ROOM)
 
     def calculate_kendall_tau_score(self, order_items, submitted_order):
         """
@@ -2,19 +2,25 @@ from games.base import BaseGame
 from models.user import User
 from models.game import Product
 from db import db
+from socket_rooms import ADMIN_ROOM, DISPLAY_ROOM, PLAYERS_ROOM
 from flask import session
 
 # Try to import amazon_scraper, but make it optional
 try:
-    from amazon_scraper import fetch_amazon_price
+    from amazon_scraper import fetch_amazon_price, prefetch_amazon_prices, browser_pool
     SCRAPER_AVAILABLE = True
 except ImportError as e:
     print(f"WARNING: Amazon scraper not available: {e}")
     print("Price fetching will be disabled. Admin must enter prices manually.")
     SCRAPER_AVAILABLE = False
     fetch_amazon_price = None
+    prefetch_amazon_prices = None
+    browser_pool = None
 
 class PriceGuessrGame(BaseGame):
+    # Products picked and scraped ahead of the admin's "Show Content"
+    PREFETCH_COUNT = 3
+
     def __init__(self, socketio):
         super().__init__(socketio)
         self.game_name = "price_guesser"
@@ -23,15 +29,50 @@ class PriceGuessrGame(BaseGame):
         """Initialize the Price Guesser game WITHOUT scraping"""
         super().initialize()
 
+        # Start the scraper browsers now so the first reveal only waits for the page load
+        if SCRAPER_AVAILABLE:
+            browser_pool.warm_up()
+
         # Don't select product yet - wait until admin clicks "Show Content"
         print("Price Guesser initialized. Waiting for admin to reveal content before scraping.")
 
+    def prefetch_products(self):
+        """Pick the upcoming products and scrape them in the background (up to PREFETCH_COUNT queued)"""
+        existing_data = self.get_game_state() or {}
+        upcoming_ids = existing_data.get('upcoming_product_ids', [])
+
+        missing = self.PREFETCH_COUNT - len(upcoming_ids)
+        if missing > 0:
+            products = Product.query.filter(
+                ~Product.id.in_(upcoming_ids)
+            ).order_by(db.func.random()).limit(missing).all()
+            upcoming_ids = upcoming_ids + [product.id for product in products]
+            self.update_game_state({'upcoming_product_ids': upcoming_ids})
+
+        if SCRAPER_AVAILABLE and upcoming_ids:
+            asins = [asin for (asin,) in db.session.query(Product.asin).filter(Product.id.in_(upcoming_ids)).all()]
+            prefetch_amazon_prices(asins)
+            print(f"Prefetching prices for {len(asins)} upcoming product(s)")
+
+    def next_product(self):
+        """Take the next prefetched product, or a random one if none is queued"""
+        existing_data = self.get_game_state() or {}
+        upcoming_ids = existing_data.get('upcoming_product_ids', [])
+
+        product = None
+        while upcoming_ids and product is None:
+            product = Product.query.get(upcoming_ids.pop(0))
+        self.update_game_state({'upcoming_product_ids': upcoming_ids})
+
+        if product is None:
+            product = Product.query.order_by(db.func.random()).first()
+        return product
+
     def show_next_product(self):
-        """Select and show a random product"""
+        """Show the next product (prefetched if possible)"""
         from models.game import PriceGuessUser
 
-        # Get a random product from database
-        product = Product.query.order_by(db.func.random()).first()
+        product = self.next_product()
 
         if not product:
             print("ERROR: No products found in database!")
@@ -40,13 +81,14 @@ class PriceGuessrGame(BaseGame):
         print(f"Auto-selected product: {product.product_name} (ASIN: {product.asin})")
 
         # Fetch current price and image from Amazon (fresh data, not stored in DB)
-        # This is SYNCHRONOUS - will block until scraping is complete
+        # Served from the price cache if the prefetch finished; otherwise waits for a pooled
+        # browser to load the page while other socket handlers keep running
         price = None
         image_url = None
         if SCRAPER_AVAILABLE:
             print(f"[SCRAPING START] Fetching price and image for ASIN: {product.asin}...")
             try:
-                price, image_url = fetch_amazon_price(product.asin)
+                price, image_url = fetch_amazon_price(product.asin, sleep=self.socketio.sleep)
                 print(f"[SCRAPING COMPLETE] Price: {price}€, Image: {'Yes' if image_url else 'No'}")
                 if not price:
                     print("WARNING: Could not fetch price from Amazon")
@@ -98,7 +140,7 @@ class PriceGuessrGame(BaseGame):
             'image_url': image_url
         }
         print(f"[EMIT] Broadcasting display_open_amazon with ASIN: {product.asin}")
-        self.socketio.emit('display_open_amazon', product_data, broadcast=True)
+        self.emit_to_rooms('display_open_amazon', product_data, DISPLAY_ROOM, PLAYERS_ROOM, ADMIN_ROOM)
 
         # Notify admin about product and price
         self.emit_to_admin('product_price_loaded', {
@@ -112,6 +154,9 @@ class PriceGuessrGame(BaseGame):
         if price:
             print(f"Current price: {price}€")
 
+        # Keep the following products scraping in the background
+        self.prefetch_products()
+
         return True
 
     def register_socket_events(self):
@@ -128,12 +173,15 @@ class PriceGuessrGame(BaseGame):
                 'scraping_status': 'not_started'  # Track scraping state
             })
 
+            # Pick the next products now and scrape them while the question is introduced
+            self.prefetch_products()
+
             # Emit event to display with question text (category) - instant forwarding
-            self.socketio.emit('pg_question_ready', {
+            self.emit_to_rooms('pg_question_ready', {
                 'question_text': question_text
-            }, broadcast=True)
+            }, DISPLAY_ROOM, PLAYERS_ROOM)
 
-            print("Question text stored. Scraping will start when admin clicks 'Show Content'.")
+            print("Question text stored. Products prefetching until admin clicks 'Show Content'.")
 
     def start_game(self):
         """Start the Price Guesser game"""
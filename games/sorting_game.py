@@ -2,6 +2,8 @@ from games.base import BaseGame
 from models.game import SortingCategory, SortingItem, Question
 from models.user import User
 from db import db
+from player_state_store import player_state_store
+from socket_rooms import ADMIN_ROOM, PLAYERS_ROOM
 from flask import session
 import random
 
@@ -22,10 +24,10 @@ class SortingGame(BaseGame):
         # Set initial game state
         self.update_game_state({
             'status': 'ready',
-            'player_states': {},
             'game_ended': False,
             'winner': None
         })
+        player_state_store.clear(self.game_name)
 
         # Notify players and display
         print("SortingGame: Emitting sorting_game_ready to all players")
@@ -62,6 +64,10 @@ class SortingGame(BaseGame):
                 username = session.get('username')
                 self.send_items_to_player(username)
 
+    def restore_from_state(self):
+        """Pick up the question started on another worker"""
+        self.question_id = self.get_game_state().get('question_id')
+
     def start_game(self, question_id):
         """Start the Sorting game with a specific question"""
         print(f"SortingGame: start_game() called with question_id={question_id}")
@@ -138,6 +144,8 @@ class SortingGame(BaseGame):
             print(f"SortingGame: Sending first item to {user.username}")
             self.send_next_item(user.username)
 
+        self.persist_game_state()
+
     def send_items_to_player(self, username):
         """Send all items in random order to a player"""
         player_state = self.get_player_state(username)
@@ -281,10 +289,10 @@ class SortingGame(BaseGame):
                 winner_user.overall_score = (winner_user.overall_score or 0) + 1
                 db.session.commit()
 
-        # Send results to all players
-        self.emit_to_all_players('sorting_game_ended', {
+        # Send results to all players and the admin panel
+        self.emit_to_rooms('sorting_game_ended', {
             'results': player_scores
-        })
+        }, PLAYERS_ROOM, ADMIN_ROOM)
 
         # Send results to display
         self.emit_to_display('sorting_game_results', {
@@ -293,19 +301,15 @@ class SortingGame(BaseGame):
 
         # End the game
         self.is_active = False
+        self.persist_game_state()
 
     def update_player_state(self, username, state):
-        """Update a player's state in the game state"""
-        game_state = self.get_game_state()
-        player_states = game_state.get('player_states', {})
-        player_states[username] = state
-        self.update_game_state({'player_states': player_states})
+        """Update a player's state (only this player's record is written)"""
+        player_state_store.update(self.game_name, username, state)
 
     def get_player_state(self, username):
-        """Get a player's state from the game state"""
-        game_state = self.get_game_state()
-        player_states = game_state.get('player_states', {})
-        return player_states.get(username, {
+        """Get a player's state"""
+        return player_state_store.get(self.game_name, username, default={
             'score': 0,
             'items_sorted': 0,
             'completed': False,
@@ -0,0 +1,143 @@
+"""
+Geo Geometry
+
+Parsed GeoJSON areas of GeoGuessr locations, cached per location.
+
+Building a shapely geometry from loc_json and preparing it for point
+queries is the expensive part of area scoring, so it happens once per area
+(the cache is keyed by the GeoJSON content) instead of once per guess.
+Distances for all guesses of a round are computed in one call with the
+shapely 2.x array functions and a NumPy haversine.
+
+The distance to an area is measured to its full boundary, which includes
+the rings of polygon holes and every part of a MultiPolygon; a guess inside
+a hole is outside the area.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+
+import numpy as np
+import shapely
+from shapely.geometry import shape
+
+EARTH_RADIUS_KM = 6371
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometers; accepts scalars or NumPy arrays (broadcast)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def geometry_from_loc_json(loc_json):
+    """Build a shapely geometry from a GeoJSON FeatureCollection, Feature or bare geometry"""
+    if loc_json.get('type') == 'FeatureCollection':
+        geometries = [shape(feature['geometry']) for feature in loc_json['features'] if feature.get('geometry')]
+        return geometries[0] if len(geometries) == 1 else shapely.union_all(geometries)
+    if loc_json.get('type') == 'Feature':
+        return shape(loc_json['geometry'])
+    return shape(loc_json)
+
+
+class LocationGeometry:
+    """A location area, prepared for fast point-in-area tests"""
+
+    def __init__(self, geometry):
+        self.geometry = geometry
+        self.is_area = geometry.area > 0
+
+        # Guesses outside the area are measured to the nearest boundary point
+        # (outer rings, hole rings and all parts); points and lines to themselves
+        self.edges = geometry.boundary if self.is_area else geometry
+
+        shapely.prepare(self.geometry)
+        shapely.prepare(self.edges)
+
+        centroid = geometry.centroid
+        self.centroid = (centroid.y, centroid.x)  # (lat, lon); shapely uses (lon, lat)
+
+    def contains(self, lats, lons):
+        """Boolean array: guess i lies inside the area"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if not self.is_area:
+            return np.zeros(lats.shape, dtype=bool)
+        return shapely.contains_xy(self.geometry, lons, lats)
+
+    def nearest_points(self, lats, lons):
+        """(lats, lons) arrays of the boundary point nearest to each guess"""
+        points = shapely.points(np.asarray(lons, dtype=np.float64), np.asarray(lats, dtype=np.float64))
+        lines = shapely.shortest_line(self.edges, points)
+        # Every shortest line has two coordinates, the first one lies on the edges
+        coordinates = shapely.get_coordinates(lines).reshape(-1, 2, 2)[:, 0, :]
+        return coordinates[:, 1], coordinates[:, 0]
+
+    def distances_km(self, lats, lons):
+        """
+        Distance from each guess to the area in kilometers (0 inside the area).
+
+        Args:
+            lats, lons: Sequences of guess coordinates
+
+        Returns:
+            NumPy array of distances
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        distances = np.zeros(lats.shape, dtype=np.float64)
+        if lats.size == 0:
+            return distances
+
+        outside = ~self.contains(lats, lons)
+        if outside.any():
+            nearest_lats, nearest_lons = self.nearest_points(lats[outside], lons[outside])
+            distances[outside] = haversine_km(lats[outside], lons[outside], nearest_lats, nearest_lons)
+        return distances
+
+    def distance_km(self, lat, lon):
+        return float(self.distances_km([lat], [lon])[0])
+
+
+class GeometryCache:
+    """Parsed and prepared LocationGeometry per GeoJSON content (LRU, MAX_ENTRIES areas)"""
+
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(loc_json):
+        return hashlib.sha1(json.dumps(loc_json, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, loc_json):
+        key = self.key(loc_json)
+        with self._lock:
+            geometry = self._entries.get(key)
+            if geometry is not None:
+                self._entries.move_to_end(key)
+                return geometry
+
+        geometry = LocationGeometry(geometry_from_loc_json(loc_json))
+
+        with self._lock:
+            self._entries[key] = geometry
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+        return geometry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Create singleton instance
+geometry_cache = GeometryCache()
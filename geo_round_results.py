@@ -0,0 +1,102 @@
+"""
+GeoGuessr Round Results
+
+Computes everything the end of a GeoGuessr round needs in one pass:
+distances of all guesses (area or point, see geo_geometry.py), the no-guess
+penalty, cumulative totals, the ranking and the winners. GeoGuessrGame uses
+the same result for the display/player emission and for the score update,
+so winners are determined exactly once per round.
+"""
+
+import numpy as np
+
+from geo_geometry import geometry_cache, haversine_km
+
+# Distance charged to players who did not submit a guess
+PENALTY_DISTANCE_KM = 20000.0
+
+# Players within 250m (total distance) win; if nobody is, the closest player wins
+PERFECT_GUESS_THRESHOLD_KM = 0.25
+
+
+def guess_distances(location, player_guesses):
+    """
+    Distances in kilometers from every guess to the location.
+
+    Uses the location area (0 inside) when loc_json is available, otherwise the point.
+
+    Returns:
+        (usernames, NumPy array of distances) in player_guesses order
+    """
+    usernames = list(player_guesses)
+    lats = np.array([float(player_guesses[username]['latitude']) for username in usernames], dtype=np.float64)
+    lons = np.array([float(player_guesses[username]['longitude']) for username in usernames], dtype=np.float64)
+
+    loc_json = location.get('loc_json')
+    if loc_json:
+        distances = geometry_cache.get(loc_json).distances_km(lats, lons)
+    else:
+        distances = haversine_km(location['latitude'], location['longitude'], lats, lons)
+
+    return usernames, np.asarray(distances, dtype=np.float64).reshape(-1)
+
+
+def determine_winners(player_total_distances):
+    """Players within PERFECT_GUESS_THRESHOLD_KM, or the single closest player if there are none"""
+    if not player_total_distances:
+        return []
+
+    usernames = list(player_total_distances)
+    totals = np.fromiter(player_total_distances.values(), dtype=np.float64, count=len(usernames))
+
+    within = np.flatnonzero(totals <= PERFECT_GUESS_THRESHOLD_KM)
+    if within.size:
+        return [usernames[i] for i in within]
+    return [usernames[int(np.argmin(totals))]]
+
+
+def compute_round_results(location, player_guesses, players, previous_totals=None):
+    """
+    Evaluate one round.
+
+    Args:
+        location: Current location data (latitude/longitude and optional loc_json)
+        player_guesses: {username: {'latitude', 'longitude'}}
+        players: Usernames of all players in the game (those without a guess get the penalty)
+        previous_totals: {username: cumulative distance} from earlier rounds
+
+    Returns:
+        Dict with
+            'results': {username: {'guess', 'distance', 'total_distance'}}
+            'player_total_distances': updated cumulative distances
+            'ranking': usernames sorted by round distance (closest first)
+            'winners': usernames that get the round point
+    """
+    player_total_distances = dict(previous_totals or {})
+
+    guessed, distances = guess_distances(location, player_guesses)
+    missing = [username for username in players if username not in player_guesses]
+
+    usernames = guessed + missing
+    distances = np.concatenate([distances, np.full(len(missing), PENALTY_DISTANCE_KM)])
+    previous = np.array([player_total_distances.get(username, 0.0) for username in usernames], dtype=np.float64)
+    totals = previous + distances
+
+    results = {}
+    for i, username in enumerate(usernames):
+        guess = player_guesses.get(username, {'latitude': 0, 'longitude': 0})  # Dummy coordinates for penalties
+        results[username] = {
+            'guess': guess,
+            'distance': float(distances[i]),
+            'total_distance': float(totals[i])
+        }
+        player_total_distances[username] = float(totals[i])
+
+    ranking = [usernames[i] for i in np.argsort(distances, kind='stable')]
+
+    return {
+        'results': results,
+        'player_total_distances': player_total_distances,
+        'ranking': ranking,
+        'winners': determine_winners(player_total_distances)
+    }
@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration for production.
+
+    python bootstrap.py                      # once per deployment: tables, migrations, game state reset
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+ASYNC_WORKER selects gevent (default, gevent-websocket worker) or eventlet.
+Socket.IO needs sticky sessions, so keep WEB_CONCURRENCY at 1 per gunicorn
+instance; to scale out run several instances (different PORTs) behind a
+sticky load balancer with REDIS_URL set (multi-worker mode).
+"""
+
+import os
+
+ASYNC_WORKER = os.getenv('ASYNC_WORKER', 'gevent')
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+
+if ASYNC_WORKER == 'eventlet':
+    worker_class = 'eventlet'
+else:
+    worker_class = 'geventwebsocket.gunicorn.workers.GeventWebSocketWorker'
+
+# Long-lived websocket/polling connections; don't let gunicorn kill them as hung requests
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+# Never reload or preload: wsgi.py starts the background tasks on import,
+# which must happen inside each (already monkey-patched) worker
+reload = False
+preload_app = False
+
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+accesslog = '-'
+errorlog = '-'
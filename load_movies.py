@@ -2,7 +2,7 @@ import json
 import requests
 import time
 from app import app
-from db import db
+from db import db, create_schema
 from models.game import Movie
 
 # TMDB API Configuration
@@ -151,4 +151,5 @@ if __name__ == "__main__":
         print("ERROR: Please set your TMDB API key in the TMDB_API_KEY variable")
         print("You can get an API key from: https://www.themoviedb.org/settings/api")
     else:
+        create_schema(app)
         import_movies()
@@ -0,0 +1,287 @@
+"""
+Location Index
+
+Spatial index (shapely STRtree) over all GeoGuessr locations: their areas
+where loc_json is set, their lat/lng point otherwise.
+
+Supports
+  - nearest known locations to a guess (hints on the results display)
+  - duplicate/overlap detection when seeding new locations
+  - region (bounding box) filtering for session setup
+
+Tree queries work in degrees; candidates are then ranked by the real
+distance in kilometers (0 inside an area, see geo_geometry.py). A distance in
+kilometers becomes a search radius in degrees through the haversine bounds
+of search_box(), and searches near the antimeridian also query the point
+shifted by 360 degrees.
+
+Like the movie search index, the index is rebuilt lazily: in-process
+changes mark it stale through mapper events, and changes from other
+processes are picked up by a count/max-id check every
+LOCATION_INDEX_CHECK_INTERVAL seconds (var.env).
+"""
+
+from dotenv import load_dotenv
+from sqlalchemy import event, func
+import math
+import numpy as np
+import os
+import shapely
+import shapely.affinity
+import threading
+import time
+
+from geo_geometry import EARTH_RADIUS_KM, LocationGeometry, geometry_from_loc_json
+from models.game import GeoGuessrLocation
+from db import db
+
+load_dotenv('var.env')
+LOCATION_INDEX_CHECK_INTERVAL = float(os.getenv('LOCATION_INDEX_CHECK_INTERVAL', '60'))
+
+
+def search_box(distance_km, max_abs_lat):
+    """
+    Latitude and longitude spans (degrees) holding every point within
+    distance_km of a point at |latitude| <= max_abs_lat.
+
+    From the haversine formula: the latitude differs by at most the angle
+    itself, and sin(dlon/2) * cos(lat) <= sin(angle/2) at any latitude the
+    other point can have. The longitude span is None when the distance
+    reaches all longitudes (near the poles or across the globe).
+    """
+    angle = distance_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    if angle >= math.pi:
+        return dlat, None
+
+    edge_cos = math.cos(math.radians(min(90.0, max_abs_lat + dlat)))
+    half_sin = math.sin(angle / 2)
+    if edge_cos <= half_sin:
+        return dlat, None
+    return dlat, math.degrees(2 * math.asin(half_sin / edge_cos))
+
+
+class _LocationIndex:
+    def __init__(self, rows):
+        self.ids = []
+        self.question_ids = []
+        self.names = []
+        self.points = []       # (lat, lon) of each location
+        self.geometries = []   # LocationGeometry of each location
+
+        for location_id, question_id, name, latitude, longitude, loc_json in rows:
+            geometry = None
+            if loc_json:
+                try:
+                    geometry = geometry_from_loc_json(loc_json)
+                except Exception as e:
+                    print(f"LocationIndex: Invalid loc_json for location {location_id}, using its point: {e}")
+            if geometry is None:
+                geometry = shapely.Point(longitude, latitude)
+
+            self.ids.append(location_id)
+            self.question_ids.append(question_id)
+            self.names.append(name)
+            self.points.append((latitude, longitude))
+            self.geometries.append(LocationGeometry(geometry))
+
+        self.tree = shapely.STRtree([geometry.geometry for geometry in self.geometries])
+        # Plain lat/lng points, for duplicates of areas whose point is close but whose area is not
+        self.point_tree = shapely.STRtree([shapely.Point(longitude, latitude) for latitude, longitude in self.points])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def describe(self, position, distance_km=None):
+        latitude, longitude = self.points[position]
+        entry = {
+            'id': self.ids[position],
+            'question_id': self.question_ids[position],
+            'location_name': self.names[position],
+            'latitude': latitude,
+            'longitude': longitude,
+            'is_area': self.geometries[position].is_area
+        }
+        if distance_km is not None:
+            entry['distance_km'] = round(distance_km, 3)
+        return entry
+
+
+class LocationIndex:
+    def __init__(self, check_interval=LOCATION_INDEX_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._index = None
+        self._signature = None
+        self._stale = True
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark the index stale; it is rebuilt on the next query"""
+        self._stale = True
+
+    @staticmethod
+    def _table_signature():
+        return tuple(db.session.query(func.count(GeoGuessrLocation.id), func.max(GeoGuessrLocation.id)).one())
+
+    def _ensure_fresh(self):
+        """Rebuild the index if locations changed. Must be called inside an application context."""
+        now = time.monotonic()
+        if not self._stale and now - self._last_check < self.check_interval:
+            return self._index
+
+        with self._lock:
+            if not self._stale and now - self._last_check < self.check_interval:
+                return self._index
+
+            signature = self._table_signature()
+            self._last_check = now
+            if self._index is not None and not self._stale and signature == self._signature:
+                return self._index
+
+            started = time.perf_counter()
+            rows = db.session.query(
+                GeoGuessrLocation.id,
+                GeoGuessrLocation.question_id,
+                GeoGuessrLocation.name,
+                GeoGuessrLocation.latitude,
+                GeoGuessrLocation.longitude,
+                GeoGuessrLocation.loc_json
+            ).order_by(GeoGuessrLocation.id).all()
+            self._index = _LocationIndex(rows)
+            self._signature = signature
+            self._stale = False
+            print(f"LocationIndex: Indexed {len(rows)} locations in {(time.perf_counter() - started) * 1000:.0f}ms")
+            return self._index
+
+    @staticmethod
+    def _within_km(index, tree, geometry, distance_km):
+        """
+        Positions of the tree's geometries that may lie within distance_km of
+        geometry: a superset, to be checked with the real distance.
+        """
+        min_lon, min_lat, max_lon, max_lat = geometry.bounds
+        dlat, dlon = search_box(distance_km, max(abs(min_lat), abs(max_lat)))
+        if dlon is None:
+            return set(range(len(index)))
+
+        # The search box is dlat x dlon; the radius of its corner covers it (with a rounding margin)
+        radius = math.hypot(dlat, dlon) * (1 + 1e-9) + 1e-9
+        shifts = [0.0]
+        if min_lon - dlon < -180:
+            shifts.append(360.0)
+        if max_lon + dlon > 180:
+            shifts.append(-360.0)
+
+        positions = set()
+        for shift in shifts:
+            shifted = shapely.affinity.translate(geometry, xoff=shift) if shift else geometry
+            positions.update(int(position) for position in tree.query(shifted, predicate='dwithin', distance=radius))
+        return positions
+
+    @staticmethod
+    def _rank(index, positions, latitude, longitude):
+        """[(distance_km, position)] sorted by distance"""
+        ranked = [
+            (index.geometries[position].distance_km(latitude, longitude), position)
+            for position in positions
+        ]
+        ranked.sort()
+        return ranked
+
+    def nearest(self, latitude, longitude, limit=1, exclude_ids=()):
+        """
+        Return the `limit` locations closest to a point, closest first.
+
+        Args:
+            latitude, longitude: The guess
+            limit: Number of locations to return
+            exclude_ids: Location ids to leave out (e.g. the location being played)
+        """
+        index = self._ensure_fresh()
+        if not index or limit <= 0:
+            return []
+
+        point = shapely.Point(longitude, latitude)
+        excluded = set(exclude_ids)
+        available = len(index) - sum(1 for location_id in index.ids if location_id in excluded)
+        wanted = min(limit, available)
+        if wanted <= 0:
+            return []
+
+        # Any `wanted` candidates bound the distance of the result: grow a planar
+        # radius until there are enough of them
+        _, distances = index.tree.query_nearest(point, return_distance=True)
+        radius = max(float(distances[0]), 1e-6)
+        while True:
+            positions = [
+                int(position) for position in index.tree.query(point, predicate='dwithin', distance=radius)
+                if index.ids[int(position)] not in excluded
+            ]
+            if len(positions) >= wanted:
+                break
+            radius *= 2
+
+        # Everything closer than the k-th of them lies within its distance in kilometers
+        kth_distance = self._rank(index, positions, latitude, longitude)[wanted - 1][0]
+        positions = [
+            position for position in self._within_km(index, index.tree, point, kth_distance)
+            if index.ids[position] not in excluded
+        ]
+
+        ranked = self._rank(index, positions, latitude, longitude)
+        return [index.describe(position, distance) for distance, position in ranked[:limit]]
+
+    def find_duplicates(self, latitude, longitude, loc_json=None, tolerance_km=1.0):
+        """
+        Existing locations that overlap a new one: areas intersecting its area, or
+        anything within tolerance_km of it. Used before seeding new locations.
+        """
+        index = self._ensure_fresh()
+        if not index:
+            return []
+
+        geometry = geometry_from_loc_json(loc_json) if loc_json else shapely.Point(longitude, latitude)
+        guess = shapely.Point(longitude, latitude)
+
+        # Areas near the new location, and locations whose point is near the new area
+        positions = (self._within_km(index, index.tree, geometry, tolerance_km)
+                     | self._within_km(index, index.tree, guess, tolerance_km)
+                     | self._within_km(index, index.point_tree, geometry, tolerance_km))
+
+        new_location = LocationGeometry(geometry)
+        duplicates = []
+        for position in sorted(positions):
+            other = index.geometries[position]
+            if new_location.is_area and other.is_area and shapely.intersects(new_location.geometry, other.geometry):
+                distance = 0.0
+            else:
+                lat, lon = index.points[position]
+                distance = min(new_location.distance_km(lat, lon), other.distance_km(latitude, longitude))
+                if distance > tolerance_km:
+                    continue
+            duplicates.append(index.describe(position, distance))
+
+        duplicates.sort(key=lambda entry: entry['distance_km'])
+        return duplicates
+
+    def in_region(self, min_lat, min_lon, max_lat, max_lon):
+        """Locations intersecting a bounding box, in table order"""
+        index = self._ensure_fresh()
+        if not index:
+            return []
+
+        region = shapely.box(min_lon, min_lat, max_lon, max_lat)
+        positions = np.sort(index.tree.query(region, predicate='intersects'))
+        return [index.describe(int(position)) for position in positions]
+
+
+# Create singleton instance
+location_index = LocationIndex()
+
+
+@event.listens_for(GeoGuessrLocation, 'after_insert')
+@event.listens_for(GeoGuessrLocation, 'after_update')
+@event.listens_for(GeoGuessrLocation, 'after_delete')
+def invalidate_location_index(mapper, connection, target):
+    location_index.invalidate()
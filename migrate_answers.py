@@ -9,7 +9,7 @@ This script:
 """
 
 from app import app
-from db import db
+from db import db, create_schema
 from models.game import Question
 import re
 
@@ -211,6 +211,8 @@ def verify_migration():
 if __name__ == "__main__":
     import sys
 
+    create_schema(app)
+
     print()
     print("Answer Migration Script")
     print("=" * 80)
@@ -443,14 +443,31 @@ class SessionQuestion(db.Model):
     # Relationship to the base question
     question = db.relationship('Question')
 
-    def to_dict(self):
-        question_dict = self.question.to_dict() if self.question else {}
+    # Question columns shown on the board (also the board profile in question_serialization.py)
+    BOARD_QUESTION_COLUMNS = (
+        'question_text', 'answer', 'difficulty', 'question_type',
+        'media_url', 'spotify_track_id', 'auto_play', 'show_duration'
+    )
+
+    def to_dict(self, question_dict=None):
+        """
+        Board entry of this session question.
+
+        question_dict holds the BOARD_QUESTION_COLUMNS of the question (e.g. a cached
+        board profile dict); without it they are read from self.question. Only the
+        question's own columns - Question.to_dict would serialize all its child rows.
+        """
+        if question_dict is None:
+            question = self.question
+            question_dict = {
+                column: getattr(question, column) for column in self.BOARD_QUESTION_COLUMNS
+            } if question else {}
         return {
             'id': self.id,
             'question_id': self.question_id,
             'position': self.position,
             'used': self.used,
-            'question_text': self.question.question_text if self.question else '',
+            'question_text': question_dict.get('question_text', ''),
             'value': self.position * 100,
             # Include all media information from the question
             'question_type': question_dict.get('question_type', 'text'),
@@ -0,0 +1,196 @@
+"""
+Movie Search Index
+
+In-memory search over the movies table for the search_movies socket event.
+
+All titles are loaded once and normalized. A trigram index narrows every
+query down to a bounded set of candidate titles, and only those candidates
+are scored with RapidFuzz (fuzz.partial_ratio, same 60% cutoff and ranking
+as before). Queries shorter than a trigram scan the titles for the query as a
+substring (like the original partial_ratio search), prefix matches first.
+
+The index is rebuilt lazily when movies change: in-process inserts, updates
+and deletes mark it stale through mapper events, and bulk loads from other
+processes (load_movies.py) are picked up by a cheap count/max-id check every
+MOVIE_INDEX_CHECK_INTERVAL seconds (var.env).
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from dotenv import load_dotenv
+from rapidfuzz import fuzz, process
+from sqlalchemy import event, func
+import numpy as np
+import os
+import threading
+import time
+
+from models.game import Movie
+from db import db
+
+load_dotenv('var.env')
+MOVIE_INDEX_CHECK_INTERVAL = float(os.getenv('MOVIE_INDEX_CHECK_INTERVAL', '60'))
+
+NGRAM_SIZE = 3
+MAX_CANDIDATES = 3000  # Titles scored per query
+SCORE_CUTOFF = 60      # Minimum partial_ratio, as in the original search
+RESULT_LIMIT = 10
+
+
+def normalize_title(title):
+    """Lowercase and collapse whitespace"""
+    return ' '.join(title.lower().split())
+
+
+def title_ngrams(text, n=NGRAM_SIZE):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class _MovieIndex:
+    """Immutable snapshot of all movie titles plus lookup structures"""
+
+    def __init__(self, rows):
+        self.ids = [row.id for row in rows]
+        self.titles = [row.title for row in rows]
+        self.years = [row.year for row in rows]
+        self.normalized = [normalize_title(row.title) for row in rows]
+
+        postings = defaultdict(list)
+        for position, text in enumerate(self.normalized):
+            for gram in title_ngrams(text):
+                postings[gram].append(position)
+        self.postings = {gram: np.array(positions, dtype=np.int32) for gram, positions in postings.items()}
+
+        # (normalized title, position) sorted for prefix lookups
+        self.prefix_list = sorted((text, position) for position, text in enumerate(self.normalized))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def candidates(self, query):
+        """Positions of titles worth scoring for a normalized query"""
+        if len(query) < NGRAM_SIZE:
+            return self._short_candidates(query)
+
+        grams = [self.postings[gram] for gram in title_ngrams(query) if gram in self.postings]
+        if not grams:
+            return []
+
+        # Count shared trigrams per title, keep the best MAX_CANDIDATES
+        hits = np.bincount(np.concatenate(grams), minlength=len(self.ids))
+        matched = np.flatnonzero(hits)
+        if len(matched) > MAX_CANDIDATES:
+            top = np.argpartition(hits[matched], -MAX_CANDIDATES)[-MAX_CANDIDATES:]
+            matched = np.sort(matched[top])
+        return matched.tolist()
+
+    def _short_candidates(self, query):
+        """Titles containing a query shorter than a trigram: prefix matches first, then substrings"""
+        start = bisect_left(self.prefix_list, (query, -1))
+        positions = []
+        for text, position in self.prefix_list[start:start + MAX_CANDIDATES]:
+            if not text.startswith(query):
+                break
+            positions.append(position)
+
+        if len(positions) < MAX_CANDIDATES:
+            prefixed = set(positions)
+            for position, text in enumerate(self.normalized):
+                if query in text and position not in prefixed:
+                    positions.append(position)
+                    if len(positions) >= MAX_CANDIDATES:
+                        break
+
+        positions.sort()
+        return positions
+
+
+class MovieSearchIndex:
+    def __init__(self, check_interval=MOVIE_INDEX_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._index = None
+        self._signature = None
+        self._stale = True
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark the index stale; it is rebuilt on the next search"""
+        self._stale = True
+
+    @staticmethod
+    def _table_signature():
+        return tuple(db.session.query(func.count(Movie.id), func.max(Movie.id)).one())
+
+    def _ensure_fresh(self):
+        """Rebuild the index if movies changed. Must be called inside an application context."""
+        now = time.monotonic()
+        if not self._stale and now - self._last_check < self.check_interval:
+            return
+
+        with self._lock:
+            if not self._stale and now - self._last_check < self.check_interval:
+                return
+
+            signature = self._table_signature()
+            self._last_check = now
+            if self._index is not None and not self._stale and signature == self._signature:
+                return
+
+            started = time.perf_counter()
+            rows = db.session.query(Movie.id, Movie.title, Movie.year).order_by(Movie.id).all()
+            self._index = _MovieIndex(rows)
+            self._signature = signature
+            self._stale = False
+            print(f"MovieSearchIndex: Indexed {len(rows)} movies in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def search(self, query, limit=RESULT_LIMIT):
+        """Return up to limit matches, titles starting with the query first, then by fuzzy score"""
+        self._ensure_fresh()
+        index = self._index
+        query_lower = normalize_title(query)
+        if not query_lower or not index:
+            return []
+
+        positions = index.candidates(query_lower)
+        if not positions:
+            return []
+
+        matches = process.extract(
+            query_lower,
+            [index.normalized[position] for position in positions],
+            scorer=fuzz.partial_ratio,
+            score_cutoff=SCORE_CUTOFF,
+            limit=None
+        )
+
+        ranked = []
+        for _, score, candidate in matches:
+            position = positions[candidate]
+            starts_with = index.normalized[position].startswith(query_lower)
+            ranked.append((not starts_with, -score, position))
+
+        # Sort results: prioritize starts_with, then by fuzzy_score, then table order
+        ranked.sort()
+        return [
+            {
+                'id': index.ids[position],
+                'title': index.titles[position],
+                'year': index.years[position],
+                'display': f"{index.titles[position]} ({index.years[position]})",
+                'fuzzy_score': -negative_score,
+                'starts_with': not not_starts_with
+            }
+            for not_starts_with, negative_score, position in ranked[:limit]
+        ]
+
+
+# Create singleton instance
+movie_search_index = MovieSearchIndex()
+
+
+@event.listens_for(Movie, 'after_insert')
+@event.listens_for(Movie, 'after_update')
+@event.listens_for(Movie, 'after_delete')
+def invalidate_movie_search_index(mapper, connection, target):
+    movie_search_index.invalidate()
@@ -0,0 +1,304 @@
+"""
+Player State Store
+
+Per-(game, player) state kept in memory and written back to the
+player_game_state table row by row.
+
+Match Me and Sorting used to keep every player's state inside the shared
+game_data blob, so each answer re-read and re-wrote all players. Here each
+player owns a separate record: an update touches only that player's entry and
+a flush only writes the rows that actually changed.
+
+In multi-worker mode (REDIS_URL) the states live in one Redis hash per game
+type and the dirty set is shared, so any worker can flush them.
+"""
+
+from models.game import PlayerGameState
+from models.user import User
+from db import db
+import json
+import threading
+
+from state_backend import get_redis, redis_key, try_lock, release_lock
+
+
+class PlayerStateStore:
+    def __init__(self):
+        self._states = {}          # {(game_type, username): state dict}
+        self._row_ids = {}         # {(game_type, username): PlayerGameState.id}
+        self._dirty = set()        # Keys changed since the last flush
+        self._loaded_types = set() # Game types already loaded from the database
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _copy(state):
+        return json.loads(json.dumps(state))
+
+    def _ensure_loaded(self, game_type):
+        """Load all rows for a game type in a single query the first time it is used"""
+        if game_type in self._loaded_types:
+            return
+
+        rows = db.session.query(PlayerGameState, User.username).join(
+            User, User.id == PlayerGameState.user_id
+        ).filter(PlayerGameState.game_type == game_type).all()
+
+        for row, username in rows:
+            key = (game_type, username)
+            if key not in self._states:
+                self._states[key] = json.loads(row.game_state) if row.game_state else {}
+            self._row_ids[key] = row.id
+
+        self._loaded_types.add(game_type)
+
+    def get(self, game_type, username, default=None):
+        """Return a copy of a player's state (or a copy of default if there is none)"""
+        with self._lock:
+            self._ensure_loaded(game_type)
+            state = self._states.get((game_type, username))
+            if state is None:
+                return self._copy(default) if default is not None else None
+            return self._copy(state)
+
+    def update(self, game_type, username, state):
+        """Replace one player's state; only this player's row is written on flush"""
+        with self._lock:
+            self._ensure_loaded(game_type)
+            key = (game_type, username)
+            self._states[key] = self._copy(state)
+            self._dirty.add(key)
+
+    def all(self, game_type):
+        """Return {username: state} for every player of a game type"""
+        with self._lock:
+            self._ensure_loaded(game_type)
+            return {
+                username: self._copy(state)
+                for (state_type, username), state in self._states.items()
+                if state_type == game_type
+            }
+
+    def discard(self, game_type=None):
+        """Forget in-memory states without touching the database"""
+        with self._lock:
+            keys = [key for key in self._states if game_type is None or key[0] == game_type]
+            for key in keys:
+                self._states.pop(key, None)
+                self._row_ids.pop(key, None)
+                self._dirty.discard(key)
+            if game_type is None:
+                self._loaded_types.clear()
+            else:
+                self._loaded_types.discard(game_type)
+
+    def clear(self, game_type):
+        """Remove all player states for a game type, in memory and in the database"""
+        with self._lock:
+            self.discard(game_type)
+            # Nothing left to load for this type - skip the initial query
+            self._loaded_types.add(game_type)
+
+        PlayerGameState.query.filter_by(game_type=game_type).delete()
+        db.session.commit()
+
+    def flush(self):
+        """Write changed player states to the database.
+
+        Existing rows are updated by primary key; missing rows are inserted.
+        Must be called inside an application context. Returns the number of rows written.
+        """
+        with self._lock:
+            if not self._dirty:
+                return 0
+            pending = {key: json.dumps(self._states[key]) for key in self._dirty if key in self._states}
+            row_ids = {key: self._row_ids.get(key) for key in pending}
+            self._dirty.clear()
+
+        updates = [
+            {'id': row_ids[key], 'game_state': payload}
+            for key, payload in pending.items() if row_ids[key]
+        ]
+        inserts = {key: payload for key, payload in pending.items() if not row_ids[key]}
+
+        try:
+            if updates:
+                db.session.bulk_update_mappings(PlayerGameState, updates)
+
+            new_rows = {}
+            if inserts:
+                usernames = {username for _, username in inserts}
+                user_ids = dict(db.session.query(User.username, User.id).filter(
+                    User.username.in_(usernames)
+                ).all())
+                for (game_type, username), payload in inserts.items():
+                    user_id = user_ids.get(username)
+                    if user_id is None:
+                        continue
+                    row = PlayerGameState(user_id=user_id, game_type=game_type, game_state=payload)
+                    db.session.add(row)
+                    new_rows[(game_type, username)] = row
+
+            db.session.commit()
+        except Exception as e:
+            print(f"PlayerStateStore: Error flushing player states: {e}")
+            db.session.rollback()
+            with self._lock:
+                # Retry on the next flush
+                self._dirty.update(key for key in pending if key in self._states)
+            return 0
+
+        with self._lock:
+            for key, row in new_rows.items():
+                if key in self._states:
+                    self._row_ids[key] = row.id
+
+        return len(pending)
+
+
+class RedisPlayerStateStore(PlayerStateStore):
+    """Player states shared by all workers through Redis"""
+
+    DIRTY_SEPARATOR = '\x1f'
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self.loaded_key = redis_key('player_state:loaded')
+        self.dirty_key = redis_key('player_state:dirty')
+
+    def _states_key(self, game_type):
+        return redis_key(f'player_state:{game_type}')
+
+    def _dirty_member(self, game_type, username):
+        return f"{game_type}{self.DIRTY_SEPARATOR}{username}"
+
+    def _ensure_loaded(self, game_type):
+        if self.client.sismember(self.loaded_key, game_type):
+            return
+
+        rows = db.session.query(PlayerGameState, User.username).join(
+            User, User.id == PlayerGameState.user_id
+        ).filter(PlayerGameState.game_type == game_type).all()
+
+        pipe = self.client.pipeline()
+        for row, username in rows:
+            # HSETNX keeps states another worker wrote in the meantime
+            pipe.hsetnx(self._states_key(game_type), username, row.game_state or '{}')
+        pipe.sadd(self.loaded_key, game_type)
+        pipe.execute()
+
+    def get(self, game_type, username, default=None):
+        self._ensure_loaded(game_type)
+        state = self.client.hget(self._states_key(game_type), username)
+        if state is None:
+            return self._copy(default) if default is not None else None
+        return json.loads(state)
+
+    def update(self, game_type, username, state):
+        self._ensure_loaded(game_type)
+        pipe = self.client.pipeline()
+        pipe.hset(self._states_key(game_type), username, json.dumps(state))
+        pipe.sadd(self.dirty_key, self._dirty_member(game_type, username))
+        pipe.execute()
+
+    def all(self, game_type):
+        self._ensure_loaded(game_type)
+        return {
+            username: json.loads(state)
+            for username, state in self.client.hgetall(self._states_key(game_type)).items()
+        }
+
+    def discard(self, game_type=None):
+        if game_type is None:
+            game_types = self.client.smembers(self.loaded_key)
+            self.client.delete(self.loaded_key, self.dirty_key, *[self._states_key(t) for t in game_types])
+            return
+
+        prefix = f"{game_type}{self.DIRTY_SEPARATOR}"
+        dirty = [member for member in self.client.smembers(self.dirty_key) if member.startswith(prefix)]
+        pipe = self.client.pipeline()
+        pipe.delete(self._states_key(game_type))
+        pipe.srem(self.loaded_key, game_type)
+        if dirty:
+            pipe.srem(self.dirty_key, *dirty)
+        pipe.execute()
+
+    def clear(self, game_type):
+        self.discard(game_type)
+        self.client.sadd(self.loaded_key, game_type)
+
+        PlayerGameState.query.filter_by(game_type=game_type).delete()
+        db.session.commit()
+
+    def flush(self):
+        """Write changed player states to the database (one worker at a time)"""
+        token = try_lock(self.client, 'player_state_flush', 10000)
+        if not token:
+            return 0
+
+        try:
+            pipe = self.client.pipeline()
+            pipe.smembers(self.dirty_key)
+            pipe.delete(self.dirty_key)
+            members, _ = pipe.execute()
+            if not members:
+                return 0
+
+            keys = [tuple(member.split(self.DIRTY_SEPARATOR, 1)) for member in members]
+            pipe = self.client.pipeline()
+            for game_type, username in keys:
+                pipe.hget(self._states_key(game_type), username)
+            pending = {key: payload for key, payload in zip(keys, pipe.execute()) if payload is not None}
+            if not pending:
+                return 0
+
+            try:
+                # Row ids are looked up fresh - another worker may have inserted the row
+                game_types = {game_type for game_type, _ in pending}
+                usernames = {username for _, username in pending}
+                rows = db.session.query(PlayerGameState.id, PlayerGameState.game_type, User.username).join(
+                    User, User.id == PlayerGameState.user_id
+                ).filter(
+                    PlayerGameState.game_type.in_(game_types),
+                    User.username.in_(usernames)
+                ).all()
+                row_ids = {(game_type, username): row_id for row_id, game_type, username in rows}
+
+                updates = [
+                    {'id': row_ids[key], 'game_state': payload}
+                    for key, payload in pending.items() if key in row_ids
+                ]
+                if updates:
+                    db.session.bulk_update_mappings(PlayerGameState, updates)
+
+                inserts = {key: payload for key, payload in pending.items() if key not in row_ids}
+                if inserts:
+                    user_ids = dict(db.session.query(User.username, User.id).filter(
+                        User.username.in_({username for _, username in inserts})
+                    ).all())
+                    for (game_type, username), payload in inserts.items():
+                        if username in user_ids:
+                            db.session.add(PlayerGameState(
+                                user_id=user_ids[username], game_type=game_type, game_state=payload
+                            ))
+
+                db.session.commit()
+            except Exception as e:
+                print(f"PlayerStateStore: Error flushing player states: {e}")
+                db.session.rollback()
+                # Retry on the next flush
+                self.client.sadd(self.dirty_key, *members)
+                return 0
+
+            return len(pending)
+        finally:
+            release_lock(self.client, 'player_state_flush', token)
+
+
+def create_player_state_store():
+    client = get_redis()
+    return RedisPlayerStateStore(client) if client is not None else PlayerStateStore()
+
+
+# Create singleton instance
+player_state_store = create_player_state_store()
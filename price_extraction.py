@@ -0,0 +1,214 @@
+"""
+Price Extraction
+Finds price and product image in the HTML of an Amazon.de product page.
+
+Pure functions over saved HTML (no browser), so extraction can be tuned and
+benchmarked offline against the recorded pages in fixtures/amazon_pages
+(see benchmark_price_extraction.py).
+
+All selector strategies are evaluated in a single pass of the HTML parser;
+the regex scan over the raw HTML only runs if no selector found a price.
+"""
+
+from html.parser import HTMLParser
+import re
+
+# Price strategies in priority order (same order the scraper always used)
+PRICE_STRATEGIES = (
+    'offscreen',     # .a-price .a-offscreen (most common)
+    'ourprice',      # #priceblock_ourprice
+    'dealprice',     # #priceblock_dealprice
+    'price_whole',   # .a-price-whole
+    'regex',         # "19,99 €" / "€19.99" anywhere in the page
+)
+
+# Selector strategies matched by the parser
+SELECTOR_STRATEGIES = PRICE_STRATEGIES[:-1]
+
+# Look for patterns like "19,99 €", "1.299,00&nbsp;€" or "€19.99" in the raw HTML
+PRICE_PATTERNS = [
+    re.compile(r'(\d{1,3}(?:\.\d{3})+,\d{2}|\d+[,\.]\d{2})(?:\s|&nbsp;|&#160;)*€'),
+    re.compile(r'€(?:\s|&nbsp;|&#160;)*(\d{1,3}(?:,\d{3})+\.\d{2}|\d+[,\.]\d{2})'),
+]
+
+# Elements without an end tag
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+
+def parse_price_text(price_text):
+    """
+    Parse price text into float
+
+    Args:
+        price_text (str): Price string like "19,99 €", "1.299,00 €" or "€19.99"
+
+    Returns:
+        float: Price value or None if parsing fails
+    """
+    try:
+        # Remove currency symbols and extra whitespace
+        cleaned = price_text.replace('€', '').replace('EUR', '').strip()
+
+        # With both separators the last one is the decimal point ("1.299,00", "1,299.00")
+        if ',' in cleaned and '.' in cleaned:
+            thousands_separator = '.' if cleaned.rfind(',') > cleaned.rfind('.') else ','
+            cleaned = cleaned.replace(thousands_separator, '')
+
+        # Replace comma with dot for German prices
+        cleaned = cleaned.replace(',', '.')
+
+        # Remove any remaining non-numeric characters except dot
+        cleaned = re.sub(r'[^\d\.]', '', cleaned)
+
+        # Convert to float
+        price = float(cleaned)
+
+        return price
+    except Exception as e:
+        print(f"Error parsing price text '{price_text}': {e}")
+        return None
+
+
+class ProductPageParser(HTMLParser):
+    """
+    Collects the text of the first element matching each selector strategy,
+    plus the #landingImage / first .a-dynamic-image src, in one pass.
+    """
+
+    def __init__(self, strategies=SELECTOR_STRATEGIES):
+        super().__init__(convert_charrefs=True)
+        self.strategies = set(strategies)
+        self.texts = {}                # strategy -> collected text (first match only)
+        self.landing_image = None
+        self.dynamic_image = None
+        self._stack = []               # (tag, is_a_price, [strategies captured by this element])
+        self._a_price_depth = 0
+        self._capturing = {}           # strategy -> list of text chunks
+
+    def _match(self, element_id, classes):
+        matched = []
+        if 'offscreen' in self.strategies and self._a_price_depth and 'a-offscreen' in classes:
+            matched.append('offscreen')
+        if 'ourprice' in self.strategies and element_id == 'priceblock_ourprice':
+            matched.append('ourprice')
+        if 'dealprice' in self.strategies and element_id == 'priceblock_dealprice':
+            matched.append('dealprice')
+        if 'price_whole' in self.strategies and 'a-price-whole' in classes:
+            matched.append('price_whole')
+        if 'price_whole' in self.strategies and 'a-price-fraction' in classes:
+            matched.append('price_fraction')  # Cents shown next to .a-price-whole
+        return [s for s in matched if s not in self.texts and s not in self._capturing]
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        element_id = attributes.get('id')
+        classes = (attributes.get('class') or '').split()
+
+        if tag == 'img':
+            if element_id == 'landingImage' and self.landing_image is None:
+                self.landing_image = attributes.get('src')
+            elif 'a-dynamic-image' in classes and self.dynamic_image is None:
+                self.dynamic_image = attributes.get('src')
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        captures = self._match(element_id, classes)
+        for strategy in captures:
+            self._capturing[strategy] = []
+
+        # List prices ("Unverb. Preisempf.", "Statt") are struck-through .a-price elements
+        # and often come before the price to pay
+        is_a_price = 'a-price' in classes and attributes.get('data-a-strike') != 'true'
+        if is_a_price:
+            self._a_price_depth += 1
+        self._stack.append((tag, is_a_price, captures))
+
+    def handle_startendtag(self, tag, attrs):
+        # <img ... /> and friends never contain text
+        if tag in VOID_ELEMENTS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS or not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        # Close everything up to the matching tag (tolerates unclosed children)
+        while self._stack:
+            open_tag, is_a_price, captures = self._stack.pop()
+            if is_a_price:
+                self._a_price_depth -= 1
+            for strategy in captures:
+                self.texts[strategy] = ''.join(self._capturing.pop(strategy)).strip()
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        for chunks in self._capturing.values():
+            chunks.append(data)
+
+    @property
+    def image_url(self):
+        return self.landing_image if self.landing_image is not None else self.dynamic_image
+
+
+def extract_price_details(html, strategies=PRICE_STRATEGIES):
+    """
+    Extract price and image from product page HTML.
+
+    Args:
+        html (str): Page HTML
+        strategies: Price strategies to try, in priority order (subset of PRICE_STRATEGIES)
+
+    Returns:
+        dict: {'price', 'image_url', 'strategy' (the one that found the price or None),
+               'candidates' ({strategy: text} for every selector that matched)}
+    """
+    selector_strategies = [s for s in strategies if s in SELECTOR_STRATEGIES]
+    parser = ProductPageParser(selector_strategies)
+    parser.feed(html)
+    parser.close()
+
+    price = None
+    found_by = None
+    for strategy in strategies:
+        if strategy == 'regex':
+            for pattern in PRICE_PATTERNS:
+                match = pattern.search(html)
+                if match:
+                    price = parse_price_text(match.group(1))
+                    if price:
+                        break
+        elif strategy == 'price_whole' and strategy in parser.texts:
+            # .a-price-whole is "34," - the cents are in the following .a-price-fraction
+            price_text = parser.texts[strategy].rstrip(',.')
+            if parser.texts.get('price_fraction'):
+                price_text += ',' + parser.texts['price_fraction']
+            price = parse_price_text(price_text)
+        elif strategy in parser.texts:
+            price = parse_price_text(parser.texts[strategy])
+
+        if price is not None:
+            found_by = strategy
+            break
+
+    return {
+        'price': price,
+        'image_url': parser.image_url,
+        'strategy': found_by,
+        'candidates': dict(parser.texts)
+    }
+
+
+def extract_price_and_image(html, strategies=PRICE_STRATEGIES):
+    """
+    Extract price and image from product page HTML.
+
+    Returns:
+        tuple: (price, image_url) where price is float in euros or None,
+               and image_url is string or None
+    """
+    details = extract_price_details(html, strategies)
+    return (details['price'], details['image_url'])
@@ -0,0 +1,205 @@
+"""
+Puzzle Tiles
+
+Pre-cut co-op puzzle images as WebP sprite sheets, one per image and grid.
+
+Clients used to download the full-resolution image and slice every piece
+themselves. Now the server scales the image down to PUZZLE_MAX_SIZE once, cuts
+it into rows x cols tiles and stores all tiles in one WebP sheet. Each tile
+includes a margin of the neighbouring pixels for the piece tabs. Sheets are
+cached on disk under PUZZLE_TILE_DIR (var.env), keyed by the hash of the image
+content and the grid, so a sheet URL never changes its content and is served
+with a one-year immutable cache header.
+
+Pre-cut sheets for all puzzle images:
+
+    python puzzle_tiles.py 5x5 8x8 12x12
+"""
+
+from dotenv import load_dotenv
+import hashlib
+import json
+import os
+import sys
+import threading
+
+try:
+    from PIL import Image
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+load_dotenv('var.env')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PUZZLE_TILE_DIR = os.getenv('PUZZLE_TILE_DIR') or os.path.join(BASE_DIR, 'cache', 'puzzle_tiles')
+PUZZLE_MAX_SIZE = int(os.getenv('PUZZLE_MAX_SIZE', '1600'))  # Longest side of the board in pixels
+PUZZLE_TILE_QUALITY = int(os.getenv('PUZZLE_TILE_QUALITY', '80'))
+PUZZLE_IMAGE_DIR = os.path.join('static', 'images', 'puzzle')
+
+MIN_GRID = 4
+MAX_GRID = 12
+
+# Tabs reach 1.2 * 0.28 of the smaller piece side into the neighbour (coop-puzzle.js)
+TAB_MARGIN = 0.35
+
+# Browser cache lifetime of sheets (their URL changes with the content)
+SHEET_MAX_AGE = 365 * 24 * 3600
+
+
+def clamp_grid(value, default=5):
+    """Grid dimension limited to MIN_GRID..MAX_GRID"""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(MIN_GRID, min(MAX_GRID, value))
+
+
+def parse_grid(text, default=(5, 5)):
+    """(rows, cols) from "8x8" / "6x8" / "8"; default if the text is empty or invalid"""
+    if not text:
+        return default
+    parts = str(text).lower().split('x')
+    if len(parts) == 1:
+        parts = parts * 2
+    if len(parts) != 2:
+        return default
+    return clamp_grid(parts[0], default[0]), clamp_grid(parts[1], default[1])
+
+
+# Default co-op puzzle grid, e.g. "8x8"
+PUZZLE_GRID = parse_grid(os.getenv('PUZZLE_GRID', '5x5'))
+
+
+class PuzzleTileCache:
+    def __init__(self, cache_dir=PUZZLE_TILE_DIR):
+        self.cache_dir = cache_dir
+        self._hashes = {}  # {file path: (mtime, size, sha1)}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def local_path(image_url):
+        """File path of a puzzle image URL like /static/images/puzzle/x.jpg (None for external URLs)"""
+        if not image_url or image_url.startswith(('http://', 'https://')):
+            return None
+        path = os.path.normpath(os.path.join(BASE_DIR, image_url.lstrip('/')))
+        if not path.startswith(os.path.join(BASE_DIR, 'static')) or not os.path.isfile(path):
+            return None
+        return path
+
+    def image_hash(self, path):
+        """sha1 of the image content, recomputed only when the file changes"""
+        stat = os.stat(path)
+        cached = self._hashes.get(path)
+        if cached and cached[:2] == (stat.st_mtime, stat.st_size):
+            return cached[2]
+
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+        image_hash = digest.hexdigest()
+        self._hashes[path] = (stat.st_mtime, stat.st_size, image_hash)
+        return image_hash
+
+    @staticmethod
+    def sheet_name(image_hash, rows, cols):
+        return f"{image_hash[:16]}_{rows}x{cols}"
+
+    def get_sheet(self, image_url, rows, cols):
+        """
+        Sprite sheet metadata for a puzzle image and grid, cutting the sheet on first use.
+
+        Returns:
+            dict: {'url', 'name', 'rows', 'cols', 'board_width', 'board_height', 'tile_width',
+                   'tile_height', 'margin'} (tile size includes the margin on every side),
+            or None if the image is not a local file or Pillow is missing -
+            the client then slices the original image itself
+        """
+        path = self.local_path(image_url)
+        if path is None or not PILLOW_AVAILABLE:
+            return None
+
+        try:
+            name = self.sheet_name(self.image_hash(path), rows, cols)
+            meta_path = os.path.join(self.cache_dir, f"{name}.json")
+
+            with self._lock:
+                if not os.path.exists(meta_path):
+                    self._build_sheet(path, name, rows, cols)
+                with open(meta_path, encoding='utf-8') as f:
+                    metadata = json.load(f)
+            metadata['url'] = f"/puzzle_tiles/{name}.webp"
+            return metadata
+        except Exception as e:
+            print(f"PuzzleTiles: Could not cut {image_url} into {rows}x{cols}: {e}")
+            return None
+
+    def _build_sheet(self, path, name, rows, cols):
+        with Image.open(path) as source:
+            image = source.convert('RGBA')
+
+        # Scale down (never up) and make the board divisible by the grid
+        scale = min(1.0, PUZZLE_MAX_SIZE / max(image.size))
+        cell_width = max(1, int(image.width * scale) // cols)
+        cell_height = max(1, int(image.height * scale) // rows)
+        board_width, board_height = cell_width * cols, cell_height * rows
+        image = image.resize((board_width, board_height), Image.LANCZOS)
+
+        margin = int(min(cell_width, cell_height) * TAB_MARGIN) + 2
+        tile_width, tile_height = cell_width + 2 * margin, cell_height + 2 * margin
+
+        # Pad with transparency so the edge tiles have the same size
+        padded = Image.new('RGBA', (board_width + 2 * margin, board_height + 2 * margin), (0, 0, 0, 0))
+        padded.paste(image, (margin, margin))
+
+        sheet = Image.new('RGBA', (tile_width * cols, tile_height * rows), (0, 0, 0, 0))
+        for row in range(rows):
+            for col in range(cols):
+                left, top = col * cell_width, row * cell_height
+                tile = padded.crop((left, top, left + tile_width, top + tile_height))
+                sheet.paste(tile, (col * tile_width, row * tile_height))
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        sheet.save(os.path.join(self.cache_dir, f"{name}.webp"), 'WEBP', quality=PUZZLE_TILE_QUALITY, method=4)
+
+        # Metadata last: its presence marks a complete sheet
+        metadata = {
+            'name': name,
+            'rows': rows,
+            'cols': cols,
+            'board_width': board_width,
+            'board_height': board_height,
+            'tile_width': tile_width,
+            'tile_height': tile_height,
+            'margin': margin
+        }
+        with open(os.path.join(self.cache_dir, f"{name}.json"), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f)
+
+        print(f"PuzzleTiles: Cut {os.path.basename(path)} into {rows}x{cols} tiles ({sheet.width}x{sheet.height} sheet)")
+
+    def pregenerate(self, grids):
+        """Cut every image in static/images/puzzle for the given [(rows, cols)]; returns the sheet count"""
+        image_dir = os.path.join(BASE_DIR, PUZZLE_IMAGE_DIR)
+        if not os.path.isdir(image_dir):
+            return 0
+
+        count = 0
+        for filename in sorted(os.listdir(image_dir)):
+            if not filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
+                continue
+            for rows, cols in grids:
+                if self.get_sheet(f'/static/images/puzzle/{filename}', rows, cols):
+                    count += 1
+        return count
+
+
+# Create singleton instance
+puzzle_tile_cache = PuzzleTileCache()
+
+
+if __name__ == '__main__':
+    grids = [parse_grid(arg) for arg in sys.argv[1:]] or [(5, 5)]
+    print(f"PuzzleTiles: Pre-cut {puzzle_tile_cache.pregenerate(grids)} sheet(s)")
@@ -0,0 +1,250 @@
+"""
+Question Bundles
+
+Precompiled select_question payloads of the active board, keyed by
+(category position, value).
+
+Selecting a tile used to load the question with all its child rows, group its
+items by item_order, pick the answer to display and, for GeoGuessr and Match
+Me questions, query the location or category, all while the admin waited for
+the board to react. The bundles do this once for the whole board when the
+platform starts (a handful of batched queries), so a selection is a dict
+lookup plus one commit (old answers deleted, used flag updated).
+
+Each bundle holds
+    question      admin profile question dict with items_by_order/order_sequence
+    display       display profile question dict (buzzer questions)
+    player        player profile question dict (the forward_to_* events)
+    total_items   number of item_order groups (1 without items)
+    answer        primary expected answer, else the first, else question.answer
+    location      GeoGuessrLocation.to_dict() for 'gg' questions
+    match_me_category_id   MatchMeCategory id for 'mm' questions
+
+Bundles are rebuilt lazily when the board of the active session changes
+(another session, edited session questions) and dropped after the commit of a
+change to a question, its child rows, a location or a Match Me category
+(detected through mapper events). In
+multi-worker mode (REDIS_URL) a version counter in Redis, bumped after the
+commit of such a change, makes the other workers rebuild them as well.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+import copy
+import threading
+import time
+
+from models.game import (
+    AnswerExpected, GeoGuessrLocation, MatchMeCategory, Movie, OrderItem, Question, QuestionItem,
+    SessionQuestion, SortingCategory, SortingItem
+)
+from db import db
+from board_state import board_state
+from question_serialization import question_serializer
+from state_backend import get_redis, redis_key
+
+
+def group_items(question_dict):
+    """
+    Add items_by_order and order_sequence to a question dict with items.
+
+    Returns:
+        int: Number of item_order groups (1 for questions without items)
+    """
+    items = question_dict.get('items', [])
+    if not items:
+        return 1
+
+    items_by_order = {}
+    for item in items:
+        items_by_order.setdefault(item['item_order'], []).append(item)
+
+    question_dict['items_by_order'] = items_by_order
+    question_dict['order_sequence'] = sorted(items_by_order)
+    return len(items_by_order)
+
+
+def answer_to_display(question_dict):
+    """Primary expected answer, else the first expected answer, else question.answer"""
+    expected_answers = question_dict.get('expected_answers') or []
+    primary_answer = next((ans for ans in expected_answers if ans['is_primary']), None)
+    if primary_answer:
+        return primary_answer['answer_raw']
+    if expected_answers:
+        return expected_answers[0]['answer_raw']
+    return question_dict.get('answer')
+
+
+class QuestionBundleCache:
+    def __init__(self):
+        self._bundles = {}        # {(category position, value): bundle}
+        self._question_ids = None  # board_state question_ids the bundles were built from
+        self._version = None
+        self._lock = threading.Lock()
+        self._redis = get_redis()
+        self._version_key = redis_key('question_bundles:version')
+
+    def _remote_version(self):
+        return self._redis.get(self._version_key) if self._redis is not None else None
+
+    def invalidate(self):
+        """Drop all bundles; they are rebuilt on the next lookup"""
+        with self._lock:
+            self._bundles = {}
+            self._question_ids = None
+
+    @staticmethod
+    def invalidate_on_commit(session):
+        """Rebuild the bundles on every worker once this database session commits"""
+        session.info['question_bundles_changed'] = True
+
+    def mark_changed(self, target):
+        """Called by the mapper events for changed question rows"""
+        session = object_session(target)
+        if session is not None:
+            self.invalidate_on_commit(session)
+
+    def notify_workers(self):
+        if self._redis is not None:
+            self._redis.incr(self._version_key)
+
+    def precompile(self):
+        """
+        Build the bundles of every question on the active board.
+        Must be called inside an application context.
+
+        Returns:
+            int: Number of bundles
+        """
+        # The other workers rebuild theirs on their next lookup
+        self.notify_workers()
+        version = self._remote_version()
+        with self._lock:
+            self._version = version
+            return self._build(board_state.get())
+
+    def _build(self, board):
+        started = time.perf_counter()
+        if board is None:
+            self._bundles = {}
+            self._question_ids = None
+            return 0
+
+        question_ids = dict(board.question_ids)
+        rows = db.session.query(SessionQuestion.id, SessionQuestion.question_id).filter(
+            SessionQuestion.id.in_(list(question_ids.values()))
+        ).all()
+        question_of = {session_question_id: question_id for session_question_id, question_id in rows}
+
+        questions = question_serializer.many(question_of.values(), 'admin')
+        displays = question_serializer.many(question_of.values(), 'display')
+        players = question_serializer.many(question_of.values(), 'player')
+
+        # Type-specific rows, first row per question as the handlers used to pick them
+        by_type = {}
+        for question_id, question in questions.items():
+            by_type.setdefault(question.get('question_type'), []).append(question_id)
+
+        locations = {}
+        if by_type.get('gg'):
+            for location in GeoGuessrLocation.query.filter(
+                GeoGuessrLocation.question_id.in_(by_type['gg'])
+            ).order_by(GeoGuessrLocation.id).all():
+                locations.setdefault(location.question_id, location.to_dict())
+
+        match_me_categories = {}
+        if by_type.get('mm'):
+            for category_id, question_id in db.session.query(MatchMeCategory.id, MatchMeCategory.question_id).filter(
+                MatchMeCategory.question_id.in_(by_type['mm'])
+            ).order_by(MatchMeCategory.id).all():
+                match_me_categories.setdefault(question_id, category_id)
+
+        bundles = {}
+        for key, session_question_id in question_ids.items():
+            question_id = question_of.get(session_question_id)
+            question = questions.get(question_id)
+            if question is None:
+                continue
+
+            total_items = group_items(question)
+            bundles[key] = {
+                'session_question_id': session_question_id,
+                'question_id': question_id,
+                'question': question,
+                'display': displays.get(question_id),
+                'player': players.get(question_id),
+                'total_items': total_items,
+                'answer': answer_to_display(question),
+                'location': locations.get(question_id),
+                'match_me_category_id': match_me_categories.get(question_id)
+            }
+
+        self._bundles = bundles
+        self._question_ids = question_ids
+        print(f"QuestionBundles: Compiled {len(bundles)} questions in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return len(bundles)
+
+    def get(self, category_position, value):
+        """
+        Bundle of the board question at (category position, value), or None.
+        Returns a copy that is safe to modify. Must be called inside an application context.
+        """
+        board = board_state.get()
+        if board is None:
+            return None
+
+        version = self._remote_version()
+        with self._lock:
+            # The snapshot is reloaded after every used flag change; only a different board
+            # (or a question changed on another worker) matters
+            if self._question_ids != board.question_ids or version != self._version:
+                self._version = version
+                self._build(board)
+            bundle = self._bundles.get((category_position, value))
+        return copy.deepcopy(bundle) if bundle else None
+
+
+# Create singleton instance
+question_bundles = QuestionBundleCache()
+
+
+@event.listens_for(Question, 'after_update')
+@event.listens_for(Question, 'after_delete')
+@event.listens_for(QuestionItem, 'after_insert')
+@event.listens_for(QuestionItem, 'after_update')
+@event.listens_for(QuestionItem, 'after_delete')
+@event.listens_for(OrderItem, 'after_insert')
+@event.listens_for(OrderItem, 'after_update')
+@event.listens_for(OrderItem, 'after_delete')
+@event.listens_for(AnswerExpected, 'after_insert')
+@event.listens_for(AnswerExpected, 'after_update')
+@event.listens_for(AnswerExpected, 'after_delete')
+@event.listens_for(SortingCategory, 'after_insert')
+@event.listens_for(SortingCategory, 'after_update')
+@event.listens_for(SortingCategory, 'after_delete')
+@event.listens_for(SortingItem, 'after_insert')
+@event.listens_for(SortingItem, 'after_update')
+@event.listens_for(SortingItem, 'after_delete')
+@event.listens_for(GeoGuessrLocation, 'after_insert')
+@event.listens_for(GeoGuessrLocation, 'after_update')
+@event.listens_for(GeoGuessrLocation, 'after_delete')
+@event.listens_for(MatchMeCategory, 'after_insert')
+@event.listens_for(MatchMeCategory, 'after_update')
+@event.listens_for(MatchMeCategory, 'after_delete')
+@event.listens_for(Movie, 'after_update')
+@event.listens_for(Movie, 'after_delete')
+def invalidate_question_bundles(mapper, connection, target):
+    question_bundles.mark_changed(target)
+
+
+@event.listens_for(Session, 'after_commit')
+def question_bundles_committed(session):
+    # Dropped only now: until the commit, other requests still read the old rows
+    if session.info.pop('question_bundles_changed', False):
+        question_bundles.invalidate()
+        question_bundles.notify_workers()
+
+
+@event.listens_for(Session, 'after_rollback')
+def question_bundles_rolled_back(session):
+    session.info.pop('question_bundles_changed', None)
@@ -0,0 +1,273 @@
+"""
+Question Serialization
+
+Serialization profiles for questions, so each consumer gets only the fields
+it needs instead of the full Question.to_dict cascade (items, order items,
+expected answers, sorting categories and items, movie).
+
+    board    the game board: text, answer and media settings, no child rows
+    display  the display: media, multi-item settings and the question items
+    player   the players (forward_to_* events): like display plus the input
+             fields of the expected answers (type and hint, never the answer or
+             the correct item) and the names of the order items (not their
+             values or positions, which are the solution)
+    admin    everything, same as Question.to_dict
+
+Questions are loaded with load_only/selectinload for the profile's columns and
+children, and every serialized question is cached per (question id, profile).
+Mapper events on Question and its child rows mark the changed question, and
+its cached entries are dropped once the change commits (a rollback keeps
+them); clear() drops all of them (called on platform start, which also picks
+up edits made by other processes). In multi-worker mode (REDIS_URL) a version
+counter in Redis, bumped after the commit of such a change, tells the other
+workers to drop their cached questions as well.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, load_only, object_session, selectinload
+import copy
+import threading
+
+from models.game import (
+    AnswerExpected, Movie, OrderItem, Question, QuestionItem, SessionQuestion, SortingCategory, SortingItem
+)
+from state_backend import get_redis, redis_key
+
+# Question columns serialized by each profile (admin uses Question.to_dict)
+PROFILE_COLUMNS = {
+    'board': ('id',) + SessionQuestion.BOARD_QUESTION_COLUMNS,
+    'display': (
+        'id', 'question_text', 'question_type', 'media_url', 'media_duration',
+        'spotify_track_id', 'auto_play', 'show_duration', 'multi_item', 'input_expected', 'movie_id'
+    ),
+    'player': (
+        'id', 'question_text', 'question_type', 'media_url', 'multi_item', 'input_expected', 'movie_id'
+    ),
+}
+
+# Child rows serialized by each profile
+PROFILE_CHILDREN = {
+    'board': (),
+    'display': ('items',),
+    'player': ('items', 'expected_answers', 'order_items'),
+}
+
+PROFILES = tuple(PROFILE_COLUMNS) + ('admin',)
+
+
+def _loader_options(profile):
+    """load_only/selectinload options for a profile"""
+    if profile == 'admin':
+        return [
+            selectinload(Question.question_items),
+            selectinload(Question.order_items),
+            selectinload(Question.expected_answers),
+            selectinload(Question.sorting_categories),
+            selectinload(Question.sorting_items),
+            selectinload(Question.movie),
+        ]
+
+    options = [load_only(*[getattr(Question, column) for column in PROFILE_COLUMNS[profile]])]
+    children = PROFILE_CHILDREN[profile]
+    if 'items' in children:
+        options.append(selectinload(Question.question_items))
+    if 'expected_answers' in children:
+        options.append(selectinload(Question.expected_answers).load_only(
+            AnswerExpected.id, AnswerExpected.question_id, AnswerExpected.input_type,
+            AnswerExpected.hint, AnswerExpected.rank
+        ))
+    if 'order_items' in children:
+        options.append(selectinload(Question.order_items).load_only(
+            OrderItem.id, OrderItem.question_id, OrderItem.item_name
+        ))
+    return options
+
+
+def serialize_question(question, profile):
+    """Serialize a loaded Question with one of the PROFILES"""
+    if profile == 'admin':
+        return question.to_dict()
+
+    result = {column: getattr(question, column) for column in PROFILE_COLUMNS[profile]}
+    children = PROFILE_CHILDREN[profile]
+    if 'items' in children:
+        result['items'] = [item.to_dict() for item in question.question_items]
+    if 'expected_answers' in children:
+        # Input form fields only - answers stay on the server
+        result['expected_answers'] = [
+            {'id': ans.id, 'input_type': ans.input_type, 'hint': ans.hint, 'rank': ans.rank}
+            for ans in question.expected_answers
+        ]
+    if 'order_items' in children:
+        # Names only - the players put them in order themselves
+        result['order_items'] = [{'id': item.id, 'item_name': item.item_name} for item in question.order_items]
+    return result
+
+
+class QuestionSerializer:
+    def __init__(self):
+        self._cache = {}  # {(question_id, profile): serialized dict}
+        self._generation = 0  # Bumped on every invalidation, so loads that started before are not cached
+        self._version = None
+        self._lock = threading.Lock()
+        self._redis = get_redis()
+        self._version_key = redis_key('questions:version')
+
+    def _remote_version(self):
+        return self._redis.get(self._version_key) if self._redis is not None else None
+
+    def many(self, question_ids, profile):
+        """
+        Serialize several questions with one query for the ones not cached yet.
+
+        Returns:
+            dict: {question_id: serialized question} (copies, safe to modify)
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown question profile: {profile}")
+
+        question_ids = list(dict.fromkeys(question_ids))
+        version = self._remote_version()
+        with self._lock:
+            if version != self._version:
+                # Questions changed on another worker
+                self._cache.clear()
+                self._generation += 1
+                self._version = version
+            generation = self._generation
+            result = {qid: self._cache[(qid, profile)] for qid in question_ids if (qid, profile) in self._cache}
+
+        missing = [qid for qid in question_ids if qid not in result]
+        if missing:
+            questions = Question.query.options(*_loader_options(profile)).filter(Question.id.in_(missing)).all()
+            loaded = {question.id: serialize_question(question, profile) for question in questions}
+            with self._lock:
+                # A commit during the query may have changed these rows; serve them, but don't cache them
+                if generation == self._generation:
+                    for qid, data in loaded.items():
+                        self._cache[(qid, profile)] = data
+            result.update(loaded)
+
+        return {qid: copy.deepcopy(data) for qid, data in result.items()}
+
+    def get(self, question_id, profile):
+        """One serialized question, or None if it does not exist"""
+        return self.many([question_id], profile).get(question_id)
+
+    def invalidate(self, question_id):
+        with self._lock:
+            for profile in PROFILES:
+                self._cache.pop((question_id, profile), None)
+            self._generation += 1
+
+    def clear(self):
+        """Drop all cached questions (on every worker)"""
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+        self.notify_workers()
+
+    @staticmethod
+    def invalidate_on_commit(session, question_id=None):
+        """Drop a cached question (None: all of them) on every worker once this database session commits"""
+        session.info.setdefault('questions_changed', set()).add(question_id)
+
+    def mark_changed(self, target, question_id=None):
+        """Called by the mapper events for changed question rows"""
+        session = object_session(target)
+        if session is not None:
+            self.invalidate_on_commit(session, question_id)
+
+    def notify_workers(self):
+        if self._redis is not None:
+            self._redis.incr(self._version_key)
+
+
+# Create singleton instance
+question_serializer = QuestionSerializer()
+
+
+def session_board_dict(session_setup):
+    """
+    Board of a session in the shape of SessionSetup.to_dict, with the
+    questions from the cached board profile.
+
+    Load the session with selectinload(session_categories -> category, selected_questions)
+    to keep this at a handful of queries.
+    """
+    session_categories = sorted(session_setup.session_categories, key=lambda sc: sc.position)
+    question_ids = [sq.question_id for sc in session_categories for sq in sc.selected_questions]
+    questions = question_serializer.many(question_ids, 'board')
+
+    categories = []
+    for session_category in session_categories:
+        selected_questions = [
+            session_question.to_dict(questions.get(session_question.question_id, {}))
+            for session_question in sorted(session_category.selected_questions, key=lambda sq: sq.position)
+        ]
+
+        categories.append({
+            'id': session_category.id,
+            'category_id': session_category.category_id,
+            'position': session_category.position,
+            'category_name': session_category.category.name,
+            'selected_questions': selected_questions
+        })
+
+    return {
+        'id': session_setup.id,
+        'name': session_setup.name,
+        'created_at': str(session_setup.created_at),
+        'categories': categories
+    }
+
+
+@event.listens_for(Question, 'after_update')
+@event.listens_for(Question, 'after_delete')
+def invalidate_serialized_question(mapper, connection, target):
+    question_serializer.mark_changed(target, target.id)
+
+
+@event.listens_for(QuestionItem, 'after_insert')
+@event.listens_for(QuestionItem, 'after_update')
+@event.listens_for(QuestionItem, 'after_delete')
+@event.listens_for(OrderItem, 'after_insert')
+@event.listens_for(OrderItem, 'after_update')
+@event.listens_for(OrderItem, 'after_delete')
+@event.listens_for(AnswerExpected, 'after_insert')
+@event.listens_for(AnswerExpected, 'after_update')
+@event.listens_for(AnswerExpected, 'after_delete')
+@event.listens_for(SortingCategory, 'after_insert')
+@event.listens_for(SortingCategory, 'after_update')
+@event.listens_for(SortingCategory, 'after_delete')
+@event.listens_for(SortingItem, 'after_insert')
+@event.listens_for(SortingItem, 'after_update')
+@event.listens_for(SortingItem, 'after_delete')
+def invalidate_question_of_child(mapper, connection, target):
+    question_serializer.mark_changed(target, target.question_id)
+
+
+@event.listens_for(Movie, 'after_update')
+@event.listens_for(Movie, 'after_delete')
+def invalidate_questions_of_movie(mapper, connection, target):
+    # Only the admin profile includes the movie; movie edits are rare
+    question_serializer.mark_changed(target)
+
+
+@event.listens_for(Session, 'after_commit')
+def serialized_questions_committed(session):
+    # Dropped only now: until the commit, other requests still read the old rows
+    question_ids = session.info.pop('questions_changed', None)
+    if not question_ids:
+        return
+    if None in question_ids:
+        question_serializer.clear()
+        return
+    for question_id in question_ids:
+        question_serializer.invalidate(question_id)
+    question_serializer.notify_workers()
+
+
+@event.listens_for(Session, 'after_rollback')
+def serialized_questions_rolled_back(session):
+    session.info.pop('questions_changed', None)
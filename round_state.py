@@ -0,0 +1,103 @@
+"""
+Round State
+
+Per-question state the socket handlers in app.py share: the selected
+question, multi-item position, silhouette phase, the font guesser board and
+the Spotify track being played.
+
+Values are JSON copies: mutating a value you got from get() does not change
+the stored state, call set()/update() to write it back. That keeps the
+in-memory store and the Redis store (multi-worker mode) interchangeable.
+"""
+
+import json
+import threading
+
+from state_backend import get_redis, redis_key
+
+ROUND_STATE_DEFAULTS = {
+    'current_question_data': None,   # Full question data of the selected question
+    'current_item_index': 0,         # Current item of a multi-item question
+    'total_items': 0,                # Number of items of the current question
+    'silhouette_phase': 'idle',      # 'idle', 'growing', 'revealing_color', 'complete'
+    'fg_target': '',                 # Font guesser answer
+    'fg_current_chars': [],          # Font guesser board as shown on the display
+    'fg_space_indices': [],
+    'fg_is_running': False,
+    'fg_swap_interval': 2.5,
+    'current_spotify_track_id': None  # Track loaded for Spotify resume
+}
+
+# Fields cleared whenever a question is closed
+QUESTION_FIELDS = ('current_question_data', 'current_item_index', 'total_items')
+FONT_GUESSER_FIELDS = ('fg_target', 'fg_current_chars', 'fg_space_indices', 'fg_is_running')
+
+
+class RoundState:
+    """In-process round state (single worker)"""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _default(name):
+        if name not in ROUND_STATE_DEFAULTS:
+            raise KeyError(f"Unknown round state field: {name}")
+        return json.loads(json.dumps(ROUND_STATE_DEFAULTS[name]))
+
+    def get(self, name):
+        with self._lock:
+            if name in self._values:
+                return json.loads(self._values[name])
+        return self._default(name)
+
+    def set(self, name, value):
+        self.update(**{name: value})
+
+    def update(self, **values):
+        for name in values:
+            self._default(name)
+        with self._lock:
+            for name, value in values.items():
+                self._values[name] = json.dumps(value)
+
+    def reset(self, *names):
+        """Restore fields to their defaults (all fields if none are given)"""
+        with self._lock:
+            for name in names or list(self._values):
+                self._values.pop(name, None)
+
+
+class RedisRoundState(RoundState):
+    """Round state in a Redis hash shared by all workers"""
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self.key = redis_key('round_state')
+
+    def get(self, name):
+        value = self.client.hget(self.key, name)
+        return json.loads(value) if value is not None else self._default(name)
+
+    def update(self, **values):
+        for name in values:
+            self._default(name)
+        if values:
+            self.client.hset(self.key, mapping={name: json.dumps(value) for name, value in values.items()})
+
+    def reset(self, *names):
+        if names:
+            self.client.hdel(self.key, *names)
+        else:
+            self.client.delete(self.key)
+
+
+def create_round_state():
+    client = get_redis()
+    return RedisRoundState(client) if client is not None else RoundState()
+
+
+# Create singleton instance
+round_state = create_round_state()
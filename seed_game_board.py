@@ -4,7 +4,7 @@ Seed script to create sample categories and questions for the game board
 """
 
 from app import app
-from db import db
+from db import db, create_schema
 from models.game import Category, Question, SessionSetup, SessionCategory, SessionQuestion
 
 def seed_data():
@@ -126,4 +126,5 @@ def seed_data():
         print("Database seeding completed successfully!")
 
 if __name__ == "__main__":
+    create_schema(app)
     seed_data()
\ No newline at end of file
@@ -4,7 +4,7 @@ Enhanced seed script to create media questions for the game board
 """
 
 from app import app
-from db import db
+from db import db, create_schema
 from models.game import Category, Question, SessionSetup, SessionCategory, SessionQuestion
 
 def seed_media_data():
@@ -161,4 +161,5 @@ def seed_media_data():
         print("Media question seeding completed!")
 
 if __name__ == "__main__":
+    create_schema(app)
     seed_media_data()
\ No newline at end of file
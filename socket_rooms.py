@@ -0,0 +1,69 @@
+"""
+Socket Rooms
+
+Audience rooms for Socket.IO events. Every client joins the room of its role
+in handle_connect:
+
+    players  logged-in players (who also join the room of their username)
+    display  the display pages, which connect with auth {'role': 'display'}
+    admin    the admin panel (the room of the admin's username)
+
+Game events used to go out with broadcast=True, so every phone also received
+display payloads (user lists, results, score tables) and every event sent to
+both the display and the players arrived twice everywhere. BaseGame now emits
+to the rooms of the audience only. The rooms of a client never overlap, so
+emitting to several rooms one after another delivers each event once.
+
+Players and displays that negotiate the compact wire format (auth
+{'compact': 1}, see wire_format.py) join the compact variant of their role
+room, e.g. 'players:compact'. emit_to_rooms sends to both variants and encodes
+the payload once for the compact one. Username rooms always get plain JSON,
+which compact clients accept as well.
+"""
+
+from wire_format import encode_payload
+
+PLAYERS_ROOM = 'players'
+DISPLAY_ROOM = 'display'
+ADMIN_ROOM = 'admin'
+
+DISPLAY_ROLE = 'display'
+
+COMPACT_SUFFIX = ':compact'
+COMPACT_ROOMS = (PLAYERS_ROOM, DISPLAY_ROOM)  # The admin panel always gets plain JSON
+
+
+def compact_room(room):
+    return room + COMPACT_SUFFIX
+
+
+def client_rooms(username, role=None, compact=False):
+    """Rooms a connecting client joins, from its session username and auth role/compact"""
+    if role == DISPLAY_ROLE:
+        rooms = [DISPLAY_ROOM]
+    elif username == 'admin':
+        return [ADMIN_ROOM]
+    elif username:
+        rooms = [username, PLAYERS_ROOM]
+    else:
+        return []
+
+    if compact:
+        rooms[-1] = compact_room(rooms[-1])
+    return rooms
+
+
+def emit_to_rooms(socketio, event, data, *rooms):
+    """Send an event to every client in the given rooms"""
+    compact_data = None
+    for room in rooms:
+        socketio.emit(event, data, room=room)
+        if room in COMPACT_ROOMS:
+            if compact_data is None:
+                compact_data = encode_payload(event, data)
+            socketio.emit(event, compact_data, room=compact_room(room))
+
+
+def emit_to_everyone(socketio, event, data):
+    """Send an event to the players, the display and the admin panel"""
+    emit_to_rooms(socketio, event, data, PLAYERS_ROOM, DISPLAY_ROOM, ADMIN_ROOM)
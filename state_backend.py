@@ -0,0 +1,71 @@
+"""
+State Backend
+
+Selects where shared game state lives.
+
+Without REDIS_URL (the default) everything stays in process memory, which is
+only correct with a single worker. With REDIS_URL set in var.env the app runs
+in multi-worker mode: Flask-SocketIO uses Redis as its message queue and the
+game/round/player state stores, the buzzer arbiter and the active game keep
+their state in Redis so every worker sees the same game.
+"""
+
+from dotenv import load_dotenv
+import os
+import uuid
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    print("Warning: redis not installed. Install with: pip install redis")
+
+load_dotenv('var.env')
+REDIS_URL = os.getenv('REDIS_URL') or None
+REDIS_KEY_PREFIX = os.getenv('REDIS_KEY_PREFIX', 'web_game:')
+
+# Identifies this worker in cross-worker messages
+WORKER_ID = uuid.uuid4().hex
+
+_client = None
+
+
+def multi_worker_enabled():
+    return bool(REDIS_URL)
+
+
+def get_redis():
+    """Shared Redis client for this worker, or None when running in single-worker mode"""
+    global _client
+    if not REDIS_URL:
+        return None
+    if not REDIS_AVAILABLE:
+        raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+    if _client is None:
+        _client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    return _client
+
+
+def redis_key(name):
+    return f"{REDIS_KEY_PREFIX}{name}"
+
+
+def try_lock(client, name, ttl_ms):
+    """Take a short-lived lock; returns the token to release it with, or None if it is held elsewhere"""
+    token = uuid.uuid4().hex
+    if client.set(redis_key(f"lock:{name}"), token, nx=True, px=ttl_ms):
+        return token
+    return None
+
+
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def release_lock(client, name, token):
+    client.eval(_RELEASE_LOCK, 1, redis_key(f"lock:{name}"), token)
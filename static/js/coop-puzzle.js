@@ -1,8 +1,16 @@
 const socket = SocketManager.init();
 const username = localStorage.getItem('username');
 
-const ROWS = 5, COLS = 5, SEED = 777;
+const SEED = 777;
+let ROWS = 5, COLS = 5; // Grid comes with coop_puzzle_ready
+
+// Teammate drag relay: positions are sent relative to the board (0..1 spans it),
+// the server relays them as integers in 1/DRAG_QUANTIZATION
+const DRAG_SEND_INTERVAL = 50; // ms, matches the server's 20 Hz relay
+const DRAG_QUANTIZATION = 1000;
 const img = new Image();
+const sheet = new Image(); // Pre-cut pieces from the server (puzzle_tiles.py)
+let tiles = null;
 const scaledImg = document.createElement('canvas');
 const scaledCtx = scaledImg.getContext('2d');
 
@@ -15,13 +23,23 @@ let pw, ph, tabSize;
 let myTeam = null;
 let gameActive = false;
 let imageLoaded = false;
+let lastDragSent = 0;
+let currentImagePath = null;
 
 function seededRandom(s) {
     const x = Math.sin(s) * 10000;
     return x - Math.floor(x);
 }
 
-function loadImage(imagePath) {
+function loadImage(imagePath, tileInfo) {
+    if (tileInfo) {
+        // Sprite sheet of the pieces: smaller than the original and cached by the browser
+        console.log('Loading puzzle tiles:', tileInfo.url);
+        tiles = tileInfo;
+        sheet.src = tileInfo.url;
+        return;
+    }
+
     if (!imagePath) {
         console.error('No image path provided');
         return;
@@ -32,6 +50,21 @@ function loadImage(imagePath) {
 }
 
 img.onload = () => {
+    setupBoard(img.width, img.height);
+};
+
+sheet.onload = () => {
+    setupBoard(tiles.board_width, tiles.board_height);
+};
+
+sheet.onerror = () => {
+    // Fall back to slicing the original image
+    console.error('Puzzle tiles failed to load, using the full image');
+    tiles = null;
+    img.src = currentImagePath;
+};
+
+function setupBoard(imageWidth, imageHeight) {
     // Get the actual available space from the wrapper element
     const wrapper = document.querySelector('.puzzle-canvas-wrapper');
     const wrapperRect = wrapper.getBoundingClientRect();
@@ -42,7 +75,7 @@ img.onload = () => {
     const boardWidth = availableWidth * 0.9;
 
     // Calculate height based on image aspect ratio
-    const aspectRatio = img.height / img.width;
+    const aspectRatio = imageHeight / imageWidth;
     const scaledWidth = boardWidth;
     const scaledHeight = boardWidth * aspectRatio;
 
@@ -52,10 +85,12 @@ img.onload = () => {
 
     boardOffset = { x: paddingX, y: paddingY };
 
-    // Create scaled version
+    // Create scaled version (only needed when slicing the original image)
     scaledImg.width = scaledWidth;
     scaledImg.height = scaledHeight;
-    scaledCtx.drawImage(img, 0, 0, scaledWidth, scaledHeight);
+    if (!tiles) {
+        scaledCtx.drawImage(img, 0, 0, scaledWidth, scaledHeight);
+    }
 
     // Set canvas size to exactly fit in the wrapper (no CSS scaling needed)
     canvas.width = availableWidth;
@@ -70,7 +105,7 @@ img.onload = () => {
     draw();
     imageLoaded = true;
     console.log('Image loaded and scaled successfully');
-};
+}
 
 function initPuzzle() {
     let s = SEED;
@@ -88,6 +123,7 @@ function initPuzzle() {
             const pieceId = r * COLS + c;
             pieces.push({
                 id: pieceId,
+                row: r, col: c,
                 sx: c*pw, sy: r*ph,
                 tx: c*pw + boardOffset.x, ty: r*ph + boardOffset.y,
                 x: 0, y: 0,
@@ -142,7 +178,11 @@ function draw() {
     ctx.setLineDash([]);
 
     ctx.globalAlpha = 0.05;
-    ctx.drawImage(scaledImg, boardOffset.x, boardOffset.y);
+    if (tiles) {
+        pieces.forEach(p => drawTile(p, p.tx, p.ty, false));
+    } else {
+        ctx.drawImage(scaledImg, boardOffset.x, boardOffset.y);
+    }
     ctx.globalAlpha = 1.0;
 
     pieces.forEach(p => {
@@ -150,12 +190,16 @@ function draw() {
         definePath(ctx, p, p.x, p.y);
         ctx.clip();
 
-        const b = tabSize + 2;
-        ctx.drawImage(
-            scaledImg,
-            p.sx - b, p.sy - b, pw + b * 2, ph + b * 2,
-            p.x - b, p.y - b, pw + b * 2, ph + b * 2
-        );
+        if (tiles) {
+            drawTile(p, p.x, p.y, true);
+        } else {
+            const b = tabSize + 2;
+            ctx.drawImage(
+                scaledImg,
+                p.sx - b, p.sy - b, pw + b * 2, ph + b * 2,
+                p.x - b, p.y - b, pw + b * 2, ph + b * 2
+            );
+        }
 
         ctx.restore();
 
@@ -166,6 +210,32 @@ function draw() {
     });
 }
 
+// Board-relative position of a piece (independent of the screen size)
+function toBoard(p) {
+    return {
+        x: (p.x - boardOffset.x) / scaledImg.width,
+        y: (p.y - boardOffset.y) / scaledImg.height
+    };
+}
+
+// Draw a piece from the sprite sheet at (x, y); withMargin includes the tab area around the cell
+function drawTile(p, x, y, withMargin) {
+    const m = tiles.margin;
+    const cellW = tiles.tile_width - 2 * m, cellH = tiles.tile_height - 2 * m;
+    const scaleX = pw / cellW, scaleY = ph / cellH;
+    const sx = p.col * tiles.tile_width, sy = p.row * tiles.tile_height;
+
+    if (withMargin) {
+        ctx.drawImage(
+            sheet,
+            sx, sy, tiles.tile_width, tiles.tile_height,
+            x - m * scaleX, y - m * scaleY, tiles.tile_width * scaleX, tiles.tile_height * scaleY
+        );
+    } else {
+        ctx.drawImage(sheet, sx + m, sy + m, cellW, cellH, x, y, pw, ph);
+    }
+}
+
 function getPos(e) {
     const r = canvas.getBoundingClientRect();
     const sx = canvas.width / r.width, sy = canvas.height / r.height;
@@ -196,6 +266,18 @@ window.onpointermove = (e) => {
     draggingPiece.x = pos.x - dragOffset.x;
     draggingPiece.y = pos.y - dragOffset.y;
     draw();
+
+    // Let teammates follow the drag (the server batches these into frames)
+    const now = Date.now();
+    if (now - lastDragSent >= DRAG_SEND_INTERVAL) {
+        lastDragSent = now;
+        const boardPos = toBoard(draggingPiece);
+        socket.emit('coop_puzzle_drag', {
+            piece_id: draggingPiece.id,
+            x: boardPos.x,
+            y: boardPos.y
+        });
+    }
 };
 
 window.onpointerup = () => {
@@ -210,10 +292,11 @@ window.onpointerup = () => {
     }
 
     // Send update to server
+    const boardPos = toBoard(draggingPiece);
     socket.emit('coop_puzzle_update_piece', {
         piece_id: draggingPiece.id,
-        x: draggingPiece.x,
-        y: draggingPiece.y,
+        x: boardPos.x,
+        y: boardPos.y,
         isLocked: draggingPiece.isLocked
     });
 
@@ -240,9 +323,12 @@ socket.on('coop_puzzle_ready', function(data) {
     console.log('Puzzle ready, teams:', data.teams);
     console.log('Image path:', data.image_path);
 
-    // Load the puzzle image
-    if (data.image_path && !imageLoaded) {
-        loadImage(data.image_path);
+    // Load the puzzle image (or its pre-cut tiles) for the grid of this puzzle
+    if ((data.image_path || data.tiles) && !imageLoaded) {
+        ROWS = data.rows || ROWS;
+        COLS = data.cols || COLS;
+        currentImagePath = data.image_path;
+        loadImage(data.image_path, data.tiles);
     }
 
     // Find my team
@@ -255,6 +341,32 @@ socket.on('coop_puzzle_ready', function(data) {
 
 });
 
+// Teammates' moves: [piece_id, x, y, username, locked] per moved piece
+socket.on('coop_puzzle_moves', function(data) {
+    if (!imageLoaded) return;
+
+    data.moves.forEach(([pieceId, qx, qy, mover, locked]) => {
+        if (mover === username) return;
+
+        const index = pieces.findIndex(p => p.id === pieceId);
+        if (index === -1) return;
+        const p = pieces[index];
+        if (p === draggingPiece || p.isLocked) return;
+
+        if (locked) {
+            p.x = p.tx;
+            p.y = p.ty;
+            p.isLocked = true;
+        } else {
+            p.x = boardOffset.x + (qx / DRAG_QUANTIZATION) * scaledImg.width;
+            p.y = boardOffset.y + (qy / DRAG_QUANTIZATION) * scaledImg.height;
+        }
+        // Moved pieces are drawn on top, like the own dragged piece
+        pieces.push(pieces.splice(index, 1)[0]);
+    });
+    draw();
+});
+
 socket.on('coop_puzzle_started', function(data) {
     console.log('Puzzle game started!');
     gameActive = true;
@@ -1,5 +1,5 @@
 // Connect to socket.io
-const socket = io();
+const socket = SocketManager.connect({ compact: true });
 
 // DOM elements
 const questionText = document.getElementById('question-text');
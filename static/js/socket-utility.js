@@ -8,12 +8,71 @@ window.SocketManager = {
     // The socket instance
     socket: null,
     
-    // Initialize socket with common handlers
-    init: function() {
+    // Short key -> key table of the compact wire format (sent by the server as 'wire_keys')
+    wireKeys: null,
+
+    // Create a socket without the status handlers
+    // options.role: 'display' for the display pages (joins the display room, see socket_rooms.py)
+    // options.compact: receive large/high-frequency events with short keys (see wire_format.py)
+    connect: function(options) {
+        options = options || {};
+        const auth = {};
+        if (options.role) auth.role = options.role;
+        if (options.compact) auth.compact = 1;
+        const socket = Object.keys(auth).length ? io({ auth: auth }) : io();
+
+        if (options.compact) {
+            socket.on('wire_keys', (data) => {
+                this.wireKeys = {};
+                data.keys.forEach((key, index) => {
+                    this.wireKeys['~' + index.toString(36)] = key;
+                });
+            });
+
+            // Decode compact payloads before the page's handlers see them
+            const on = socket.on.bind(socket);
+            socket.on = (event, handler) => on(event, (data, ...rest) => handler(this.decode(data), ...rest));
+        }
+
+        return socket;
+    },
+
+    // Payload of an event, expanded if it was sent in the compact wire format
+    decode: function(data) {
+        if (!data || typeof data !== 'object' || !('~' in data)) {
+            return data;
+        }
+        if (!this.wireKeys) {
+            console.warn('Compact payload received before the wire key table');
+            return data['~'];
+        }
+        return this.decodeValue(data['~']);
+    },
+
+    decodeValue: function(value) {
+        if (Array.isArray(value)) {
+            return value.map((item) => this.decodeValue(item));
+        }
+        if (!value || typeof value !== 'object') {
+            return value;
+        }
+        const decoded = {};
+        Object.keys(value).forEach((key) => {
+            let name = this.wireKeys[key];
+            if (name === undefined) {
+                name = key.startsWith('~~') ? key.slice(1) : key;
+            }
+            decoded[name] = this.decodeValue(value[key]);
+        });
+        return decoded;
+    },
+
+    // Initialize socket with common handlers (options as for connect)
+    init: function(options) {
         // Only create the socket if it doesn't exist
         if (!this.socket) {
             console.log('Initializing Socket.IO connection');
-            this.socket = io();
+            this.socket = this.connect(options);
             
             // Set up basic handlers
             this.socket.on('connect', () => {
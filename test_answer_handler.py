@@ -0,0 +1,44 @@
+"""
+Tests for the answer evaluation of input questions
+
+Usage: python -m pytest test_answer_handler.py
+"""
+
+import json
+
+from answer_handler import AnswerHandler
+
+
+def guesses(*answers):
+    return [
+        {'user_id': user_id, 'answer_id': user_id, 'answer_raw': answer, 'answer_normalized': answer}
+        for user_id, answer in enumerate(answers, 1)
+    ]
+
+
+def test_rank_number_guesses_orders_by_distance():
+    ranked = AnswerHandler.rank_number_guesses(guesses('120', '90', '105'), '100')
+    assert [result['user_id'] for result in ranked] == [3, 2, 1]
+    assert [result['rank'] for result in ranked] == [1, 2, 3]
+    assert [result['is_winner'] for result in ranked] == [True, False, False]
+
+
+def test_rank_number_guesses_ties_all_win():
+    ranked = AnswerHandler.rank_number_guesses(guesses('95', '105', '80'), '100')
+    assert [result['user_id'] for result in ranked if result['is_winner']] == [1, 2]
+
+
+def test_rank_number_guesses_is_json_serializable():
+    """The results are emitted as they are (close_input_round), so only plain Python types"""
+    ranked = AnswerHandler.rank_number_guesses(guesses('90', '120'), '100')
+    for result in ranked:
+        assert type(result['is_winner']) is bool
+        assert type(result['distance']) is float
+    json.dumps(ranked)
+
+
+if __name__ == "__main__":
+    test_rank_number_guesses_orders_by_distance()
+    test_rank_number_guesses_ties_all_win()
+    test_rank_number_guesses_is_json_serializable()
+    print("All answer handler tests passed")
@@ -0,0 +1,72 @@
+"""
+Tests for first-buzz-wins arbitration
+
+The in-process arbiter and the Lua script of RedisBuzzerArbiter (run on a
+fake Redis, which needs lupa) must agree on the same rules.
+
+Usage: python -m pytest test_buzzer_arbiter.py
+"""
+
+import pytest
+
+from buzzer_arbiter import BuzzerArbiter, RedisBuzzerArbiter
+
+
+def redis_arbiter(**kwargs):
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    return RedisBuzzerArbiter(fakeredis.FakeRedis(decode_responses=True), **kwargs)
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def make_arbiter(request):
+    if request.param == 'memory':
+        return BuzzerArbiter
+    return redis_arbiter
+
+
+def test_first_buzz_wins(make_arbiter):
+    arbiter = make_arbiter()
+    assert arbiter.buzz('alice')[0]
+    accepted, queue = arbiter.buzz('bob')
+    assert not accepted
+    assert [entry['username'] for entry in queue] == ['alice', 'bob']
+    assert [entry['position'] for entry in queue] == [1, 2]
+    assert queue[0]['delta_ms'] == 0
+    assert queue[1]['delta_ms'] >= 0
+    assert arbiter.winner == 'alice'
+
+
+def test_repeated_buzz_ignored(make_arbiter):
+    arbiter = make_arbiter()
+    arbiter.buzz('alice')
+    accepted, queue = arbiter.buzz('alice')
+    assert not accepted
+    assert len(queue) == 1
+
+
+def test_closed_rejects_until_reset(make_arbiter):
+    arbiter = make_arbiter(is_open=False)
+    assert arbiter.buzz('alice') == (False, [])
+
+    arbiter.reset()
+    assert arbiter.buzz('bob')[0]
+    arbiter.close()
+    assert not arbiter.buzz('carol')[0]
+    assert arbiter.winner == 'bob'
+
+    arbiter.reset()
+    assert arbiter.queue() == []
+    assert arbiter.winner is None
+
+
+def test_redis_arbiters_share_one_queue():
+    """Two workers with their own arbiter on the same Redis"""
+    first = redis_arbiter()
+    second = RedisBuzzerArbiter(first.client)
+
+    assert first.buzz('alice')[0]
+    assert not second.buzz('bob')[0]
+    assert not second.buzz('alice')[0]
+    assert second.winner == 'alice'
+    assert [entry['username'] for entry in first.queue()] == ['alice', 'bob']
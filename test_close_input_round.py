@@ -0,0 +1,64 @@
+"""
+Regression test: closing a number-guess round emits its results
+
+The admin's close_input_round ranks all guesses and broadcasts
+input_question_results; the results must be JSON serializable.
+
+Usage: python -m pytest test_close_input_round.py
+"""
+
+import pytest
+
+from app import app, socketio
+from db import create_schema, db
+from models.game import AnswerExpected, AnswerUser, Category, Question
+from models.user import User
+
+
+@pytest.fixture
+def number_question():
+    """A number-guess question with guesses from two players"""
+    create_schema(app)
+    with app.app_context():
+        admin = User.query.filter_by(username='admin').first() or User(username='admin')
+        alice, bob = User(username='alice'), User(username='bob')
+        db.session.add_all([admin, alice, bob])
+
+        category = Category(name='Numbers')
+        question = Question(question_text='How many?', answer='100', question_type='text',
+                            input_expected=True, category=category)
+        db.session.add_all([category, question])
+        db.session.add(AnswerExpected(question=question, input_type='guess', hint='Number',
+                                      answer_raw='100', answer_normalized='100'))
+        db.session.flush()
+
+        db.session.add_all([
+            AnswerUser(user_id=alice.id, question_id=question.id, answer_raw='90', answer_normalized='90'),
+            AnswerUser(user_id=bob.id, question_id=question.id, answer_raw='120', answer_normalized='120'),
+        ])
+        db.session.commit()
+        yield question.id
+
+        AnswerUser.query.filter_by(question_id=question.id).delete()
+        AnswerExpected.query.filter_by(question_id=question.id).delete()
+        db.session.delete(question)
+        db.session.delete(category)
+        User.query.filter(User.username.in_(['alice', 'bob'])).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def test_close_number_guess_round(number_question):
+    flask_client = app.test_client()
+    flask_client.post('/login', data={'username': 'admin'})
+    admin = socketio.test_client(app, flask_test_client=flask_client)
+    admin.get_received()
+
+    admin.emit('close_input_round', {'question_id': number_question})
+    received = {event['name']: event['args'][0] for event in admin.get_received()}
+
+    assert 'error' not in received
+    results = received['input_question_results']
+    assert results['input_type'] == 'guess'
+    winners = [result['username'] for result in results['user_results'] if result['is_winner']]
+    assert winners == ['alice']
+    admin.disconnect()
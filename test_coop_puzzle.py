@@ -0,0 +1,72 @@
+"""
+Tests for co-op puzzle team progress across workers
+
+Teammates connected to different workers lock pieces on separate
+CoopPuzzleGame instances; the team bitset is rebuilt from the shared
+player_state_store on each lock.
+
+Usage: python -m pytest test_coop_puzzle.py
+"""
+
+import pytest
+from flask_socketio import SocketIO
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from app import app
+from db import create_schema, db
+from games.coop_puzzle import CoopPuzzleGame
+from models.game import PlayerGameState
+from models.user import User
+from player_state_store import RedisPlayerStateStore
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    """Two workers' instances of a 4x4 puzzle, alice and bob in one team"""
+    store = RedisPlayerStateStore(fakeredis.FakeRedis(decode_responses=True))
+    monkeypatch.setattr('games.coop_puzzle.player_state_store', store)
+
+    create_schema(app)
+    with app.app_context():
+        db.session.add_all([User(username='alice'), User(username='bob')])
+        db.session.commit()
+
+        games = []
+        for _ in range(2):
+            game = CoopPuzzleGame(SocketIO(), grid='4x4')
+            game.teams = {'team_1': ['alice', 'bob']}
+            game.reset_progress()
+            games.append(game)
+        yield games
+
+        PlayerGameState.query.delete()
+        User.query.filter(User.username.in_(['alice', 'bob'])).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def test_team_progress_counts_locks_from_other_workers(workers):
+    first, second = workers
+    for piece_id in range(8):
+        assert first.lock_piece('alice', piece_id) == 'team_1'
+    for piece_id in range(8, 15):
+        assert second.lock_piece('bob', piece_id) == 'team_1'
+    assert second.team_progress('team_1')['pieces_locked'] == 15
+
+    assert first.lock_piece('alice', 15) == 'team_1'
+    assert first.team_progress('team_1')['pieces_locked'] == 16
+
+
+def test_piece_locked_by_a_teammate_is_not_new(workers):
+    first, second = workers
+    assert first.lock_piece('alice', 3) == 'team_1'
+    assert second.lock_piece('bob', 3) is None
+    assert second.lock_piece('alice', 3) is None
+    assert second.team_progress('team_1')['pieces_locked'] == 1
+
+
+def test_invalid_pieces_are_ignored(workers):
+    first, _ = workers
+    assert first.lock_piece('alice', 16) is None
+    assert first.lock_piece('alice', 'a') is None
+    assert first.lock_piece('carol', 0) is None
@@ -0,0 +1,66 @@
+"""
+Tests for mirroring the active game on all workers
+
+A game started on one worker is published on Redis; the other workers apply
+the event with GameManager._mirror_game_event.
+
+Usage: python -m pytest test_game_manager.py
+"""
+
+import json
+
+import pytest
+from flask_socketio import SocketIO
+
+from app import app
+from games.buzzer import BuzzerGame
+from games.game_manager import GameManager
+from state_backend import WORKER_ID, redis_key
+
+
+@pytest.fixture
+def manager():
+    return GameManager(SocketIO())
+
+
+def test_mirror_activates_game_from_another_worker(manager):
+    with app.app_context():
+        manager._mirror_game_event({'action': 'activate', 'game': 'buzzer', 'kwargs': {}, 'origin': 'other'})
+
+    assert isinstance(manager.active_game, BuzzerGame)
+    assert manager.active_game.is_active
+
+
+def test_mirror_ignores_own_and_unknown_events(manager):
+    manager._mirror_game_event({'action': 'activate', 'game': 'buzzer', 'kwargs': {}, 'origin': WORKER_ID})
+    assert manager.active_game is None
+
+    manager._mirror_game_event({'action': 'activate', 'game': 'chess', 'kwargs': {}, 'origin': 'other'})
+    assert manager.active_game is None
+
+
+def test_mirror_deactivate_clears_active_game(manager):
+    manager.active_game = object()
+    manager._mirror_game_event({'action': 'deactivate', 'origin': 'other'})
+    assert manager.active_game is None
+
+
+def test_publish_active_game(manager, monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr('games.game_manager.get_redis', lambda: redis_client)
+    pubsub = redis_client.pubsub()
+    pubsub.subscribe(redis_key('game_events'))
+    assert pubsub.get_message(timeout=1.0)['type'] == 'subscribe'
+
+    manager.publish_active_game('match_me', {'question_id': 7})
+
+    message = pubsub.get_message(timeout=1.0)
+    assert json.loads(message['data']) == {
+        'action': 'activate', 'game': 'match_me', 'kwargs': {'question_id': 7}, 'origin': WORKER_ID
+    }
+
+
+def test_publish_without_redis_is_a_no_op(manager, monkeypatch):
+    monkeypatch.setattr('games.game_manager.get_redis', lambda: None)
+    manager.publish_active_game('buzzer')
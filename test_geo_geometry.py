@@ -0,0 +1,89 @@
+"""
+Tests for the GeoGuessr area geometry
+
+Usage: python -m pytest test_geo_geometry.py
+"""
+
+import pytest
+
+from geo_geometry import GeometryCache, LocationGeometry, geometry_from_loc_json, haversine_km
+
+# 10 x 10 degree square with a 2 x 2 degree hole in the middle (GeoJSON is lon, lat)
+SQUARE_WITH_HOLE = {
+    'type': 'Polygon',
+    'coordinates': [
+        [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]],
+        [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]],
+    ],
+}
+
+KM_PER_DEGREE = haversine_km(0, 0, 1, 0)
+
+
+def area(geometry):
+    return LocationGeometry(geometry_from_loc_json(geometry))
+
+
+def test_haversine_berlin_paris():
+    assert haversine_km(52.52, 13.405, 48.8566, 2.3522) == pytest.approx(878, abs=2)
+    assert list(haversine_km([0, 0], [0, 0], [0, 1], [0, 0])) == pytest.approx([0, KM_PER_DEGREE])
+
+
+def test_inside_is_zero_and_hole_is_outside():
+    square = area(SQUARE_WITH_HOLE)
+    distances = square.distances_km([2, 5, 5], [2, 5, 12])
+
+    assert distances[0] == 0
+    assert distances[1] == pytest.approx(KM_PER_DEGREE, rel=1e-3)  # Nearest hole ring is 1 degree away
+    assert distances[2] == pytest.approx(haversine_km(5, 12, 5, 10), rel=1e-3)
+    assert list(square.contains([2, 5], [2, 5])) == [True, False]
+
+
+def test_feature_collection_is_union_of_parts():
+    two_squares = {
+        'type': 'FeatureCollection',
+        'features': [
+            {'type': 'Feature', 'geometry': {'type': 'Polygon', 'coordinates': [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]}},
+            {'type': 'Feature', 'geometry': {'type': 'Polygon', 'coordinates': [[[20, 0], [21, 0], [21, 1], [20, 1], [20, 0]]]}},
+            {'type': 'Feature', 'geometry': None},
+        ],
+    }
+    squares = area(two_squares)
+
+    assert squares.distance_km(0.5, 20.5) == 0
+    assert squares.distance_km(0.5, 19) == pytest.approx(haversine_km(0.5, 19, 0.5, 20), rel=1e-3)
+
+
+def test_point_location():
+    point = area({'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [13.405, 52.52]}})
+
+    assert not point.is_area
+    assert point.centroid == (52.52, 13.405)
+    assert point.distance_km(48.8566, 2.3522) == pytest.approx(haversine_km(52.52, 13.405, 48.8566, 2.3522))
+
+
+def test_no_guesses():
+    assert area(SQUARE_WITH_HOLE).distances_km([], []).size == 0
+
+
+def test_cache_reuses_parsed_geometry():
+    cache = GeometryCache()
+    first = cache.get(SQUARE_WITH_HOLE)
+
+    assert cache.get(dict(reversed(list(SQUARE_WITH_HOLE.items())))) is first
+    cache.clear()
+    assert cache.get(SQUARE_WITH_HOLE) is not first
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(GeometryCache, 'MAX_ENTRIES', 2)
+    cache = GeometryCache()
+    points = [{'type': 'Point', 'coordinates': [lon, 0]} for lon in range(3)]
+    first = cache.get(points[0])
+    cache.get(points[1])
+    cache.get(points[0])
+    cache.get(points[2])  # Evicts points[1]
+
+    assert cache.get(points[0]) is first
+    assert len(cache._entries) == 2
+    assert GeometryCache.key(points[1]) not in cache._entries
@@ -0,0 +1,116 @@
+"""
+Tests for the GeoGuessr location index
+
+nearest, find_duplicates and in_region are checked against a brute-force
+scan of every location, including guesses near the antimeridian.
+
+Usage: python -m pytest test_location_index.py
+"""
+
+import random
+
+import pytest
+import shapely
+
+from geo_geometry import LocationGeometry
+from location_index import LocationIndex, _LocationIndex, search_box
+
+
+def random_rows(count, seed):
+    """(id, question_id, name, lat, lon, loc_json) rows; every 10th location is a small area"""
+    rnd = random.Random(seed)
+    rows = []
+    for location_id in range(1, count + 1):
+        lat, lon = rnd.uniform(-80, 80), rnd.uniform(-180, 180)
+        loc_json = None
+        if location_id % 10 == 0:
+            size = rnd.uniform(0.1, 3)
+            east, north = min(lon + size, 180), lat + size
+            loc_json = {'type': 'Polygon', 'coordinates': [[[lon, lat], [east, lat], [east, north], [lon, north], [lon, lat]]]}
+        rows.append((location_id, location_id, f"Location {location_id}", lat, lon, loc_json))
+    return rows
+
+
+def random_guesses(count, seed):
+    """Guesses anywhere, a third of them within 5 degrees of the antimeridian"""
+    rnd = random.Random(seed)
+    guesses = []
+    for i in range(count):
+        lon = rnd.uniform(-180, 180) if i % 3 else rnd.choice([rnd.uniform(175, 180), rnd.uniform(-180, -175)])
+        guesses.append((rnd.uniform(-85, 85), lon))
+    return guesses
+
+
+@pytest.fixture(scope='module')
+def index():
+    return _LocationIndex(random_rows(600, seed=1))
+
+
+@pytest.fixture
+def location_index(index, monkeypatch):
+    location_index = LocationIndex()
+    monkeypatch.setattr(location_index, '_ensure_fresh', lambda: index)
+    return location_index
+
+
+def test_search_box_holds_the_distance():
+    dlat, dlon = search_box(500, 60)
+    assert dlat == pytest.approx(500 / 111.19, rel=1e-3)
+    assert dlon > dlat  # A degree of longitude is shorter away from the equator
+    assert search_box(500, 89)[1] is None  # Reaches over the pole
+
+
+@pytest.mark.parametrize('limit', [1, 5, 20])
+def test_nearest_matches_brute_force(index, location_index, limit):
+    for latitude, longitude in random_guesses(60, seed=limit):
+        excluded = {index.ids[0], index.ids[9]}
+        expected = sorted(
+            index.geometries[position].distance_km(latitude, longitude)
+            for position in range(len(index)) if index.ids[position] not in excluded
+        )[:limit]
+
+        found = location_index.nearest(latitude, longitude, limit, exclude_ids=excluded)
+
+        assert [entry['distance_km'] for entry in found] == [round(distance, 3) for distance in expected]
+        assert not excluded & {entry['id'] for entry in found}
+
+
+def test_nearest_across_the_antimeridian(location_index, monkeypatch):
+    index = _LocationIndex([
+        (1, 1, 'West of the line', 0.0, -179.5, None),
+        (2, 2, 'Far away', 0.0, 170.0, None),
+    ])
+    monkeypatch.setattr(location_index, '_ensure_fresh', lambda: index)
+
+    assert location_index.nearest(0.0, 177.0)[0]['location_name'] == 'West of the line'
+
+
+@pytest.mark.parametrize('tolerance_km', [1, 100, 800])
+def test_find_duplicates_matches_brute_force(index, location_index, tolerance_km):
+    for latitude, longitude in random_guesses(40, seed=tolerance_km):
+        new_location = LocationGeometry(shapely.Point(longitude, latitude))
+        expected = sorted(
+            index.ids[position] for position in range(len(index))
+            if min(new_location.distance_km(*index.points[position]),
+                   index.geometries[position].distance_km(latitude, longitude)) <= tolerance_km
+        )
+
+        found = location_index.find_duplicates(latitude, longitude, tolerance_km=tolerance_km)
+
+        assert sorted(entry['id'] for entry in found) == expected
+
+
+def test_in_region_matches_brute_force(index, location_index):
+    rnd = random.Random(3)
+    for _ in range(30):
+        min_lat, min_lon = rnd.uniform(-80, 60), rnd.uniform(-180, 150)
+        max_lat, max_lon = min_lat + rnd.uniform(1, 20), min_lon + rnd.uniform(1, 30)
+        region = shapely.box(min_lon, min_lat, max_lon, max_lat)
+        expected = [
+            index.ids[position] for position in range(len(index))
+            if shapely.intersects(index.geometries[position].geometry, region)
+        ]
+
+        found = location_index.in_region(min_lat, min_lon, max_lat, max_lon)
+
+        assert [entry['id'] for entry in found] == expected
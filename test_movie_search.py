@@ -0,0 +1,98 @@
+"""
+Tests for the in-memory movie search index
+
+Usage: python -m pytest test_movie_search.py
+"""
+
+from collections import namedtuple
+
+import pytest
+
+from app import app
+from db import create_schema, db
+from models.game import Movie
+from movie_search import MovieSearchIndex, _MovieIndex, movie_search_index
+
+Row = namedtuple('Row', 'id title year')
+
+TITLES = ["The Matrix", "Mad Max", "Inception", "Die Hard", "Amadeus"]
+
+
+def make_index():
+    return _MovieIndex([Row(i + 1, title, 2000) for i, title in enumerate(TITLES)])
+
+
+def titles_of(index, positions):
+    return {index.titles[position] for position in positions}
+
+
+def test_short_query_matches_substrings():
+    """Queries shorter than a trigram match inside titles, not only at the start"""
+    index = make_index()
+    assert titles_of(index, index.candidates('ma')) == {"The Matrix", "Mad Max", "Amadeus"}
+
+
+def test_short_query_single_character():
+    index = make_index()
+    assert "Die Hard" in titles_of(index, index.candidates('h'))
+
+
+def test_trigram_query():
+    index = make_index()
+    assert "The Matrix" in titles_of(index, index.candidates('matr'))
+    assert index.candidates('xyz') == []
+
+
+def test_search_ranks_prefix_matches_first():
+    search_index = MovieSearchIndex(check_interval=3600)
+    search_index._index = make_index()
+    search_index._stale = False
+    search_index._last_check = float('inf')  # Never checks the database
+
+    results = search_index.search('Ma')
+    assert [result['title'] for result in results] == ["Mad Max", "The Matrix", "Amadeus"]
+    assert results[0]['starts_with'] and not results[1]['starts_with']
+    assert results[0]['display'] == "Mad Max (2000)"
+    assert len(search_index.search('ma', limit=1)) == 1
+    assert search_index.search('   ') == []
+
+
+@pytest.fixture
+def movies():
+    create_schema(app)
+    with app.app_context():
+        db.session.add_all([Movie(title=title, year=2000) for title in TITLES])
+        db.session.commit()
+        yield
+
+        Movie.query.delete()
+        db.session.commit()
+
+
+def test_search_sees_movies_loaded_elsewhere(movies):
+    """A bulk load from another process is found by the count/max-id check"""
+    search_index = MovieSearchIndex(check_interval=0)
+    with app.app_context():
+        assert search_index.search('heat') == []
+
+        db.session.execute(Movie.__table__.insert().values(title="Heat", year=1995))
+        db.session.commit()
+        assert [result['title'] for result in search_index.search('heat')] == ["Heat"]
+
+
+def test_movie_change_marks_index_stale(movies):
+    with app.app_context():
+        movie_search_index.search('heat')
+        assert not movie_search_index._stale
+
+        db.session.add(Movie(title="Heat", year=1995))
+        db.session.commit()
+        assert movie_search_index._stale
+
+
+if __name__ == "__main__":
+    test_short_query_matches_substrings()
+    test_short_query_single_character()
+    test_trigram_query()
+    test_search_ranks_prefix_matches_first()
+    print("All movie search tests passed")
@@ -0,0 +1,37 @@
+"""
+Tests for the price extraction against the Amazon.de fixture pages
+
+Usage: python -m pytest test_price_extraction.py
+"""
+
+from benchmark_price_extraction import FIXTURES_DIR, load_fixtures, price_matches
+from price_extraction import extract_price_details, parse_price_text
+
+
+def test_fixtures_match_manifest():
+    for name, html, expected in load_fixtures(FIXTURES_DIR):
+        result = extract_price_details(html)
+        assert price_matches(result['price'], expected['price']), name
+        assert result['image_url'] == expected['image_url'], name
+        assert result['strategy'] == expected['strategy'], name
+
+
+def test_parse_price_text_thousands_separator():
+    assert parse_price_text('1.299,00\xa0€') == 1299.0
+    assert parse_price_text('€1,299.00') == 1299.0
+    assert parse_price_text('49,99 €') == 49.99
+
+
+def test_struck_through_list_price_is_skipped():
+    html = (
+        '<span class="a-price a-text-price" data-a-strike="true"><span class="a-offscreen">119,00 €</span></span>'
+        '<span class="a-price apexPriceToPay"><span class="a-offscreen">89,00 €</span></span>'
+    )
+    assert extract_price_details(html)['price'] == 89.0
+
+
+if __name__ == "__main__":
+    test_fixtures_match_manifest()
+    test_parse_price_text_thousands_separator()
+    test_struck_through_list_price_is_skipped()
+    print("All price extraction tests passed")
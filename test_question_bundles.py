@@ -0,0 +1,76 @@
+"""
+Tests for the precompiled select_question bundles
+
+With REDIS_URL, a question change committed on another worker makes this
+worker rebuild its bundles.
+
+Usage: python -m pytest test_question_bundles.py
+"""
+
+import pytest
+
+from app import app
+from db import create_schema, db
+from models.game import Category, Question, SessionCategory, SessionQuestion, SessionSetup
+from question_bundles import QuestionBundleCache, question_bundles
+from question_serialization import question_serializer
+
+
+@pytest.fixture
+def board_question():
+    """A question at category 1, value 200 of the only session"""
+    create_schema(app)
+    with app.app_context():
+        category = Category(name='Capitals')
+        question = Question(question_text='Capital of France?', answer='Paris', category=category)
+        session_setup = SessionSetup(name='Test session')
+        session_category = SessionCategory(session=session_setup, category=category, position=1)
+        db.session.add_all([category, question, session_setup, session_category])
+        db.session.flush()
+        db.session.add(SessionQuestion(session_category=session_category, question_id=question.id, position=2))
+        db.session.commit()
+        question_serializer.clear()
+        yield question.id
+
+        db.session.delete(session_setup)
+        db.session.delete(question)
+        db.session.delete(category)
+        db.session.commit()
+
+
+def test_bundles_rebuilt_after_change_on_another_worker(board_question, monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(question_serializer, '_redis', redis_client)
+    bundles = QuestionBundleCache()
+    bundles._redis = redis_client
+
+    with app.app_context():
+        assert bundles.get(1, 200)['question']['question_text'] == 'Capital of France?'
+
+        # An edit on another worker: no mapper events here, only the version bumps after its commit
+        Question.query.filter_by(id=board_question).update({'question_text': 'Capital of Italy?'})
+        db.session.commit()
+        assert bundles.get(1, 200)['question']['question_text'] == 'Capital of France?'
+
+        redis_client.incr(question_serializer._version_key)
+        redis_client.incr(bundles._version_key)
+        assert bundles.get(1, 200)['question']['question_text'] == 'Capital of Italy?'
+
+
+def test_bundles_dropped_on_commit_not_on_flush(board_question):
+    with app.app_context():
+        assert question_bundles.get(1, 200)['question']['question_text'] == 'Capital of France?'
+
+        question = Question.query.get(board_question)
+        question.question_text = 'Capital of Italy?'
+        db.session.flush()
+        assert (1, 200) in question_bundles._bundles
+
+        db.session.rollback()
+        assert question_bundles.get(1, 200)['question']['question_text'] == 'Capital of France?'
+
+        question = Question.query.get(board_question)
+        question.question_text = 'Capital of Italy?'
+        db.session.commit()
+        assert question_bundles.get(1, 200)['question']['question_text'] == 'Capital of Italy?'
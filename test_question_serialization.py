@@ -0,0 +1,122 @@
+"""
+Tests for the question serialization profiles
+
+The player profile goes out with the forward_to_* events, so it must not
+contain the expected answers or the solution of an ordering question. The
+cached session board must have the same shape as SessionSetup.to_dict. With
+REDIS_URL, a question change committed on another worker drops the cache here.
+
+Usage: python -m pytest test_question_serialization.py
+"""
+
+import pytest
+
+from app import app
+from db import create_schema, db
+from models.game import (
+    AnswerExpected, Category, OrderItem, Question, SessionCategory, SessionQuestion, SessionSetup
+)
+from question_serialization import QuestionSerializer, question_serializer, session_board_dict
+
+
+@pytest.fixture
+def ordering_question():
+    """An ordering question with an expected answer, on the board of a session"""
+    create_schema(app)
+    with app.app_context():
+        category = Category(name='Animals')
+        question = Question(question_text='Fastest first', answer='Cheetah', category=category)
+        db.session.add_all([category, question])
+        db.session.add(AnswerExpected(question=question, input_type='text', hint='Animal',
+                                      answer_raw='Cheetah', answer_normalized='cheetah'))
+        db.session.add_all([
+            OrderItem(question=question, item_name='Cheetah', item_value=120.0, position=1),
+            OrderItem(question=question, item_name='Horse', item_value=88.0, position=2),
+        ])
+
+        session_setup = SessionSetup(name='Test session')
+        session_category = SessionCategory(session=session_setup, category=category, position=1)
+        db.session.add_all([session_setup, session_category])
+        db.session.flush()
+        db.session.add(SessionQuestion(session_category=session_category, question_id=question.id, position=2))
+        db.session.commit()
+        question_serializer.clear()
+        yield question.id, session_setup.id
+
+        db.session.delete(session_setup)
+        db.session.delete(question)
+        db.session.delete(category)
+        db.session.commit()
+
+
+def test_player_profile_hides_answers_and_solution(ordering_question):
+    question_id, _ = ordering_question
+    with app.app_context():
+        player = question_serializer.get(question_id, 'player')
+
+    assert 'answer' not in player
+    assert player['expected_answers'] == [
+        {'id': player['expected_answers'][0]['id'], 'input_type': 'text', 'hint': 'Animal', 'rank': None}
+    ]
+    assert sorted(item['item_name'] for item in player['order_items']) == ['Cheetah', 'Horse']
+    for item in player['order_items']:
+        assert set(item) == {'id', 'item_name'}
+
+
+def test_session_board_matches_session_to_dict(ordering_question):
+    _, session_id = ordering_question
+    with app.app_context():
+        session_setup = SessionSetup.query.get(session_id)
+        assert session_board_dict(session_setup) == session_setup.to_dict()
+
+
+def test_serializer_drops_cache_after_change_on_another_worker(ordering_question):
+    fakeredis = pytest.importorskip('fakeredis')
+    question_id, _ = ordering_question
+    serializer = QuestionSerializer()
+    serializer._redis = fakeredis.FakeRedis(decode_responses=True)
+
+    with app.app_context():
+        assert serializer.get(question_id, 'board')['question_text'] == 'Fastest first'
+
+        # An edit on another worker: no mapper events here, only the version bump after its commit
+        Question.query.filter_by(id=question_id).update({'question_text': 'Slowest first'})
+        db.session.commit()
+        assert serializer.get(question_id, 'board')['question_text'] == 'Fastest first'
+
+        serializer._redis.incr(serializer._version_key)
+        assert serializer.get(question_id, 'board')['question_text'] == 'Slowest first'
+
+
+def test_question_change_bumps_version_after_commit(ordering_question, monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    question_id, _ = ordering_question
+    monkeypatch.setattr(question_serializer, '_redis', fakeredis.FakeRedis(decode_responses=True))
+
+    with app.app_context():
+        question = Question.query.get(question_id)
+        question.question_text = 'Slowest first'
+        db.session.flush()
+        assert question_serializer._remote_version() is None
+
+        db.session.commit()
+        assert question_serializer._remote_version() == '1'
+
+
+def test_cached_question_dropped_on_commit_not_on_flush(ordering_question):
+    question_id, _ = ordering_question
+    with app.app_context():
+        assert question_serializer.get(question_id, 'board')['question_text'] == 'Fastest first'
+
+        question = Question.query.get(question_id)
+        question.question_text = 'Slowest first'
+        db.session.flush()
+        assert (question_id, 'board') in question_serializer._cache
+
+        db.session.rollback()
+        assert (question_id, 'board') in question_serializer._cache
+
+        question = Question.query.get(question_id)
+        question.question_text = 'Slowest first'
+        db.session.commit()
+        assert question_serializer.get(question_id, 'board')['question_text'] == 'Slowest first'
@@ -0,0 +1,117 @@
+"""
+Tests for the Redis-backed game and player state stores
+
+Two store instances on one (fake) Redis stand in for two workers.
+
+Usage: python -m pytest test_state_stores.py
+"""
+
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+
+from app import app
+from db import create_schema, db
+from game_state_store import RedisGameStateStore
+from models.game import GameState, PlayerGameState
+from models.user import User
+from player_state_store import RedisPlayerStateStore
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def game_state():
+    """The GameState row, with game data from before the workers started"""
+    create_schema(app)
+    with app.app_context():
+        row = GameState.query.first() or GameState(is_active=True)
+        row.game_data = json.dumps({'round': 1})
+        db.session.add(row)
+        db.session.commit()
+        yield row.id
+
+        GameState.query.filter_by(id=row.id).update({'game_data': '{}'})
+        db.session.commit()
+
+
+@pytest.fixture
+def players():
+    create_schema(app)
+    with app.app_context():
+        db.session.add_all([User(username='alice'), User(username='bob')])
+        db.session.commit()
+        yield
+
+        PlayerGameState.query.delete()
+        User.query.filter(User.username.in_(['alice', 'bob'])).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def test_game_state_seeded_from_database(redis_client, game_state):
+    with app.app_context():
+        assert RedisGameStateStore(redis_client).get() == {'round': 1}
+
+
+def test_game_state_update_is_shared(redis_client, game_state):
+    first, second = RedisGameStateStore(redis_client), RedisGameStateStore(redis_client)
+    with app.app_context():
+        first.update({'status': 'active'})
+        second.update({'scores': {'alice': 2}})
+        assert first.get() == second.get() == {'round': 1, 'status': 'active', 'scores': {'alice': 2}}
+
+        second.reset({'round': 2})
+        assert first.get() == {'round': 2}
+
+
+def test_game_state_flush_writes_once(redis_client, game_state):
+    store = RedisGameStateStore(redis_client)
+    with app.app_context():
+        store.update({'status': 'active'})
+        assert store.flush()
+        assert not store.flush()  # Nothing changed since
+
+        db.session.expire_all()
+        assert json.loads(GameState.query.get(game_state).game_data) == {'round': 1, 'status': 'active'}
+
+
+def test_player_states_are_shared(redis_client, players):
+    first, second = RedisPlayerStateStore(redis_client), RedisPlayerStateStore(redis_client)
+    with app.app_context():
+        first.update('match_me', 'alice', {'matches': 3})
+        second.update('match_me', 'bob', {'matches': 1})
+        assert second.get('match_me', 'alice') == {'matches': 3}
+        assert first.all('match_me') == {'alice': {'matches': 3}, 'bob': {'matches': 1}}
+        assert first.get('match_me', 'carol', default={}) == {}
+
+
+def test_player_states_flush_inserts_then_updates(redis_client, players):
+    store = RedisPlayerStateStore(redis_client)
+    with app.app_context():
+        store.update('match_me', 'alice', {'matches': 3})
+        assert store.flush() == 1
+        assert store.flush() == 0
+
+        store.update('match_me', 'alice', {'matches': 4})
+        assert store.flush() == 1
+        rows = PlayerGameState.query.filter_by(game_type='match_me').all()
+        assert [json.loads(row.game_state) for row in rows] == [{'matches': 4}]
+
+
+def test_player_states_discard_and_clear(redis_client, players):
+    store = RedisPlayerStateStore(redis_client)
+    with app.app_context():
+        store.update('match_me', 'alice', {'matches': 3})
+        store.discard('match_me')
+        assert store.flush() == 0  # The dirty entry went with the state
+
+        store.update('tt', 'bob', {'sorted': 5})
+        store.flush()
+        store.clear('tt')
+        assert store.all('tt') == {}
+        assert PlayerGameState.query.filter_by(game_type='tt').count() == 0
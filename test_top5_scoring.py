@@ -0,0 +1,109 @@
+"""
+Tests for the Top 5 scoring
+
+Usage: python -m pytest test_top5_scoring.py
+"""
+
+import pytest
+
+from app import app
+from db import create_schema, db
+from models.game import AnswerExpected, AnswerUser, Category, Question
+from models.user import User
+from top5_scoring import build_match_matrix, resolve_player_matches, score_top_5_question
+
+EXPECTED = ['mount everest', 'k2', 'kangchenjunga', 'lhotse', 'makalu']
+
+
+def test_match_matrix_exact_fuzzy_and_empty():
+    matrix = build_match_matrix(['k2', 'mount everset', '', 'matterhorn'], EXPECTED)
+
+    assert matrix[0] == [False, True, False, False, False]
+    assert matrix[1] == [True, False, False, False, False]  # Typo within the fuzzy threshold
+    assert not any(matrix[2])
+    assert not any(matrix[3])
+
+
+def test_match_matrix_without_submissions_or_answers():
+    assert build_match_matrix([], EXPECTED) == []
+    assert build_match_matrix(['k2'], []) == [[]]
+
+
+def test_repeated_guess_is_a_duplicate():
+    guesses = [{'answer_normalized': text} for text in ['k2', 'k2', 'lhotse', 'matterhorn']]
+    resolve_player_matches(guesses, build_match_matrix([g['answer_normalized'] for g in guesses], EXPECTED),
+                           [1, 2, 3, 4, 5])
+
+    assert [g['matched_rank'] for g in guesses] == [2, None, 4, None]
+    assert [g['is_correct'] for g in guesses] == [True, False, True, False]
+    assert [g['is_duplicate'] for g in guesses] == [False, True, False, False]
+
+
+def test_guess_claims_next_free_rank():
+    guesses = [{}, {}]
+    resolve_player_matches(guesses, [[True, True], [True, True]], [1, 2])
+
+    assert [g['matched_rank'] for g in guesses] == [1, 2]
+    assert not any(g['is_duplicate'] for g in guesses)
+
+
+@pytest.fixture
+def top5_question():
+    """A Top 5 question with answers from alice (2 correct) and bob (1 correct)"""
+    create_schema(app)
+    with app.app_context():
+        category = Category(name='Mountains')
+        question = Question(question_text='Highest mountains', answer='', question_type='ac', category=category)
+        alice, bob = User(username='alice', overall_score=3), User(username='bob', overall_score=5)
+        db.session.add_all([category, question, alice, bob])
+        db.session.flush()
+        db.session.add_all([
+            AnswerExpected(question_id=question.id, input_type='text', hint='Mountain', rank=rank,
+                           answer_raw=answer.title(), answer_normalized=answer)
+            for rank, answer in enumerate(EXPECTED, start=1)
+        ])
+        db.session.add_all([
+            AnswerUser(user_id=user.id, question_id=question.id, answer_raw=text, answer_normalized=text)
+            for user, text in [(alice, 'k2'), (bob, 'k2'), (alice, 'lhotse'), (bob, 'k2'), (alice, 'alps')]
+        ])
+        db.session.commit()
+        question_id, category_id = question.id, category.id
+        yield question_id
+
+        AnswerUser.query.filter_by(question_id=question_id).delete()
+        AnswerExpected.query.filter_by(question_id=question_id).delete()
+        Question.query.filter_by(id=question_id).delete()
+        Category.query.filter_by(id=category_id).delete()
+        User.query.filter(User.username.in_(['alice', 'bob'])).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def test_score_top_5_question(top5_question):
+    with app.app_context():
+        result = score_top_5_question(top5_question, db.session)
+
+        players = {player['username']: player for player in result['player_results']}
+        assert [answer['rank'] for answer in result['expected_answers']] == [1, 2, 3, 4, 5]
+        assert players['alice']['correct_count'] == 2
+        assert players['alice']['points_earned'] == 1
+        assert players['alice']['new_score'] == 4
+        assert players['bob']['correct_count'] == 1
+        assert players['bob']['points_earned'] == 0
+        assert [g['is_duplicate'] for g in players['bob']['guesses']] == [False, True]
+
+        correct = AnswerUser.query.filter_by(question_id=top5_question, is_correct=True).count()
+        assert correct == 3
+
+
+def test_score_without_expected_answers():
+    create_schema(app)
+    with app.app_context():
+        assert score_top_5_question(-1, db.session) == {'error': 'No expected answers found'}
+
+
+if __name__ == "__main__":
+    test_match_matrix_exact_fuzzy_and_empty()
+    test_match_matrix_without_submissions_or_answers()
+    test_repeated_guess_is_a_duplicate()
+    test_guess_claims_next_free_rank()
+    print("All Top 5 scoring tests passed")
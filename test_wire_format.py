@@ -0,0 +1,90 @@
+"""
+Tests for the compact wire format
+
+Payloads encoded by wire_format.py are decoded with the SocketManager of
+static/js/socket-utility.js (run with node, skipped without it), the same way
+a compact client receives them.
+
+Usage: python -m pytest test_wire_format.py
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from wire_format import COMPACT_MARKER, SHORT_KEYS, WIRE_KEYS, encode_payload, wire_keys_payload
+
+SOCKET_UTILITY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'js', 'socket-utility.js')
+
+# Connects a compact SocketManager to a fake socket, delivers 'wire_keys' and
+# the event read from stdin, and prints what the page's handler received
+NODE_CLIENT = """
+const handlers = {};
+global.window = {};
+global.io = () => ({ on: (event, handler) => { handlers[event] = handler; } });
+require(process.argv[1]);
+
+const message = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const socket = window.SocketManager.connect({ compact: true });
+socket.on(message.event, (data) => console.log(JSON.stringify(data)));
+handlers.wire_keys(message.keys);
+handlers[message.event](message.payload);
+"""
+
+QUESTION_SELECTED = {
+    'category': 'Animals',
+    'value': 200,
+    'question': {
+        'id': 12,
+        'question_text': 'Fastest first',
+        'question_type': 'ordering',
+        'order_items': [{'id': 1, 'item_name': 'Cheetah'}, {'id': 2, 'item_name': 'Horse'}],
+        'items_by_order': {'1': [{'item_text': 'a'}]},
+        'media_url': None,
+    },
+    'alice': {'~score': 3},
+}
+
+
+def decode_in_browser(event, payload):
+    node = shutil.which('node')
+    if node is None:
+        pytest.skip('node is not installed')
+    result = subprocess.run(
+        [node, '-e', NODE_CLIENT, SOCKET_UTILITY],
+        input=json.dumps({'event': event, 'keys': wire_keys_payload(), 'payload': payload}),
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_round_trip_through_socket_utility():
+    encoded = encode_payload('question_selected', QUESTION_SELECTED)
+    assert 'question_text' not in json.dumps(encoded)
+    assert decode_in_browser('question_selected', encoded) == QUESTION_SELECTED
+
+
+def test_round_trip_live_event():
+    scores = {'scores': [{'username': 'alice', 'score': 4}]}
+    assert decode_in_browser('flappy_birds_update_scores', encode_payload('flappy_birds_update_scores', scores)) == scores
+
+
+def test_other_events_unchanged():
+    data = {'question_text': 'Fastest first'}
+    assert encode_payload('buzzer_update', data) is data
+
+
+def test_marker_keys_are_escaped():
+    encoded = encode_payload('fg_swap', {'~9': 1, 'username': 'bob'})[COMPACT_MARKER]
+    assert encoded == {'~~9': 1, SHORT_KEYS['username']: 'bob'}
+
+
+def test_short_codes_are_unique():
+    assert len(set(WIRE_KEYS)) == len(WIRE_KEYS)
+    assert len(set(SHORT_KEYS.values())) == len(WIRE_KEYS)
+    assert SHORT_KEYS['category'] == '~0'
+    assert SHORT_KEYS[WIRE_KEYS[36]] == '~10'
+    assert wire_keys_payload() == {'keys': list(WIRE_KEYS)}
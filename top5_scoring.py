@@ -0,0 +1,189 @@
+"""
+Top 5 Scoring
+
+Scores a Top 5 (question_type = 'ac') question when the admin reveals it.
+
+All submissions are compared against all ranked expected answers in one
+similarity matrix (rapidfuzz cdist, same exact/fuzzy rule as
+AnswerHandler.calculate_text_correctness). Matches are then resolved per
+player: a guess claims the first expected rank it matches that the player
+has not claimed yet; a guess that only matches already-claimed ranks is
+flagged as a duplicate and does not count.
+
+The database work is a fixed number of queries regardless of player count:
+expected answers, submissions (joined with usernames), one UPDATE for
+is_correct, one UPDATE for the winners' scores and one read of their new
+scores.
+"""
+
+from typing import Dict, List
+
+from answer_handler import AnswerHandler, FUZZY_AVAILABLE, NUMPY_AVAILABLE
+from user_directory import user_directory
+from sqlalchemy import case
+
+if FUZZY_AVAILABLE:
+    from rapidfuzz import fuzz, process
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+
+def build_match_matrix(submissions: List[str], expected: List[str]) -> List[List[bool]]:
+    """
+    Return match[i][j] = True if submission i counts as expected answer j.
+
+    Args:
+        submissions: Normalized submitted answers
+        expected: Normalized expected answers (in rank order)
+    """
+    if not submissions or not expected:
+        return [[False] * len(expected) for _ in submissions]
+
+    if not FUZZY_AVAILABLE or not NUMPY_AVAILABLE:
+        return [
+            [AnswerHandler.calculate_text_correctness(submission, [exp])[0] for exp in expected]
+            for submission in submissions
+        ]
+
+    scores = process.cdist(
+        submissions,
+        [exp or '' for exp in expected],
+        scorer=fuzz.token_sort_ratio,
+        dtype=np.float64
+    )
+    matches = scores >= AnswerHandler.FUZZY_THRESHOLD
+
+    # Exact matches always count; empty submissions never do
+    submitted = np.array(submissions, dtype=object)
+    matches |= submitted[:, None] == np.array(expected, dtype=object)[None, :]
+    matches &= (submitted != '')[:, None]
+
+    return matches.tolist()
+
+
+def resolve_player_matches(guesses: List[Dict], match_rows: List[List[bool]], ranks: List[int]) -> None:
+    """
+    Assign matched ranks for one player's guesses (in submission order).
+
+    Adds 'is_correct', 'matched_rank' and 'is_duplicate' to every guess.
+    """
+    claimed = set()
+    for guess, row in zip(guesses, match_rows):
+        matching = [rank for rank, is_match in zip(ranks, row) if is_match]
+        free = [rank for rank in matching if rank not in claimed]
+
+        guess['matched_rank'] = free[0] if free else None
+        guess['is_correct'] = bool(free)
+        guess['is_duplicate'] = bool(matching) and not free
+        if free:
+            claimed.add(free[0])
+
+
+def score_top_5_question(question_id: int, db_session) -> Dict:
+    """
+    Evaluate all submissions for a Top 5 question and award the round point.
+
+    Args:
+        question_id: Question ID to evaluate
+        db_session: SQLAlchemy database session
+
+    Returns:
+        Dict with 'expected_answers' and 'player_results' (top_5_results payload
+        without question_id), or {'error': ...}
+    """
+    from models.game import AnswerExpected, AnswerUser
+    from models.user import User
+
+    expected_answers = db_session.query(AnswerExpected).filter_by(question_id=question_id).all()
+    if not expected_answers:
+        return {'error': 'No expected answers found'}
+
+    submissions = db_session.query(
+        AnswerUser.id,
+        AnswerUser.user_id,
+        AnswerUser.round,
+        AnswerUser.answer_raw,
+        AnswerUser.answer_normalized,
+        User.username
+    ).join(User, User.id == AnswerUser.user_id).filter(
+        AnswerUser.question_id == question_id
+    ).order_by(AnswerUser.id).all()
+
+    ranks = [ans.rank for ans in expected_answers]
+    match_matrix = build_match_matrix(
+        [submission.answer_normalized or '' for submission in submissions],
+        [ans.answer_normalized for ans in expected_answers]
+    )
+
+    # Group guesses per player, keeping submission order
+    player_results = {}
+    player_rows = {}
+    for submission, row in zip(submissions, match_matrix):
+        if submission.user_id not in player_results:
+            player_results[submission.user_id] = {
+                'user_id': submission.user_id,
+                'username': submission.username,
+                'guesses': [],
+                'answer_ids': [],
+                'points_earned': 0
+            }
+            player_rows[submission.user_id] = []
+
+        player_results[submission.user_id]['guesses'].append({
+            'answer_raw': submission.answer_raw,
+            'answer_normalized': submission.answer_normalized,
+            'round': submission.round
+        })
+        player_results[submission.user_id]['answer_ids'].append(submission.id)
+        player_rows[submission.user_id].append(row)
+
+    correct_ids = []
+    for user_id, result in player_results.items():
+        resolve_player_matches(result['guesses'], player_rows[user_id], ranks)
+        result['correct_count'] = sum(1 for g in result['guesses'] if g['is_correct'])
+        correct_ids.extend(
+            answer_id for answer_id, guess in zip(result['answer_ids'], result['guesses']) if guess['is_correct']
+        )
+
+    # Update is_correct for all submissions in one statement
+    if submissions:
+        is_correct = case((AnswerUser.id.in_(correct_ids), True), else_=False) if correct_ids else False
+        db_session.query(AnswerUser).filter(AnswerUser.question_id == question_id).update(
+            {AnswerUser.is_correct: is_correct},
+            synchronize_session=False
+        )
+
+    # Award 1 point only to player(s) with the highest correct_count
+    max_correct = max((r['correct_count'] for r in player_results.values()), default=0)
+    winner_ids = [user_id for user_id, r in player_results.items() if max_correct > 0 and r['correct_count'] == max_correct]
+    user_directory.increment_scores({user_id: 1 for user_id in winner_ids})
+
+    db_session.commit()
+
+    if winner_ids:
+        new_scores = user_directory.scores(winner_ids)
+        for user_id in winner_ids:
+            player_results[user_id]['points_earned'] = 1
+            player_results[user_id]['new_score'] = new_scores.get(user_id, 0)
+
+    return {
+        'expected_answers': [
+            {
+                'rank': ans.rank,
+                'answer_raw': ans.answer_raw,
+                'answer_normalized': ans.answer_normalized
+            }
+            for ans in expected_answers
+        ],
+        'player_results': [
+            {
+                'username': result['username'],
+                'guesses': result['guesses'],
+                'correct_count': result['correct_count'],
+                'points_earned': result['points_earned'],
+                'new_score': result.get('new_score', 0)
+            }
+            for result in player_results.values()
+        ]
+    }
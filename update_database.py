@@ -4,7 +4,7 @@ Update database schema to add media columns to questions table
 """
 
 from app import app
-from db import db
+from db import db, create_schema
 
 def update_database():
     with app.app_context():
@@ -40,4 +40,5 @@ def update_database():
         print("Database schema update completed!")
 
 if __name__ == "__main__":
+    create_schema(app)
     update_database()
\ No newline at end of file
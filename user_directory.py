@@ -0,0 +1,168 @@
+"""
+User Directory
+
+Shared id <-> username lookup and bulk score updates for the scoring paths.
+
+The id/username map is loaded with one query and kept until a user is
+created or deleted. In-process changes invalidate it through mapper events;
+users created or deleted by other processes or workers (seed scripts,
+multi-worker mode) are picked up by a count/max-id check every
+USER_DIRECTORY_CHECK_INTERVAL seconds (var.env), and a lookup of an unknown id
+or username reloads the map once right away. Score changes for a whole
+round are applied with a single UPDATE ... CASE statement instead of loading
+and modifying one User object per player.
+"""
+
+from dotenv import load_dotenv
+from sqlalchemy import case, event, func
+import os
+import threading
+import time
+
+from models.user import User
+from db import db
+
+load_dotenv('var.env')
+USER_DIRECTORY_CHECK_INTERVAL = float(os.getenv('USER_DIRECTORY_CHECK_INTERVAL', '10'))
+
+
+class UserDirectory:
+    # Columns the bulk score APIs are allowed to touch
+    SCORE_COLUMNS = {
+        'overall_score', 'match_me_score', 'geo_guessr_score',
+        'flappy_birds_score', 'buzzer_score', 'puzzle_score'
+    }
+
+    def __init__(self, check_interval=USER_DIRECTORY_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._by_id = None        # {user_id: username}
+        self._by_username = None  # {username: user_id}
+        self._signature = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Forget the cached map; it is reloaded on the next lookup"""
+        with self._lock:
+            self._by_id = None
+            self._by_username = None
+
+    @staticmethod
+    def _table_signature():
+        return tuple(db.session.query(func.count(User.id), func.max(User.id)).one())
+
+    def _maps(self, reload=False):
+        """The cached maps; reload=True loads them again (after a lookup miss)"""
+        now = time.monotonic()
+        with self._lock:
+            if not reload and self._by_id is not None and now - self._last_check >= self.check_interval:
+                # Users created or deleted by another process
+                self._last_check = now
+                reload = self._table_signature() != self._signature
+
+            if reload or self._by_id is None:
+                self._signature = self._table_signature()
+                self._last_check = now
+                rows = db.session.query(User.id, User.username).all()
+                self._by_id = {user_id: username for user_id, username in rows}
+                self._by_username = {username: user_id for user_id, username in rows}
+            return self._by_id, self._by_username
+
+    def _lookup(self, side, keys):
+        """{key: value} for the keys found in one side of the map, reloading once on a miss"""
+        keys = list(keys)
+        mapping = self._maps()[side]
+        if any(key not in mapping for key in keys):
+            mapping = self._maps(reload=True)[side]
+        return {key: mapping[key] for key in keys if key in mapping}
+
+    def username(self, user_id):
+        return self._lookup(0, [user_id]).get(user_id)
+
+    def user_id(self, username):
+        return self._lookup(1, [username]).get(username)
+
+    def all_usernames(self):
+        """Return the usernames of all users"""
+        return list(self._maps()[1])
+
+    def usernames(self, user_ids):
+        """Return {user_id: username} for the given ids (unknown ids are left out)"""
+        return self._lookup(0, user_ids)
+
+    def user_ids(self, usernames):
+        """Return {username: user_id} for the given usernames (unknown names are left out)"""
+        return self._lookup(1, usernames)
+
+    @classmethod
+    def _column(cls, column):
+        if column not in cls.SCORE_COLUMNS:
+            raise ValueError(f"Unknown score column: {column}")
+        return getattr(User, column)
+
+    @staticmethod
+    def _expire(user_ids, column):
+        """Expire the column on already loaded User objects so they don't show stale scores"""
+        for identity_key, obj in list(db.session.identity_map.items()):
+            if isinstance(obj, User) and identity_key[1][0] in user_ids:
+                db.session.expire(obj, [column])
+
+    def increment_scores(self, deltas, column='overall_score'):
+        """
+        Add deltas[user_id] to the score column of each user in one UPDATE.
+
+        Does not commit; the caller commits with the rest of its changes.
+        """
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        score_column = self._column(column)
+        db.session.query(User).filter(User.id.in_(list(deltas))).update(
+            {score_column: score_column + case(deltas, value=User.id, else_=0)},
+            synchronize_session=False
+        )
+        self._expire(deltas, column)
+
+    def set_scores(self, values, column):
+        """
+        Set the score column of each user to values[user_id] in one UPDATE.
+
+        Does not commit; the caller commits with the rest of its changes.
+        """
+        if not values:
+            return
+
+        score_column = self._column(column)
+        db.session.query(User).filter(User.id.in_(list(values))).update(
+            {score_column: case(values, value=User.id, else_=score_column)},
+            synchronize_session=False
+        )
+        self._expire(values, column)
+
+    def increment_scores_by_username(self, deltas, column='overall_score'):
+        """Same as increment_scores, keyed by username"""
+        ids = self.user_ids(deltas)
+        self.increment_scores({ids[username]: delta for username, delta in deltas.items() if username in ids}, column)
+
+    def set_scores_by_username(self, values, column):
+        """Same as set_scores, keyed by username"""
+        ids = self.user_ids(values)
+        self.set_scores({ids[username]: value for username, value in values.items() if username in ids}, column)
+
+    def scores(self, user_ids, column='overall_score'):
+        """Return {user_id: score} for the given ids in one query"""
+        if not user_ids:
+            return {}
+        score_column = self._column(column)
+        return dict(db.session.query(User.id, score_column).filter(User.id.in_(list(user_ids))).all())
+
+
+# Create singleton instance
+user_directory = UserDirectory()
+
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_delete')
+def invalidate_user_directory(mapper, connection, target):
+    user_directory.invalidate()
@@ -0,0 +1,96 @@
+"""
+Wire Format
+
+Opt-in compact encoding for the high-frequency and large socket events.
+
+question_selected carries the whole question dict (items, items_by_order,
+expected answers, sorting rows) with long key names repeated for every item,
+and the live events (Font Guesser swaps, Flappy Birds scores) repeat their keys
+several times per second. Clients that connect with auth {'compact': 1} get
+these events with every known key replaced by a short code (WIRE_KEYS index
+in base 36 behind a '~', e.g. 'question_text' -> '~9'), wrapped as
+{'~': encoded}. The key table is sent to the client on connect
+('wire_keys'), and static/js/socket-utility.js decodes the payload before the
+page's handlers see it. All other clients and events stay plain JSON.
+
+The co-op puzzle events are not in the table: coop_puzzle_update_piece and
+coop_puzzle_drag are sent by the clients, and the teammate relay
+(coop_puzzle_moves, see games/coop_puzzle.py) already sends each move as a
+[piece_id, x, y, username, locked] array with quantized integer positions.
+
+Keys that are not in the table (usernames, item_order groups) are kept; keys
+that start with '~' get a second '~' so they never read as a short code.
+
+msgpack would need a packet encoder on both ends (and an extra client
+library); short keys keep the payload JSON, which is what the browsers parse
+fastest anyway.
+"""
+
+COMPACT_MARKER = '~'
+
+# Events sent encoded to compact clients
+COMPACT_EVENTS = frozenset({
+    'question_selected',
+    'fg_swap',
+    'flappy_birds_update_scores',
+})
+
+# Append only: the index of a key is its short code
+WIRE_KEYS = (
+    # question_selected envelope
+    'category', 'value', 'question', 'answer', 'questionData', 'currentItemIndex', 'totalItems',
+    # Question.to_dict
+    'id', 'question_text', 'difficulty', 'category_id', 'question_type', 'media_url',
+    'media_duration', 'spotify_track_id', 'auto_play', 'show_duration', 'multi_item',
+    'input_expected', 'movie_id', 'items', 'order_items', 'expected_answers',
+    'sorting_categories', 'sorting_items', 'movie', 'title', 'year',
+    'items_by_order', 'order_sequence',
+    # Child rows
+    'question_id', 'item_order', 'item_text', 'item_name', 'item_value', 'position',
+    'input_type', 'hint', 'answer_raw', 'answer_normalized', 'is_primary', 'rank', 'item_id',
+    'category_index', 'category_name',
+    # Font Guesser / Flappy Birds
+    'indexA', 'indexB', 'username', 'score', 'scores',
+)
+
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def _short_code(index):
+    code = ''
+    while True:
+        index, digit = divmod(index, 36)
+        code = _DIGITS[digit] + code
+        if not index:
+            return COMPACT_MARKER + code
+
+
+SHORT_KEYS = {key: _short_code(index) for index, key in enumerate(WIRE_KEYS)}
+
+
+def encode_value(value):
+    """Replace the known keys of every dict in value with their short codes"""
+    if isinstance(value, dict):
+        encoded = {}
+        for key, item in value.items():
+            short = SHORT_KEYS.get(key)
+            if short is None:
+                key = str(key)
+                short = COMPACT_MARKER + key if key.startswith(COMPACT_MARKER) else key
+            encoded[short] = encode_value(item)
+        return encoded
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    return value
+
+
+def encode_payload(event, data):
+    """Payload of an event for compact clients (unchanged for events without a compact form)"""
+    if event not in COMPACT_EVENTS:
+        return data
+    return {COMPACT_MARKER: encode_value(data)}
+
+
+def wire_keys_payload():
+    """Key table sent to compact clients on connect, in WIRE_KEYS order"""
+    return {'keys': list(WIRE_KEYS)}
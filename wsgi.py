@@ -0,0 +1,25 @@
+"""
+WSGI entry point for production (gunicorn, see gunicorn.conf.py).
+
+Monkey-patching has to happen before anything else is imported, otherwise
+sockets, locks and the database driver created at import time would block
+the whole worker instead of just one greenlet.
+"""
+
+import os
+
+ASYNC_WORKER = os.getenv('ASYNC_WORKER', 'gevent')
+
+if ASYNC_WORKER == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+else:
+    from gevent import monkey
+    monkey.patch_all()
+
+# Make Flask-SocketIO use the same async framework as the gunicorn worker
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', ASYNC_WORKER)
+
+from app import app, start_background_tasks  # noqa: F401 - app is the gunicorn target; must come after monkey-patching
+
+start_background_tasks()